@@ -0,0 +1,111 @@
+import asyncio
+import math
+import time
+from collections import deque
+import config
+import metrics
+from agents.llm_limiter import llm_limiter
+
+
+class HedgingPolicy:
+    """
+    Hedged agent calls: when a call is still running after the agent's
+    `percentile` latency, a duplicate is sent and the first successful answer
+    wins. The other call is cancelled.
+
+    Latencies are tracked per agent over the last `window` calls (a cancelled
+    loser counts with the time it ran), and nothing is hedged until
+    `min_samples` have been seen. Each call earns `max_rate` hedge tokens (up
+    to `max_tokens`) and each hedge spends one, so at most about `max_rate` of
+    calls are duplicated. Hedges are also skipped while the shared LLM
+    concurrency limiter has no free slot, so they never queue behind first
+    attempts.
+    """
+    def __init__(self, enabled=None, percentile=None, max_rate=None, window=200, min_samples=20, max_tokens=5.0,
+                 limiter=None):
+        self.enabled = config.get_llm_hedging_enabled() if enabled is None else enabled
+        self.percentile = config.get_llm_hedge_percentile() if percentile is None else percentile
+        self.max_rate = config.get_llm_hedge_max_rate() if max_rate is None else max_rate
+        self.window = window
+        self.min_samples = min_samples
+        self.max_tokens = max_tokens
+        self.limiter = limiter or llm_limiter
+        self.tokens = 0.0
+        self._latencies = {}  # agent name -> deque of recent call durations in seconds
+
+    def record(self, name, seconds):
+        samples = self._latencies.get(name)
+        if samples is None:
+            samples = self._latencies[name] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def hedge_delay(self, name):
+        """Seconds after which a call to the agent is hedged, or None while there are too few samples."""
+        samples = self._latencies.get(name)
+        if samples is None or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[max(0, math.ceil(self.percentile / 100 * len(ordered)) - 1)]
+
+    def _may_hedge(self, name):
+        if self.tokens < 1:
+            metrics.agent_hedges_skipped.inc(agent=name, reason="rate_cap")
+            return False
+        if self.limiter.in_flight >= self.limiter.capacity:
+            metrics.agent_hedges_skipped.inc(agent=name, reason="saturated")
+            return False
+        self.tokens -= 1
+        return True
+
+    async def _timed(self, name, call):
+        start = time.perf_counter()
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            # A cancelled loser ran at least this long; leaving it out would skew the percentile low
+            self.record(name, time.perf_counter() - start)
+            raise
+        self.record(name, time.perf_counter() - start)
+        return result
+
+    async def run(self, name, call):
+        """
+        Returns the result of `call()`, an async function making one agent call,
+        hedging it with a second call if it runs long.
+
+        Raises the first error if every call fails.
+        """
+        if not self.enabled:
+            return await call()
+        self.tokens = min(self.max_tokens, self.tokens + self.max_rate)
+        delay = self.hedge_delay(name)
+        tasks = [asyncio.ensure_future(self._timed(name, call))]
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done and self._may_hedge(name):
+                    tasks.append(asyncio.ensure_future(self._timed(name, call)))
+
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Read every finished call's error, including a loser's that finished alongside the winner
+                finished = [(task, task.exception()) for task in tasks if task in done]
+                for task, exception in finished:
+                    if exception is None:
+                        if len(tasks) > 1:
+                            metrics.agent_hedges.inc(agent=name, result="won" if task is tasks[1] else "lost")
+                        return task.result()
+                    error = error or exception
+            if len(tasks) > 1:
+                metrics.agent_hedges.inc(agent=name, result="failed")
+            raise error
+        finally:
+            # The losing call (or both, if the caller was cancelled); its pooled session is cleaned up on cancellation
+            for task in tasks:
+                task.cancel()
+
+
+# Shared by every workflow in the process
+hedging_policy = HedgingPolicy()
@@ -1,7 +1,11 @@
-from google.adk.agents import Agent
+from agents.runner_pool import AgentRunnerPool
+
+# One Runner for the life of the process; each description is generated in a throwaway session
+job_description_runner_pool = AgentRunnerPool("job_desc_gen")
 
 def create_job_description_agent():
     """Creates and returns the agent for generating job descriptions."""
+    from google.adk.agents import Agent
     agent = Agent(
         name="job_description_writer",
         model="gemini-2.5-flash-lite",
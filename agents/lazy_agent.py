@@ -0,0 +1,24 @@
+class LazyAgent:
+    """
+    An agent definition whose google.adk `Agent` is only built on first use.
+
+    Importing google.adk takes about a second, so modules that define agents
+    at import time hold these instead. `name`, `model` and `instruction` can
+    be read (e.g. for response cache keys) without building anything.
+
+    `model` may be reassigned before the first call, e.g. to a `BaseLlm`
+    instance; the benchmarks use this to plug in a fake model backend.
+    """
+    def __init__(self, **kwargs):
+        self.name = kwargs["name"]
+        self.model = kwargs["model"]
+        self.instruction = kwargs["instruction"]
+        self._kwargs = kwargs
+        self._agent = None
+
+    def build(self):
+        """Returns the underlying `Agent`, creating it on the first call."""
+        if self._agent is None:
+            from google.adk.agents import Agent
+            self._agent = Agent(**dict(self._kwargs, model=self.model))
+        return self._agent
@@ -0,0 +1,151 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+import config
+import metrics
+
+
+def is_overload_error(exception):
+    """True for responses that mean the model API is overloaded: any ServerError (5xx) or a 429."""
+    # Imported here: google.genai takes about a second to import, and it is loaded anyway once a call fails
+    from google.genai.errors import ClientError, ServerError
+    if isinstance(exception, ServerError):
+        return True
+    return isinstance(exception, ClientError) and getattr(exception, "code", None) == 429
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Process-wide cap on in-flight LLM calls, sized by AIMD.
+
+    Each successful call grows the limit by 1/limit, i.e. by about one slot
+    per limit's worth of successes. An overload response (see
+    `is_overload_error`) multiplies it by `backoff`. Calls that were already
+    in flight when the limit shrank report the same overload episode, so
+    their failures don't shrink it again. The limit only grows while at
+    least half of it is in use, so a quiet period doesn't inflate it.
+
+    Calls over the limit wait in FIFO order. Under overload, new work queues
+    here instead of adding load to the API.
+    """
+    def __init__(self, initial_limit=None, min_limit=None, max_limit=None, backoff=None):
+        self.min_limit = max(1, config.get_llm_concurrency_min() if min_limit is None else min_limit)
+        self.max_limit = max(self.min_limit, config.get_llm_concurrency_max() if max_limit is None else max_limit)
+        initial_limit = config.get_llm_concurrency_initial() if initial_limit is None else initial_limit
+        self.limit = float(min(self.max_limit, max(self.min_limit, initial_limit)))
+        self.backoff = config.get_llm_concurrency_backoff() if backoff is None else backoff
+        self.in_flight = 0
+        self._epoch = 0  # Bumped on every decrease
+        self._waiters = deque()
+
+    @property
+    def capacity(self):
+        """Number of calls allowed in flight right now."""
+        return int(self.limit)
+
+    @property
+    def queued(self):
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def slot(self, name):
+        """Holds one concurrency slot for the block; `name` labels the queue wait metric."""
+        start = time.perf_counter()
+        await self._acquire()
+        metrics.llm_queue_wait_seconds.observe(time.perf_counter() - start, agent=name)
+        epoch = self._epoch
+        saturated = self.in_flight * 2 >= self.capacity
+        try:
+            yield
+        except BaseException as e:
+            if is_overload_error(e):
+                self._on_overload(epoch)
+            raise
+        else:
+            self._on_success(saturated)
+        finally:
+            self._release()
+
+    async def _acquire(self):
+        if self.in_flight < self.capacity and not self._waiters:
+            self.in_flight += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.cancelled():
+                    self._waiters.remove(waiter)
+                else:
+                    # Handed a slot just before being cancelled: pass it on
+                    self._release()
+                raise
+        metrics.llm_in_flight.set(self.in_flight)
+
+    def _release(self):
+        self.in_flight -= 1
+        self._wake()
+        metrics.llm_in_flight.set(self.in_flight)
+
+    def _wake(self):
+        while self._waiters and self.in_flight < self.capacity:
+            waiter = self._waiters.popleft()
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def _on_success(self, saturated):
+        if saturated and self.limit < self.max_limit:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            metrics.llm_concurrency_limit.set(self.capacity)
+
+    def _on_overload(self, epoch):
+        if epoch != self._epoch:
+            return
+        self._epoch += 1
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+        metrics.llm_concurrency_limit.set(self.capacity)
+
+
+class RetryBudget:
+    """
+    Process-wide allowance for retries.
+
+    Each retry spends one token. Every successful call deposits `ratio`
+    tokens, and the balance also refills by `min_per_second`, up to
+    `max_balance`. Retries therefore stay around `ratio` of recent successful
+    traffic plus a small reserve, however many workflows fail at once. Without
+    the budget, every failing call would be repeated up to the attempt limit
+    just when the API is least able to serve it.
+    """
+    def __init__(self, ratio=None, min_per_second=None, max_balance=10.0, clock=time.monotonic):
+        self.ratio = config.get_llm_retry_budget_ratio() if ratio is None else ratio
+        self.min_per_second = config.get_llm_retry_budget_min_per_second() if min_per_second is None else min_per_second
+        self.max_balance = max_balance
+        self.clock = clock
+        self.balance = max_balance
+        self._updated = clock()
+
+    def _refill(self, amount):
+        now = self.clock()
+        self.balance = min(self.max_balance, self.balance + amount + (now - self._updated) * self.min_per_second)
+        self._updated = now
+
+    def deposit(self):
+        self._refill(self.ratio)
+
+    def try_spend(self):
+        """Takes one token for a retry; returns False (and counts it) when the budget is empty."""
+        self._refill(0)
+        if self.balance >= 1:
+            self.balance -= 1
+            return True
+        metrics.llm_retry_budget_exhausted.inc()
+        return False
+
+
+# Shared by every agent runner pool and every workflow in the process
+llm_limiter = AdaptiveConcurrencyLimiter()
+llm_retry_budget = RetryBudget()
+metrics.llm_concurrency_limit.set(llm_limiter.capacity)
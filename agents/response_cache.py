@@ -0,0 +1,189 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import config
+from database.connection import SessionLocal
+from database.executor import run_in_db_executor
+from database.models import LLMCacheEntry
+
+# Default time-to-live per agent, in seconds. A TTL of 0 disables caching for
+# that agent. The deadline and enrichment agents predict deadlines relative to
+# the current time embedded in their prompt, so their answers are never reused.
+DEFAULT_TTLS = {
+    "deadline_agent": 0,
+    "enrichment_agent": 0,
+    "assignee_agent": 600,
+    "details_agent": 86400,
+    "priority_agent": 86400,
+    "suggestion_agent": 86400,
+    "job_description_writer": 30 * 86400,
+}
+DEFAULT_TTL = 3600
+
+
+def normalize_prompt(prompt):
+    """Collapses whitespace so trivially different submissions share a cache entry."""
+    return " ".join(prompt.split())
+
+
+class ResponseCache:
+    """
+    Two-tier cache for agent responses.
+
+    Lookups hit an in-memory LRU first and fall back to the `llm_cache`
+    SQLite table, which survives restarts and is shared by all workers on the
+    host. Entries are keyed by agent name, model, instruction and normalized
+    prompt, so changing an agent's instruction invalidates its old answers.
+    """
+    def __init__(self, max_entries=None, ttls=None, enabled=None):
+        self.max_entries = config.get_llm_cache_max_entries() if max_entries is None else max_entries
+        self.enabled = config.get_llm_cache_enabled() if enabled is None else enabled
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(config.get_llm_cache_ttls() if ttls is None else ttls)
+        self._memory = OrderedDict()  # key -> (response, expires_at)
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "bypassed": 0, "stores": 0, "evictions": 0}
+
+    def ttl_for(self, agent_name):
+        return self.ttls.get(agent_name, DEFAULT_TTL)
+
+    @staticmethod
+    def make_key(agent, prompt):
+        payload = json.dumps(
+            [agent.name, str(agent.model), str(agent.instruction), normalize_prompt(prompt)],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _remember(self, key, response, expires_at):
+        with self._lock:
+            self._memory[key] = (response, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def _memory_get(self, agent, prompt):
+        key = self.make_key(agent, prompt)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[1] > datetime.utcnow():
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return entry[0]
+            if entry:
+                del self._memory[key]
+        return None
+
+    def get(self, agent, prompt):
+        """Returns the cached response text, or None on a miss."""
+        if not self.enabled or self.ttl_for(agent.name) <= 0:
+            self._count("bypassed")
+            return None
+
+        cached = self._memory_get(agent, prompt)
+        if cached is not None:
+            return cached
+
+        key = self.make_key(agent, prompt)
+        now = datetime.utcnow()
+        session = SessionLocal()
+        try:
+            row = session.get(LLMCacheEntry, key)
+            if row and row.expires_at > now:
+                self._remember(key, row.response, row.expires_at)
+                self._count("db_hits")
+                return row.response
+            if row:
+                session.delete(row)
+                session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"Warning: LLM cache lookup failed: {e}")
+        finally:
+            session.close()
+
+        self._count("misses")
+        return None
+
+    def set(self, agent, prompt, response):
+        """Stores a response in both tiers. Empty responses are not cached."""
+        ttl = self.ttl_for(agent.name)
+        if not self.enabled or ttl <= 0 or not response:
+            return
+
+        key = self.make_key(agent, prompt)
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=ttl)
+        self._remember(key, response, expires_at)
+
+        session = SessionLocal()
+        try:
+            session.merge(LLMCacheEntry(
+                key=key,
+                agent_name=agent.name,
+                response=response,
+                created_at=now,
+                expires_at=expires_at
+            ))
+            session.commit()
+            self._count("stores")
+        except Exception as e:
+            session.rollback()
+            print(f"Warning: LLM cache store failed: {e}")
+        finally:
+            session.close()
+
+    async def aget(self, agent, prompt):
+        """Async `get`: memory hits return immediately, SQLite lookups run on the DB thread pool."""
+        if not self.enabled or self.ttl_for(agent.name) <= 0:
+            self._count("bypassed")
+            return None
+        cached = self._memory_get(agent, prompt)
+        if cached is not None:
+            return cached
+        return await run_in_db_executor(self.get, agent, prompt)
+
+    async def aset(self, agent, prompt, response):
+        """Async `set`: the SQLite write runs on the DB thread pool."""
+        if not self.enabled or self.ttl_for(agent.name) <= 0 or not response:
+            return
+        await run_in_db_executor(self.set, agent, prompt, response)
+
+    def purge_expired(self):
+        """Deletes expired rows from the SQLite tier. Returns the number removed."""
+        session = SessionLocal()
+        try:
+            removed = session.query(LLMCacheEntry).filter(LLMCacheEntry.expires_at <= datetime.utcnow()).delete()
+            session.commit()
+            return removed
+        except Exception as e:
+            session.rollback()
+            print(f"Warning: LLM cache purge failed: {e}")
+            return 0
+        finally:
+            session.close()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+    def get_stats(self):
+        """Returns hit/miss counters plus the current in-memory size."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["db_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["db_hits"]) / lookups, 4) if lookups else 0.0
+        stats["max_entries"] = self.max_entries
+        stats["enabled"] = self.enabled
+        return stats
+
+
+response_cache = ResponseCache()
@@ -1,8 +1,9 @@
-from google.adk.agents import Agent
-from google.adk.tools import google_search
-
 def create_root_agent():
     """Creates the main agent with task creation capabilities."""
+    # Imported here so importing the agents package doesn't load google.adk
+    from google.adk.agents import Agent
+    from google.adk.tools import google_search
+
     root_agent = Agent(
         name="helpful_assistant",
         model="gemini-2.5-flash-lite",
@@ -0,0 +1,60 @@
+import uuid
+from agents.lazy_agent import LazyAgent
+from agents.llm_limiter import llm_limiter
+
+POOL_USER_ID = "pool_user"
+
+class AgentRunnerPool:
+    """
+    Long-lived Runners for one-shot agent calls.
+
+    Each agent gets one Runner, built on first use and shared by every
+    request, on top of a single InMemorySessionService. Every call runs in
+    its own throwaway session that is deleted as soon as the call returns or
+    fails, so concurrent calls never see each other's history and sessions
+    don't pile up over the life of the process.
+
+    Calls hold a slot of `limiter` (by default the process-wide adaptive
+    limiter) while they run, so all pools together respect one concurrency
+    limit for the model API.
+
+    google.adk is only imported when the first Runner is needed, so creating
+    a pool at module level doesn't slow down imports.
+    """
+    def __init__(self, app_name, limiter=None):
+        self.app_name = app_name
+        self.limiter = limiter or llm_limiter
+        self._session_service = None
+        self._runners = {}
+
+    @property
+    def session_service(self):
+        if self._session_service is None:
+            from google.adk.sessions import InMemorySessionService
+            self._session_service = InMemorySessionService()
+        return self._session_service
+
+    def runner_for(self, agent):
+        """Returns the agent's Runner. `agent` is an `Agent` or a `LazyAgent`."""
+        runner = self._runners.get(agent.name)
+        if runner is None:
+            from google.adk.runners import Runner
+            if isinstance(agent, LazyAgent):
+                agent = agent.build()
+            runner = Runner(agent=agent, session_service=self.session_service, app_name=self.app_name)
+            self._runners[agent.name] = runner
+        return runner
+
+    async def run(self, agent, prompt):
+        """Sends the prompt to the agent in a fresh session and returns the response events."""
+        session_id = f"{agent.name}-{uuid.uuid4().hex}"
+        async with self.limiter.slot(agent.name):
+            try:
+                return await self.runner_for(agent).run_debug(prompt, user_id=POOL_USER_ID, session_id=session_id)
+            finally:
+                await self.session_service.delete_session(app_name=self.app_name, user_id=POOL_USER_ID, session_id=session_id)
+
+    async def session_count(self):
+        """Number of sessions currently held; only calls in flight should have one."""
+        response = await self.session_service.list_sessions(app_name=self.app_name, user_id=POOL_USER_ID)
+        return len(response.sessions)
@@ -1,25 +1,49 @@
-from google.adk.agents import Agent
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from tools.task_tools import get_all_candidates, save_task_to_db
+from agents.lazy_agent import LazyAgent
+from agents.runner_pool import AgentRunnerPool
+from agents.llm_limiter import llm_retry_budget
+from agents.hedging import hedging_policy
+from tools.task_tools import save_task_to_db_async, save_tasks_to_db_async
+from database.executor import run_in_db_executor
+from tools.candidate_index import shortlist_candidates, make_shortlister
+from tools.deadline_parser import parse_deadline
+from agents.response_cache import response_cache
 from datetime import datetime
 import json
+import time
 import asyncio
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-from google.genai.errors import ServerError
+import config
+import metrics
+from tenacity import retry, stop_after_attempt, stop_any, wait_exponential, retry_if_exception
+from pydantic import BaseModel, Field, ValidationError
+
+def _is_server_error(exception):
+    # Imported here: google.genai takes about a second to import, and it is loaded anyway once a call fails
+    from google.genai.errors import ServerError
+    return isinstance(exception, ServerError)
+
+def _retry_budget_exhausted(retry_state):
+    # Only reached once the attempt limit allows another try, so no token is spent on a call that stops anyway
+    return not llm_retry_budget.try_spend()
 
 # Retry configuration
 # Retry on ServerError (which includes 503)
 # Wait exponentially: 1s, 2s, 4s, ... up to 10s
-# Stop after 5 attempts
+# Stop after 5 attempts, or earlier when the process-wide retry budget is empty
+def _record_retry(retry_state):
+    # _run_agent(self, agent, prompt)
+    metrics.agent_retries.inc(agent=retry_state.args[1].name)
+
 RETRY_CONFIG = {
-    "retry": retry_if_exception_type(ServerError),
+    "retry": retry_if_exception(_is_server_error),
     "wait": wait_exponential(multiplier=1, min=1, max=10),
-    "stop": stop_after_attempt(5)
+    "stop": stop_any(stop_after_attempt(5), _retry_budget_exhausted),
+    "before_sleep": _record_retry
 }
 
+# The agents below are only built (and google.adk imported) when a workflow first calls them
+
 # 1. Deadline Agent
-deadline_agent = Agent(
+deadline_agent = LazyAgent(
     name="deadline_agent",
     model="gemini-2.5-flash-lite",
     description="Predicts deadlines for tasks.",
@@ -32,7 +56,7 @@ deadline_agent = Agent(
 )
 
 # 2. Assignee Agent
-assignee_agent = Agent(
+assignee_agent = LazyAgent(
     name="assignee_agent",
     model="gemini-2.5-flash-lite",
     description="Finds the best assignee for a task.",
@@ -44,7 +68,7 @@ assignee_agent = Agent(
 )
 
 # 3. Details Agent
-details_agent = Agent(
+details_agent = LazyAgent(
     name="details_agent",
     model="gemini-2.5-flash-lite",
     description="Generates task titles and refined descriptions.",
@@ -58,7 +82,7 @@ details_agent = Agent(
 )
 
 # 4. Priority Agent
-priority_agent = Agent(
+priority_agent = LazyAgent(
     name="priority_agent",
     model="gemini-2.5-flash-lite",
     description="Determines task importance and priority.",
@@ -73,7 +97,7 @@ priority_agent = Agent(
 )
 
 # 5. Suggestion Agent
-suggestion_agent = Agent(
+suggestion_agent = LazyAgent(
     name="suggestion_agent",
     model="gemini-2.5-flash-lite",
     description="Provides suggestions for the assignee.",
@@ -82,6 +106,36 @@ suggestion_agent = Agent(
     Keep it brief and actionable."""
 )
 
+# 6. Fused Enrichment Agent
+# Produces everything the five-agent pipeline produces except the assignee
+# in a single structured-output call (used when WORKFLOW_MODE=fused).
+class TaskEnrichment(BaseModel):
+    title: str = Field(description="A concise, action-oriented task title.")
+    description: str = Field(description="A clear, detailed task description.")
+    deadline: str = Field(description="Deadline in 'YYYY-MM-DD HH:MM:SS' format.")
+    importance: int = Field(ge=1, le=5, description="Importance from 1 to 5 (5 being highest).")
+    priority: int = Field(ge=1, le=5, description="Priority from 1 to 5 (5 being highest).")
+    suggestions: str = Field(description="Brief, actionable suggestions for the assignee.")
+
+enrichment_agent = LazyAgent(
+    name="enrichment_agent",
+    model="gemini-2.5-flash-lite",
+    description="Generates the title, description, deadline, importance, priority and suggestions for a task.",
+    instruction="""You are an expert project manager, technical writer and senior mentor.
+    For the given task description:
+    - Write a concise, action-oriented title and a clear, detailed description.
+    - Predict a reasonable deadline in 'YYYY-MM-DD HH:MM:SS' format. If no specific time is implied,
+      assume 5:00 PM on the calculated date. If the description is vague, assume 24 hours from now.
+      Current time is provided in the prompt.
+    - Rate importance and priority on a scale of 1 to 5 (5 being highest).
+    - Provide brief, actionable suggestions, resources, or starting points for the assignee.
+    Return ONLY the JSON object.""",
+    output_schema=TaskEnrichment,
+)
+
+# Shared by every workflow, so requests don't build their own Runners and sessions
+task_runner_pool = AgentRunnerPool("task_gen")
+
 
 def extract_text(response):
     texts = []
@@ -94,95 +148,371 @@ def extract_text(response):
                     texts.append(part.text)
     return "\n".join(texts).strip()
 
+def record_token_usage(agent, response):
+    """Adds the prompt and response token counts reported in the response events to the agent's metrics."""
+    for event in response:
+        usage = getattr(event, "usage_metadata", None)
+        if usage:
+            metrics.agent_tokens.inc(usage.prompt_token_count or 0, agent=agent.name, kind="prompt")
+            metrics.agent_tokens.inc(usage.candidates_token_count or 0, agent=agent.name, kind="response")
+
+def parse_json_object(text):
+    """Parses a JSON object reply, with or without a Markdown code fence; raises ValueError otherwise."""
+    value = json.loads(text.replace('```json', '').replace('```', ''))
+    if not isinstance(value, dict):
+        raise ValueError(f"Expected a JSON object, got {type(value).__name__}.")
+    return value
+
+WORKFLOW_MODES = ("multi_agent", "fused")
+
 class TaskCreationWorkflow:
-    def __init__(self, user_id):
+    """
+    Runs the task creation agents and saves the resulting task.
+
+    The deadline, assignee, details, priority and suggestion stages are
+    independent of each other. In sequential mode they run one after another;
+    in concurrent mode they are fanned out with asyncio and capped by
+    `max_concurrency` in-flight agent calls.
+
+    In "fused" mode the deadline, details, priority and suggestion stages are
+    replaced by a single structured-output call to `enrichment_agent`, so a
+    task costs two LLM calls (enrichment + assignee) instead of five.
+    """
+    def __init__(self, user_id, concurrent=None, max_concurrency=None, mode=None, shortlist=None):
         self.user_id = user_id
-        self.session_service = InMemorySessionService()
+        # Callable (task description) -> candidates; defaults to the shared candidate index
+        self.shortlist = shortlist
+        self.mode = mode or config.get_workflow_mode()
+        if self.mode not in WORKFLOW_MODES:
+            raise ValueError(f"Unknown workflow mode '{self.mode}'. Expected one of: {', '.join(WORKFLOW_MODES)}.")
+        self.concurrent = config.get_workflow_concurrent() if concurrent is None else concurrent
+        self.max_concurrency = max_concurrency or config.get_workflow_max_concurrency()
+        self.stage_timings = {}
+        self.on_progress = None
     
     @retry(**RETRY_CONFIG)
-    async def _run_agent(self, runner, prompt):
-        return await runner.run_debug(prompt)
-
-    async def run(self, user_input):
-        # 1. Predict Deadline
-        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        deadline_runner = Runner(agent=deadline_agent, session_service=self.session_service, app_name="task_gen")
-        deadline_resp = await self._run_agent(deadline_runner, f"Task: {user_input}. Current time: {current_time}")
-        deadline_str = extract_text(deadline_resp)
+    async def _run_agent(self, agent, prompt):
+        # Each attempt (and each hedge) gets a fresh pooled session, so a retry never sees a failed attempt's history
+        start = time.perf_counter()
+        outcome = "cancelled"
         try:
-            deadline = datetime.strptime(deadline_str, "%Y-%m-%d %H:%M:%S")
+            response = await hedging_policy.run(agent.name, lambda: task_runner_pool.run(agent, prompt))
+        except Exception as e:
+            outcome = "error"
+            if _is_server_error(e):
+                metrics.agent_server_errors.inc(agent=agent.name, code=getattr(e, "code", None) or "unknown")
+            raise
+        else:
+            outcome = "ok"
+            llm_retry_budget.deposit()
+            record_token_usage(agent, response)
+            return response
+        finally:
+            metrics.agent_call_seconds.observe(time.perf_counter() - start, agent=agent.name, outcome=outcome)
+
+    async def _ask(self, agent, prompt, parse=None):
+        """
+        Runs a single agent in a throwaway session and returns the response text,
+        or `parse(text)` if a parser is given.
+
+        A reply is only cached once `parse` accepts it; if it raises, the error
+        propagates and the malformed reply isn't served again for its TTL.
+        """
+        cached = await response_cache.aget(agent, prompt)
+        if cached is not None:
+            return parse(cached) if parse else cached
+        response = await self._run_agent(agent, prompt)
+        text = extract_text(response)
+        value = parse(text) if parse else text
+        await response_cache.aset(agent, prompt, text)
+        return value
+
+    def _local_deadline(self, user_input, now):
+        """Deadline stated in the description itself ("by Friday", "in 3 days"), or None if the agent is needed."""
+        deadline = parse_deadline(user_input, now)
+        metrics.deadline_parser_results.inc(result="miss" if deadline is None else "hit")
+        return deadline
+
+    async def _predict_deadline(self, user_input):
+        now = datetime.now()
+        deadline = self._local_deadline(user_input, now)
+        if deadline is not None:
+            return deadline
+        current_time = now.strftime("%Y-%m-%d %H:%M:%S")
+        deadline_str = await self._ask(deadline_agent, f"Task: {user_input}. Current time: {current_time}")
+        try:
+            return datetime.strptime(deadline_str, "%Y-%m-%d %H:%M:%S")
         except ValueError:
+            # Answers like "2025-11-02" or "2025-11-02 17:00" are still usable
+            deadline = parse_deadline(deadline_str, now)
+            if deadline is not None:
+                return deadline
             # Fallback if format is wrong
-            deadline = datetime.now()
             print(f"Warning: Could not parse deadline '{deadline_str}', using now.")
+            return datetime.now()
 
-        # 2. Find Assignee
-        candidates = get_all_candidates()
+    async def _find_assignee(self, user_input):
+        # Only the best lexical matches go into the prompt, so its size doesn't grow with the users table
+        candidates = await run_in_db_executor(self.shortlist or shortlist_candidates, user_input)
         candidates_str = json.dumps(candidates, indent=2)
-        assignee_runner = Runner(agent=assignee_agent, session_service=self.session_service, app_name="task_gen")
-        assignee_resp = await self._run_agent(assignee_runner, f"Task: {user_input}\nCandidates:\n{candidates_str}")
-        assignee_id = extract_text(assignee_resp)
-        
+        assignee_id = await self._ask(assignee_agent, f"Task: {user_input}\nCandidates:\n{candidates_str}")
+
         if assignee_id == 'None' or not any(c['id'] == assignee_id for c in candidates):
              # Fallback to creator if no match
              assignee_id = self.user_id
              print("Warning: No suitable assignee found, assigning to creator.")
+        return assignee_id, candidates
 
-        # 3. Generate Details
-        details_runner = Runner(agent=details_agent, session_service=self.session_service, app_name="task_gen")
-        details_resp = await self._run_agent(details_runner, f"Task: {user_input}")
-        details_text = extract_text(details_resp)
+    async def _generate_details(self, user_input):
         try:
-            details_json = json.loads(details_text.replace('```json', '').replace('```', ''))
-            title = details_json.get("title", "New Task")
-            description = details_json.get("description", user_input)
-        except json.JSONDecodeError:
-            title = "New Task"
-            description = user_input
+            details_json = await self._ask(details_agent, f"Task: {user_input}", parse=parse_json_object)
+            return details_json.get("title", "New Task"), details_json.get("description", user_input)
+        except ValueError:
             print("Warning: Could not parse details JSON.")
+            return "New Task", user_input
 
-        # 4. Predict Priority
-        priority_runner = Runner(agent=priority_agent, session_service=self.session_service, app_name="task_gen")
-        priority_resp = await self._run_agent(priority_runner, f"Task: {user_input}")
-        priority_text = extract_text(priority_resp)
+    async def _predict_priority(self, user_input):
         try:
-            priority_json = json.loads(priority_text.replace('```json', '').replace('```', ''))
-            importance = priority_json.get("importance", "3")
-            priority = priority_json.get("priority", "3")
-        except json.JSONDecodeError:
-            importance = "3"
-            priority = "3"
+            priority_json = await self._ask(priority_agent, f"Task: {user_input}", parse=parse_json_object)
+            return priority_json.get("importance", "3"), priority_json.get("priority", "3")
+        except ValueError:
             print("Warning: Could not parse priority JSON.")
+            return "3", "3"
 
-        # 5. Make Suggestions
-        suggestion_runner = Runner(agent=suggestion_agent, session_service=self.session_service, app_name="task_gen")
-        suggestion_resp = await self._run_agent(suggestion_runner, f"Task: {user_input}")
-        suggestions = extract_text(suggestion_resp)
+    async def _make_suggestions(self, user_input):
+        return await self._ask(suggestion_agent, f"Task: {user_input}")
 
-        # 6. Save to DB
-        result_msg = save_task_to_db(
-            title=title,
-            description=description,
-            assign_by=self.user_id,
-            assignee_id=assignee_id,
-            importance=importance,
-            priority=priority,
-            deadline=deadline,
-            suggestions=suggestions
+    async def _enrich(self, user_input):
+        """Fused replacement for the deadline, details, priority and suggestion stages."""
+        now = datetime.now()
+        # The fused call is made anyway, but a deadline stated in the description takes precedence over its guess
+        local_deadline = self._local_deadline(user_input, now)
+        current_time = now.strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            # output_schema makes the model return bare JSON, so the text is validated as is
+            enrichment = await self._ask(
+                enrichment_agent, f"Task: {user_input}. Current time: {current_time}", parse=TaskEnrichment.model_validate_json
+            )
+        except ValidationError:
+            print("Warning: Could not validate enrichment JSON, using defaults.")
+            return local_deadline or datetime.now(), ("New Task", user_input), ("3", "3"), ""
+
+        try:
+            deadline = local_deadline or datetime.strptime(enrichment.deadline, "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            deadline = parse_deadline(enrichment.deadline, now)
+            if deadline is None:
+                print(f"Warning: Could not parse deadline '{enrichment.deadline}', using now.")
+                deadline = datetime.now()
+        return (
+            deadline,
+            (enrichment.title, enrichment.description),
+            (str(enrichment.importance), str(enrichment.priority)),
+            enrichment.suggestions,
         )
-        
-        # Find assignee name
-        assignee_name = "Unknown"
+
+    def _assignee_name(self, assignee_id, candidates):
         for c in candidates:
             if c['id'] == assignee_id:
-                assignee_name = c['name']
-                break
-        if assignee_name == "Unknown" and assignee_id == self.user_id:
-             assignee_name = "You"
+                return c['name']
+        return "You" if assignee_id == self.user_id else "Unknown"
+
+    def _progress_events(self, name, result):
+        """Converts a finished stage's result into (event, JSON-serializable data) pairs."""
+        if name == "enrichment":
+            deadline, details, levels, suggestions = result
+            return (self._progress_events("deadline", deadline) + self._progress_events("details", details)
+                    + self._progress_events("priority", levels) + self._progress_events("suggestions", suggestions))
+        if name == "deadline":
+            return [("deadline", {"deadline": result.strftime("%Y-%m-%d %H:%M:%S")})]
+        if name == "assignee":
+            assignee_id, candidates = result
+            return [("assignee", {"assignee_id": assignee_id, "assignee_name": self._assignee_name(assignee_id, candidates)})]
+        if name == "details":
+            return [("details", {"title": result[0], "description": result[1]})]
+        if name == "priority":
+            return [("priority", {"importance": result[0], "priority": result[1]})]
+        if name == "suggestions":
+            return [("suggestions", {"suggestions": result})]
+        return []
+
+    async def _emit(self, event, data):
+        if self.on_progress is None:
+            return
+        try:
+            await self.on_progress(event, data)
+        except Exception as e:
+            # Progress is best effort; a broken listener must not fail the task
+            print(f"Warning: Progress listener failed for '{event}': {e}")
+
+    async def _timed(self, name, coro, semaphore=None):
+        """Awaits a stage coroutine, records its wall-clock duration in seconds and reports progress."""
+        if semaphore is None:
+            start = time.perf_counter()
+            try:
+                result = await coro
+            finally:
+                self.stage_timings[name] = round(time.perf_counter() - start, 3)
+            for event, data in self._progress_events(name, result):
+                await self._emit(event, data)
+            return result
+        async with semaphore:
+            return await self._timed(name, coro)
+
+    def _stages(self):
+        if self.mode == "fused":
+            return [
+                ("enrichment", self._enrich),
+                ("assignee", self._find_assignee),
+            ]
+        return [
+            ("deadline", self._predict_deadline),
+            ("assignee", self._find_assignee),
+            ("details", self._generate_details),
+            ("priority", self._predict_priority),
+            ("suggestions", self._make_suggestions),
+        ]
+
+    async def _run_stages(self, user_input):
+        """Runs the workflow stages and returns their results keyed by stage name."""
+        stages = self._stages()
+
+        if not self.concurrent:
+            return {name: await self._timed(name, stage(user_input)) for name, stage in stages}
+
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+        tasks = [asyncio.create_task(self._timed(name, stage(user_input), semaphore)) for name, stage in stages]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            # One stage failed for good (e.g. retries exhausted): don't leave the others running
+            for task in tasks:
+                task.cancel()
+            raise
+        return dict(zip((name for name, _ in stages), results))
+
+    async def run(self, user_input, on_progress=None):
+        """
+        Creates a task from the user's description.
+
+        Args:
+            user_input (str): The task description.
+            on_progress: Optional async callable (event, data) invoked as each stage
+                finishes ("deadline", "assignee", "details", "priority", "suggestions")
+                and once the task is saved ("saved", with the final result).
+        """
+        self.on_progress = on_progress
+        self.stage_timings = {}
+        start = time.perf_counter()
+
+        # 1-5. Deadline, assignee, details, priority and suggestions
+        task, assignee_name = await self.prepare(user_input)
+
+        # 6. Save to DB
+        save_start = time.perf_counter()
+        result_msg = await save_task_to_db_async(**task)
+        self.stage_timings["save"] = round(time.perf_counter() - save_start, 3)
+        self.stage_timings["total"] = round(time.perf_counter() - start, 3)
+        print(f"Task workflow timings ({self.mode}, {'concurrent' if self.concurrent else 'sequential'}): {self.stage_timings}")
 
-        return {
+        result = {
             "status": "success",
             "message": result_msg,
             "assignee_name": assignee_name,
-            "task_title": title
-        }
\ No newline at end of file
+            "task_title": task["title"],
+            "timings": dict(self.stage_timings)
+        }
+        await self._emit("saved", result)
+        return result
+
+    async def prepare(self, user_input):
+        """
+        Runs the agent stages without saving anything.
+
+        Returns:
+            tuple: (keyword arguments for `save_task_to_db`, assignee display name)
+        """
+        results = await self._run_stages(user_input)
+        assignee_id, candidates = results["assignee"]
+        if self.mode == "fused":
+            deadline, (title, description), (importance, priority), suggestions = results["enrichment"]
+        else:
+            deadline = results["deadline"]
+            title, description = results["details"]
+            importance, priority = results["priority"]
+            suggestions = results["suggestions"]
+
+        task = {
+            "title": title,
+            "description": description,
+            "assign_by": self.user_id,
+            "assignee_id": assignee_id,
+            "importance": importance,
+            "priority": priority,
+            "deadline": deadline,
+            "suggestions": suggestions
+        }
+        return task, self._assignee_name(assignee_id, candidates)
+
+
+class BatchTaskCreationWorkflow:
+    """
+    Creates many tasks from a list of descriptions.
+
+    All items are matched against one candidate snapshot, at most
+    `max_concurrency` items run their agents at the same time, and the
+    resulting tasks are inserted in a single transaction. A failing item
+    doesn't stop the others; its error is reported in the per-item results.
+    """
+    def __init__(self, user_id, max_concurrency=None, mode=None):
+        self.user_id = user_id
+        self.max_concurrency = max_concurrency or config.get_batch_max_concurrency()
+        self.mode = mode
+
+    async def run(self, descriptions):
+        """
+        Returns:
+            dict: {"created", "failed", "results"}, with one result per description
+                (index, description, status "success" or "error", task_id/task_title/
+                assignee_name or error).
+        """
+        shortlist = await run_in_db_executor(make_shortlister)
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+
+        async def prepare(description):
+            if not description.strip():
+                raise ValueError("Empty task description.")
+            async with semaphore:
+                workflow = TaskCreationWorkflow(self.user_id, mode=self.mode, shortlist=shortlist)
+                return await workflow.prepare(description)
+
+        outcomes = await asyncio.gather(*(prepare(d) for d in descriptions), return_exceptions=True)
+
+        results = []
+        prepared = []
+        for index, (description, outcome) in enumerate(zip(descriptions, outcomes)):
+            item = {"index": index, "description": description}
+            if isinstance(outcome, Exception):
+                item.update(status="error", error=str(outcome) or type(outcome).__name__)
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                task, assignee_name = outcome
+                item.update(status="success", task_title=task["title"], assignee_name=assignee_name)
+                prepared.append((item, task))
+            results.append(item)
+
+        if prepared:
+            try:
+                task_ids = await save_tasks_to_db_async([task for _, task in prepared])
+            except Exception as e:
+                print(f"Error saving task batch: {e}")
+                for item, _ in prepared:
+                    item.update(status="error", error=f"Error saving tasks: {e}")
+            else:
+                for (item, _), task_id in zip(prepared, task_ids):
+                    item["task_id"] = task_id
+
+        created = sum(1 for item in results if item["status"] == "success")
+        print(f"Task batch for user {self.user_id}: {created} created, {len(results) - created} failed.")
+        return {"created": created, "failed": len(results) - created, "results": results}
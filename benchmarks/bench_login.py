@@ -0,0 +1,128 @@
+"""
+Login throughput benchmark.
+
+Measures how many concurrent logins a single worker process sustains through
+`auth.authenticate_user_async`, together with latency percentiles, how many
+logins were shed with "busy" (HTTP 503 in the server) and the worst event
+loop stall observed while the rush was in progress.
+
+Runs against a throwaway SQLite database; no server or API key is needed.
+
+Usage:
+    python benchmarks/bench_login.py
+    python benchmarks/bench_login.py --logins 400 --concurrency 1 16 64 256 --output login.json
+"""
+import argparse
+import asyncio
+import atexit
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Add project root to sys.path and point the app at a scratch database before it is imported
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+_scratch_dir = tempfile.mkdtemp(prefix="bench_login_")
+atexit.register(shutil.rmtree, _scratch_dir, ignore_errors=True)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_scratch_dir, 'bench.db')}")
+
+from database import init_db
+from tools import auth
+
+EMAIL = "bench@example.com"
+PASSWORD = "Password123"
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+async def run_level(logins, concurrency):
+    """Fires `logins` logins with `concurrency` of them in flight at any time."""
+    latencies, busy, failed = [], 0, 0
+    max_loop_lag = 0.0
+    queue = asyncio.Queue()
+    for _ in range(logins):
+        queue.put_nowait(None)
+
+    async def worker():
+        nonlocal busy, failed
+        while not queue.empty():
+            queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                user = await auth.authenticate_user_async(EMAIL, PASSWORD)
+                if user:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    failed += 1
+            except auth.PasswordHashingBusyException:
+                busy += 1
+
+    async def lag_probe(interval=0.01):
+        nonlocal max_loop_lag
+        while True:
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            max_loop_lag = max(max_loop_lag, time.perf_counter() - expected)
+
+    probe = asyncio.create_task(lag_probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    probe.cancel()
+
+    return {
+        "concurrency": concurrency,
+        "logins": logins,
+        "succeeded": len(latencies),
+        "rejected_busy": busy,
+        "failed": failed,
+        "elapsed_s": round(elapsed, 3),
+        "logins_per_s": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "max_event_loop_lag_ms": round(max_loop_lag * 1000, 1),
+    }
+
+
+def run(logins=200, concurrency_levels=(1, 8, 32, 128)):
+    """Runs the benchmark and returns a JSON-serializable result dict."""
+    init_db()
+    if not auth.get_user_by_email(EMAIL):
+        auth.create_user("Bench", "User", EMAIL, PASSWORD, "Tester", "Runs benchmarks")
+
+    async def all_levels():
+        return [await run_level(logins, level) for level in concurrency_levels]
+
+    return {
+        "benchmark": "login_throughput",
+        "password_hash_workers": auth.password_hasher.workers,
+        "password_hash_queue_size": auth.password_hasher.queue_size,
+        "results": asyncio.run(all_levels()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure concurrent login throughput of one worker.")
+    parser.add_argument("--logins", type=int, default=200, help="Logins per concurrency level.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--output", help="Write the JSON results to this file as well as stdout.")
+    args = parser.parse_args()
+
+    result = run(args.logins, args.concurrency)
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Cold-start benchmark.
+
+Imports each entry point in a fresh interpreter and reports the median
+import time, the wall-clock time of the whole process and the slowest
+direct imports (from `python -X importtime`), so a heavy module-level import
+or initialization step shows up as a regression in a single number.
+
+Nothing is initialized at import time, so no database or API key is needed.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 10 --modules server main --max-import-ms 1500 --output startup.json
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+TIMER = "import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+
+
+def parse_importtime(stderr, module):
+    """Returns [(name, cumulative ms)] for the direct imports of `module` from `-X importtime` output."""
+    children = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        try:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            cumulative = int(cumulative)
+        except ValueError:
+            continue  # header line
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        if depth == 1:
+            children.append((name, round(cumulative / 1000, 1)))
+        elif depth == 0:
+            if name == module:
+                return children
+            children = []
+    return []
+
+
+def measure(module, env):
+    """Imports `module` once in a fresh interpreter. Returns (import ms, process ms, direct imports)."""
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", TIMER.format(module=module)],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True
+    )
+    process_ms = (time.perf_counter() - start) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+    import_ms = float(completed.stdout.strip().splitlines()[-1]) * 1000
+    return import_ms, process_ms, parse_importtime(completed.stderr, module)
+
+
+def run(modules=("server", "main", "cli"), runs=5, top=5):
+    """Runs the benchmark and returns a JSON-serializable result dict."""
+    scratch_dir = tempfile.mkdtemp(prefix="bench_startup_")
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(scratch_dir, 'bench.db')}")
+    try:
+        baseline = statistics.median(measure("sys", env)[1] for _ in range(runs))
+        results = []
+        for module in modules:
+            samples = [measure(module, env) for _ in range(runs)]
+            slowest = sorted(samples[-1][2], key=lambda item: item[1], reverse=True)[:top]
+            results.append({
+                "module": module,
+                "import_ms": round(statistics.median(s[0] for s in samples), 1),
+                "process_ms": round(statistics.median(s[1] for s in samples), 1),
+                "slowest_imports_ms": dict(slowest),
+            })
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    return {
+        "benchmark": "startup",
+        "python": sys.version.split()[0],
+        "runs": runs,
+        "interpreter_ms": round(baseline, 1),
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold import time of the server and CLI entry points.")
+    parser.add_argument("--modules", nargs="+", default=["server", "main", "cli"])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module (the median is reported).")
+    parser.add_argument("--max-import-ms", type=float, help="Exit with status 1 if any module imports slower than this.")
+    parser.add_argument("--output", help="Write the JSON results to this file as well as stdout.")
+    args = parser.parse_args()
+
+    result = run(args.modules, args.runs)
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+    if args.max_import_ms is not None:
+        slow = [r["module"] for r in result["results"] if r["import_ms"] > args.max_import_ms]
+        if slow:
+            print(f"Import time budget of {args.max_import_ms} ms exceeded by: {', '.join(slow)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""
+Benchmark suite.
+
+Runs against a throwaway SQLite database with a fake model backend
+(`fake_llm.FakeLlm`), so no API key or network is needed and results only
+depend on this code. Sections:
+
+    workflow    `TaskCreationWorkflow.run` end to end, per workflow mode, with
+                canned LLM responses and a fixed per-call latency
+    auth        `authenticate_user` throughput (sequential, real bcrypt)
+    candidates  `get_all_candidates` and the candidate index at growing user counts
+    tasks       `get_all_tasks` and `query_tasks` listings at growing task counts
+
+Results are printed as JSON together with the git commit, so runs can be
+saved and compared across commits (`--compare previous.json`).
+
+Usage:
+    python benchmarks/bench_suite.py --output bench.json
+    python benchmarks/bench_suite.py --only tasks --tasks 1000 100000 1000000 --full-scan-limit 0
+    python benchmarks/bench_suite.py --compare bench.json
+"""
+import argparse
+import asyncio
+import atexit
+import contextlib
+import io
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add project root to sys.path and point the app at a scratch database before it is imported
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+_scratch_dir = tempfile.mkdtemp(prefix="bench_suite_")
+atexit.register(shutil.rmtree, _scratch_dir, ignore_errors=True)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_scratch_dir, 'bench.db')}")
+# Measure the workflow itself, not response cache hits
+os.environ["LLM_CACHE_ENABLED"] = "false"
+
+from database import init_db, engine, User, Task
+from tools import auth
+from tools.task_tools import get_all_candidates, get_all_tasks, query_tasks
+from tools.candidate_index import build_candidate_index, shortlist_candidates
+from fake_llm import CANNED_RESPONSES, install_fake_llm
+
+SECTIONS = ("workflow", "auth", "candidates", "tasks")
+WORKFLOW_CONFIGS = (
+    ("multi_agent", False),
+    ("multi_agent", True),
+    ("fused", True),
+)
+TASK_DESCRIPTION = "Fix the login bug in the authentication module before the release"
+POSITIONS = ["Backend Developer", "Frontend Developer", "QA Engineer", "Designer", "Product Manager",
+             "Data Analyst", "DevOps Engineer", "Technical Writer", "Accountant", "Recruiter"]
+STATUSES = ["open", "in_progress", "done"]
+EMAIL = "bench@example.com"
+PASSWORD = "Password123"
+SEED = 1234
+INSERT_BATCH = 50000
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def summarize(samples):
+    return {
+        "runs": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "min_ms": round(min(samples) * 1000, 2),
+    }
+
+
+def time_calls(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def table_count(table):
+    with engine.connect() as connection:
+        return connection.exec_driver_sql(f"SELECT count(*) FROM {table}").scalar()
+
+
+def seed_users(total):
+    """Tops the users table up to `total` rows of deterministic fake users."""
+    existing = table_count("users")
+    rng = random.Random(SEED + existing)
+    rows = []
+    for i in range(existing, total):
+        position = POSITIONS[i % len(POSITIONS)]
+        rows.append({
+            "id": f"bench-user-{i:07d}", "first_name": f"First{i}", "last_name": f"Last{i}",
+            "email": f"user{i}@bench.example.com", "hashed_password": "not-a-real-hash",
+            "position": position,
+            "job_description": f"{position} working on {rng.choice(['login', 'billing', 'search', 'reports'])} "
+                               f"and {rng.choice(['authentication', 'dashboards', 'payments', 'onboarding'])}.",
+        })
+    with engine.begin() as connection:
+        for start in range(0, len(rows), INSERT_BATCH):
+            connection.execute(User.__table__.insert(), rows[start:start + INSERT_BATCH])
+
+
+def seed_tasks(total, assignees):
+    """Tops the tasks table up to `total` rows spread over the given assignee ids."""
+    existing = table_count("tasks")
+    rng = random.Random(SEED + existing)
+    now = datetime(2030, 1, 1)
+    with engine.begin() as connection:
+        for start in range(existing, total, INSERT_BATCH):
+            rows = []
+            for i in range(start, min(total, start + INSERT_BATCH)):
+                created = now - timedelta(minutes=i)
+                rows.append({
+                    "title": f"Task {i}", "description": f"Benchmark task number {i}.",
+                    "assign_by": rng.choice(assignees), "assignee": rng.choice(assignees),
+                    "importance": rng.randint(1, 5), "priority": rng.randint(1, 5),
+                    "deadline": created + timedelta(days=rng.randint(1, 60)), "suggestions": "",
+                    "status": rng.choice(STATUSES), "created_at": created, "updated_at": created,
+                })
+            connection.execute(Task.__table__.insert(), rows)
+
+
+def bench_workflow(runs, latency_ms):
+    from agents.task_agents import TaskCreationWorkflow
+
+    seed_users(20)
+    build_candidate_index()
+    responses = dict(CANNED_RESPONSES, assignee_agent="bench-user-0000000")
+    fakes = install_fake_llm(responses, latency=latency_ms / 1000)
+
+    async def run_config(mode, concurrent):
+        workflow = TaskCreationWorkflow("bench-user-0000001", concurrent=concurrent, mode=mode)
+        # Warm-up: builds the agents and Runners
+        await workflow.run(TASK_DESCRIPTION)
+        calls_before = sum(f.calls for f in fakes.values())
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            await workflow.run(TASK_DESCRIPTION)
+            samples.append(time.perf_counter() - start)
+        return samples, (sum(f.calls for f in fakes.values()) - calls_before) // runs
+
+    results = []
+    for mode, concurrent in WORKFLOW_CONFIGS:
+        samples, llm_calls = asyncio.run(run_config(mode, concurrent))
+        # With every call taking `latency_ms`, the rest is framework, parsing and database time
+        ideal_ms = latency_ms * (1 if concurrent else llm_calls)
+        summary = summarize(samples)
+        results.append(dict(
+            mode=mode, concurrent=concurrent, llm_calls=llm_calls, llm_latency_ms=latency_ms, **summary,
+            overhead_p50_ms=round(summary["p50_ms"] - ideal_ms, 2),
+        ))
+    return results
+
+
+def bench_auth(logins):
+    if not auth.get_user_by_email(EMAIL):
+        auth.create_user("Bench", "User", EMAIL, PASSWORD, "Tester", "Runs benchmarks")
+
+    def login():
+        if not auth.authenticate_user(EMAIL, PASSWORD):
+            raise RuntimeError("Benchmark login failed.")
+
+    samples = time_calls(login, logins)
+    return dict(summarize(samples), logins_per_s=round(len(samples) / sum(samples), 1))
+
+
+def bench_candidates(user_counts, runs):
+    results = []
+    for count in sorted(user_counts):
+        seed_users(count)
+        all_candidates = time_calls(get_all_candidates, runs)
+        index_build = time_calls(build_candidate_index, 1)
+        shortlist = time_calls(lambda: shortlist_candidates(TASK_DESCRIPTION), runs)
+        results.append({
+            "users": table_count("users"),
+            "get_all_candidates": summarize(all_candidates),
+            "build_candidate_index_ms": round(index_build[0] * 1000, 2),
+            "shortlist_candidates": summarize(shortlist),
+        })
+    return results
+
+
+def bench_tasks(task_counts, runs, full_scan_limit):
+    seed_users(100)
+    assignees = [f"bench-user-{i:07d}" for i in range(100)]
+    listings = {
+        "first_page": lambda: query_tasks(limit=50),
+        "assignee_open_by_deadline": lambda: query_tasks(assignee=assignees[0], status="open",
+                                                         sort="deadline", order="asc", limit=50),
+        "first_page_with_total": lambda: query_tasks(limit=50, with_total=True),
+    }
+
+    results = []
+    for count in sorted(task_counts):
+        seed_start = time.perf_counter()
+        seed_tasks(count, assignees)
+        entry = {"tasks": table_count("tasks"), "seed_s": round(time.perf_counter() - seed_start, 2)}
+        if full_scan_limit and count > full_scan_limit:
+            entry["get_all_tasks"] = {"skipped": f"more than --full-scan-limit {full_scan_limit} tasks"}
+        else:
+            entry["get_all_tasks"] = summarize(time_calls(get_all_tasks, max(1, min(runs, 3))))
+        for name, listing in listings.items():
+            entry[name] = summarize(time_calls(listing, runs))
+        results.append(entry)
+    return results
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=PROJECT_ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sections=SECTIONS, runs=10, latency_ms=50, logins=20, user_counts=(1000, 10000, 100000),
+        task_counts=(1000, 100000, 1000000), full_scan_limit=100000):
+    """Runs the selected sections and returns a JSON-serializable result dict."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        init_db()
+
+    results = {}
+    if "workflow" in sections:
+        # The workflow and ADK print every stage and event; keep stdout for the JSON results
+        with contextlib.redirect_stdout(io.StringIO()):
+            results["workflow"] = bench_workflow(runs, latency_ms)
+    if "auth" in sections:
+        results["auth"] = bench_auth(logins)
+    if "candidates" in sections:
+        with contextlib.redirect_stdout(io.StringIO()):
+            results["candidates"] = bench_candidates(user_counts, runs)
+    if "tasks" in sections:
+        results["tasks"] = bench_tasks(task_counts, runs, full_scan_limit)
+
+    return {
+        "benchmark": "suite",
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "results": results,
+    }
+
+
+def flatten(value, prefix=""):
+    """Flattens nested results into {"tasks.2.first_page.p50_ms": 1.23, ...}."""
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        items = enumerate(value)
+    else:
+        return {prefix: value} if isinstance(value, (int, float)) and not isinstance(value, bool) else {}
+    flat = {}
+    for key, item in items:
+        flat.update(flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+    return flat
+
+
+def compare(baseline, current):
+    """Returns one line per timing or throughput metric present in both results."""
+    old, new = flatten(baseline["results"]), flatten(current["results"])
+    lines = []
+    for key in sorted(old.keys() & new.keys()):
+        if not key.endswith(("p50_ms", "p95_ms", "_index_ms", "_per_s")) or not old[key]:
+            continue
+        change = (new[key] - old[key]) / old[key] * 100
+        lines.append(f"{key}: {old[key]} -> {new[key]} ({change:+.1f}%)")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite against a scratch database and a fake LLM.")
+    parser.add_argument("--only", nargs="+", choices=SECTIONS, default=list(SECTIONS))
+    parser.add_argument("--runs", type=int, default=10, help="Timed repetitions per measurement.")
+    parser.add_argument("--llm-latency-ms", type=float, default=50, help="Latency of each fake LLM call.")
+    parser.add_argument("--logins", type=int, default=20)
+    parser.add_argument("--users", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--tasks", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--full-scan-limit", type=int, default=100000,
+                        help="Skip get_all_tasks above this many tasks (0 = never skip).")
+    parser.add_argument("--output", help="Write the JSON results to this file as well as stdout.")
+    parser.add_argument("--compare", help="Earlier results file to compare against (printed to stderr).")
+    args = parser.parse_args()
+
+    result = run(args.only, args.runs, args.llm_latency_ms, args.logins, args.users, args.tasks, args.full_scan_limit)
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"Compared with {baseline.get('commit')} ({baseline.get('timestamp')}):", file=sys.stderr)
+        for line in compare(baseline, result):
+            print(f"  {line}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Deterministic fake model backend for benchmarks.
+
+`FakeLlm` is an ADK model that answers every request with a canned response
+after a configurable delay, so agent workflows can be timed end to end
+(Runner, sessions, event handling, parsing, database writes) without
+calling Gemini. `install_fake_llm` swaps it into the task agents.
+"""
+import asyncio
+import random
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from pydantic import PrivateAttr
+
+# Well-formed answers for every task agent, matching what Gemini returns
+CANNED_RESPONSES = {
+    "deadline_agent": "2030-12-31 17:00:00",
+    "details_agent": '```json\n{"title": "Fix login", "description": "Fix the login bug in the authentication module."}\n```',
+    "priority_agent": '{"importance": "4", "priority": "5"}',
+    "suggestion_agent": "Start with the session handling in the auth module and add a regression test.",
+    "enrichment_agent": '{"title": "Fix login", "description": "Fix the login bug in the authentication module.", '
+                        '"deadline": "2030-12-31 17:00:00", "importance": 4, "priority": 5, '
+                        '"suggestions": "Start with the session handling in the auth module."}',
+}
+
+
+class FakeLlm(BaseLlm):
+    """
+    Returns `response` after `latency` seconds, plus up to `jitter` seconds
+    drawn from a generator seeded with `seed`.
+    """
+    response: str
+    latency: float = 0.05
+    jitter: float = 0.0
+    seed: int = 0
+    calls: int = 0
+    _rng: random.Random = PrivateAttr(default=None)
+
+    @classmethod
+    def supported_models(cls):
+        return [r"fake-.*"]
+
+    async def generate_content_async(self, llm_request, stream=False):
+        if self._rng is None:
+            self._rng = random.Random(self.seed)
+        self.calls += 1
+        await asyncio.sleep(self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0))
+        # Rough token counts (4 characters per token), so usage tracking sees realistic metadata
+        prompt_tokens = sum(len(part.text or "") for content in llm_request.contents for part in content.parts or []) // 4
+        response_tokens = len(self.response) // 4
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=self.response)]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens, candidates_token_count=response_tokens,
+                total_token_count=prompt_tokens + response_tokens
+            ),
+        )
+
+
+def install_fake_llm(responses, latency=0.05, jitter=0.0, seed=0):
+    """
+    Points every task agent at a FakeLlm. Must run before the agents are first used.
+
+    Args:
+        responses (dict): Agent name -> canned response text.
+
+    Returns:
+        dict: Agent name -> FakeLlm, e.g. to read call counts.
+    """
+    from agents import task_agents
+
+    fakes = {}
+    for name, response in responses.items():
+        agent = getattr(task_agents, name)
+        fakes[name] = FakeLlm(model=f"fake-{name}", response=response, latency=latency, jitter=jitter, seed=seed)
+        agent.model = fakes[name]
+    return fakes
@@ -19,3 +19,187 @@ def setup_environment():
 def get_session_timeout():
     """Returns the session timeout in minutes."""
     return int(os.environ.get("SESSION_TIMEOUT", 30))
+
+def get_workflow_concurrent():
+    """Returns whether the task creation agents run concurrently."""
+    return os.environ.get("WORKFLOW_CONCURRENT", "true").lower() in ("1", "true", "yes")
+
+def get_workflow_max_concurrency():
+    """Returns the maximum number of in-flight agent calls per task creation workflow."""
+    return int(os.environ.get("WORKFLOW_MAX_CONCURRENCY", 5))
+
+def get_workflow_mode():
+    """Returns the task creation workflow mode: 'multi_agent' (five agents) or 'fused' (single structured call)."""
+    return os.environ.get("WORKFLOW_MODE", "multi_agent").lower()
+
+def get_assignee_shortlist_size():
+    """Returns how many best-matching candidates are sent to the assignee agent (0 sends everyone)."""
+    return int(os.environ.get("ASSIGNEE_SHORTLIST_SIZE", 20))
+
+def get_candidate_index_refresh_seconds():
+    """Returns how often the candidate index is rebuilt from the database (0 disables rebuilds)."""
+    return int(os.environ.get("CANDIDATE_INDEX_REFRESH_SECONDS", 300))
+
+def get_llm_cache_enabled():
+    """Returns whether agent responses are cached."""
+    return os.environ.get("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+def get_llm_cache_max_entries():
+    """Returns the maximum number of responses kept in the in-memory cache tier."""
+    return int(os.environ.get("LLM_CACHE_MAX_ENTRIES", 1000))
+
+def get_llm_cache_ttls():
+    """
+    Returns per-agent cache TTL overrides in seconds, parsed from
+    LLM_CACHE_TTLS (e.g. "details_agent=3600,assignee_agent=0").
+    """
+    ttls = {}
+    for item in os.environ.get("LLM_CACHE_TTLS", "").split(","):
+        if "=" in item:
+            name, seconds = item.split("=", 1)
+            ttls[name.strip()] = int(seconds)
+    return ttls
+
+def get_database_url():
+    """Returns the SQLAlchemy URL of the application database."""
+    return os.environ.get("DATABASE_URL", "sqlite:///task_management.db")
+
+def get_db_pool_size():
+    """Returns the number of pooled database connections kept open."""
+    return int(os.environ.get("DB_POOL_SIZE", 5))
+
+def get_db_max_overflow():
+    """Returns how many connections may be opened beyond the pool size under load."""
+    return int(os.environ.get("DB_MAX_OVERFLOW", 10))
+
+def get_sqlite_busy_timeout_ms():
+    """Returns how long SQLite waits for a lock before raising 'database is locked'."""
+    return int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000))
+
+def get_sqlite_mmap_size():
+    """Returns the SQLite memory-mapped I/O size in bytes."""
+    return int(os.environ.get("SQLITE_MMAP_SIZE", 268435456))
+
+def get_sqlite_cache_size_kb():
+    """Returns the SQLite page cache size per connection in KiB."""
+    return int(os.environ.get("SQLITE_CACHE_SIZE_KB", 65536))
+
+def get_db_executor_workers():
+    """Returns the number of threads that run blocking database calls for async handlers."""
+    return int(os.environ.get("DB_EXECUTOR_WORKERS", get_db_pool_size()))
+
+def get_password_hash_workers():
+    """Returns the number of threads dedicated to bcrypt hashing and verification."""
+    return int(os.environ.get("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+
+def get_password_hash_queue_size():
+    """Returns how many hashing requests may wait for a thread before new ones are rejected with 503."""
+    return int(os.environ.get("PASSWORD_HASH_QUEUE_SIZE", 32))
+
+def get_login_rate_limit_backend():
+    """Returns where failed-login counters live: 'memory' (per process) or 'sqlite' (shared by all workers)."""
+    return os.environ.get("LOGIN_RATE_LIMIT_BACKEND", "memory").lower()
+
+def get_login_max_attempts():
+    """Returns the number of failed logins allowed before an email is locked out."""
+    return int(os.environ.get("LOGIN_MAX_ATTEMPTS", 5))
+
+def get_login_lockout_seconds():
+    """Returns how long failed-login counters are kept (and lockouts last), in seconds."""
+    return int(os.environ.get("LOGIN_LOCKOUT_SECONDS", 600))
+
+def get_login_rate_limit_max_entries():
+    """Returns the maximum number of emails tracked by the login rate limiter."""
+    return int(os.environ.get("LOGIN_RATE_LIMIT_MAX_ENTRIES", 100000))
+
+def get_task_job_queue_enabled():
+    """Returns whether POST /api/tasks enqueues a background job (202) instead of waiting for the workflow."""
+    return os.environ.get("TASK_JOB_QUEUE_ENABLED", "false").lower() in ("1", "true", "yes")
+
+def get_job_queue_workers():
+    """Returns how many task creation jobs run concurrently in each server process."""
+    return int(os.environ.get("JOB_QUEUE_WORKERS", 4))
+
+def get_job_queue_max_pending():
+    """Returns the maximum number of queued jobs before new submissions get 503 (0 for no limit)."""
+    return int(os.environ.get("JOB_QUEUE_MAX_PENDING", 1000))
+
+def get_job_queue_poll_interval():
+    """Returns how often idle job workers check the queue table for new jobs, in seconds."""
+    return float(os.environ.get("JOB_QUEUE_POLL_INTERVAL", 2.0))
+
+def get_job_stale_seconds():
+    """Returns how long a job may stay 'running' before it is assumed abandoned and requeued at startup."""
+    return int(os.environ.get("JOB_STALE_SECONDS", 600))
+
+def get_job_heartbeat_interval():
+    """Returns how often a running job's heartbeat is refreshed; keep it well below JOB_STALE_SECONDS."""
+    return float(os.environ.get("JOB_HEARTBEAT_INTERVAL", 30))
+
+def get_job_max_attempts():
+    """Returns how many times a job may be started before an abandoned run marks it failed instead of requeueing it."""
+    return int(os.environ.get("JOB_MAX_ATTEMPTS", 3))
+
+def get_job_requeue_interval():
+    """Returns how often each server process looks for abandoned 'running' jobs to requeue, in seconds."""
+    return float(os.environ.get("JOB_REQUEUE_INTERVAL", 60))
+
+def get_batch_max_items():
+    """Returns the maximum number of descriptions accepted by one batch task creation request."""
+    return int(os.environ.get("BATCH_MAX_ITEMS", 100))
+
+def get_batch_max_concurrency():
+    """Returns how many tasks of a batch run their agents at the same time."""
+    return int(os.environ.get("BATCH_MAX_CONCURRENCY", 4))
+
+def get_change_feed_overlap_seconds():
+    """Returns how far back a caught-up change feed cursor is set, to catch writes committed out of timestamp order."""
+    return float(os.environ.get("CHANGE_FEED_OVERLAP_SECONDS", 5))
+
+def get_task_tombstone_retention_days():
+    """Returns how long deleted-task tombstones are kept; older change feed cursors trigger a full resync."""
+    return int(os.environ.get("TASK_TOMBSTONE_RETENTION_DAYS", 30))
+
+def get_static_assets_build():
+    """Returns 'off' to serve static/dist as built at deploy time, or 'auto' to rebuild it at startup when sources changed."""
+    return os.environ.get("STATIC_ASSETS_BUILD", "off").lower()
+
+def get_metrics_enabled():
+    """Returns whether request, agent and database metrics are recorded and served at /metrics."""
+    return os.environ.get("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+def get_llm_concurrency_initial():
+    """Returns the starting limit on in-flight LLM calls per process, before it adapts to errors and successes."""
+    return int(os.environ.get("LLM_CONCURRENCY_INITIAL", 16))
+
+def get_llm_concurrency_min():
+    """Returns the lowest the adaptive LLM concurrency limit can shrink to."""
+    return int(os.environ.get("LLM_CONCURRENCY_MIN", 1))
+
+def get_llm_concurrency_max():
+    """Returns the highest the adaptive LLM concurrency limit can grow to."""
+    return int(os.environ.get("LLM_CONCURRENCY_MAX", 64))
+
+def get_llm_concurrency_backoff():
+    """Returns the factor the LLM concurrency limit is multiplied by when the API reports overload."""
+    return float(os.environ.get("LLM_CONCURRENCY_BACKOFF", 0.5))
+
+def get_llm_retry_budget_ratio():
+    """Returns how many retries each successful LLM call earns for the shared retry budget."""
+    return float(os.environ.get("LLM_RETRY_BUDGET_RATIO", 0.2))
+
+def get_llm_retry_budget_min_per_second():
+    """Returns how many retries per second the shared retry budget allows regardless of traffic."""
+    return float(os.environ.get("LLM_RETRY_BUDGET_MIN_PER_SECOND", 1.0))
+
+def get_llm_hedging_enabled():
+    """Returns whether slow task agent calls are hedged with a duplicate call."""
+    return os.environ.get("LLM_HEDGING_ENABLED", "false").lower() in ("1", "true", "yes")
+
+def get_llm_hedge_percentile():
+    """Returns the percentile of an agent's recent latency after which its call is hedged."""
+    return float(os.environ.get("LLM_HEDGE_PERCENTILE", 95))
+
+def get_llm_hedge_max_rate():
+    """Returns the largest fraction of agent calls that may be hedged."""
+    return float(os.environ.get("LLM_HEDGE_MAX_RATE", 0.05))
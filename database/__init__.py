@@ -1,6 +1,9 @@
 from .connection import engine, SessionLocal, Base
-from .models import User, Task
+from .models import User, Task, TaskTombstone, LLMCacheEntry, LoginAttempt, TaskJob
+from .executor import run_in_db_executor
 
 def init_db():
+    from .migrate import migrate
     Base.metadata.create_all(bind=engine)
+    migrate(bind=engine)
     print("✅ Database initialized (tables created if not exist).")
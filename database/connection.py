@@ -1,8 +1,70 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import declarative_base, sessionmaker
+import config
 
-DATABASE_URL = "sqlite:///task_management.db"
+DATABASE_URL = config.get_database_url()
 
-engine = create_engine(DATABASE_URL)
+def _is_sqlite(url):
+    return make_url(url).get_backend_name() == "sqlite"
+
+def _is_sqlite_memory(url):
+    return _is_sqlite(url) and make_url(url).database in (None, "", ":memory:")
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tunes every new SQLite connection for concurrent web traffic."""
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers proceed while a writer commits; NORMAL sync is durable under WAL except on power loss
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    # Wait for the write lock instead of failing immediately with "database is locked"
+    cursor.execute(f"PRAGMA busy_timeout={config.get_sqlite_busy_timeout_ms()}")
+    cursor.execute(f"PRAGMA mmap_size={config.get_sqlite_mmap_size()}")
+    # Negative cache_size is in KiB rather than pages
+    cursor.execute(f"PRAGMA cache_size=-{config.get_sqlite_cache_size_kb()}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+def engine_options(url=DATABASE_URL):
+    """Returns the create_engine keyword arguments shared by the sync and async engines."""
+    if not _is_sqlite(url):
+        return {"pool_size": config.get_db_pool_size(), "max_overflow": config.get_db_max_overflow(), "pool_pre_ping": True}
+    options = {"connect_args": {"check_same_thread": False}}
+    if not _is_sqlite_memory(url):
+        options["pool_size"] = config.get_db_pool_size()
+        options["max_overflow"] = config.get_db_max_overflow()
+    return options
+
+def create_db_engine(url=DATABASE_URL):
+    """Creates a pooled engine; SQLite connections get the WAL/busy-timeout/cache pragmas."""
+    engine = create_engine(url, **engine_options(url))
+    if _is_sqlite(url):
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+    return engine
+
+def _async_url(url):
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.get_driver_name() != "aiosqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url
+
+_async_engine = None
+
+def get_async_engine():
+    """
+    Returns the process-wide AsyncEngine for the same database, created on first use.
+
+    It shares DATABASE_URL, pool settings and pragmas with `engine` and is
+    used by components that need asyncio access (e.g. the ADK session service).
+    """
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        _async_engine = create_async_engine(_async_url(DATABASE_URL), **engine_options(DATABASE_URL))
+        if _is_sqlite(DATABASE_URL):
+            event.listen(_async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return _async_engine
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
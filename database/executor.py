@@ -0,0 +1,26 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import config
+
+_executor = None
+
+def get_db_executor():
+    """Returns the process-wide thread pool used for blocking database calls."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=config.get_db_executor_workers(), thread_name_prefix="db")
+    return _executor
+
+async def run_in_db_executor(func, *args, **kwargs):
+    """
+    Runs a synchronous database function on the DB thread pool and awaits it.
+
+    Keeps blocking SQLAlchemy calls off the event loop so they don't stall
+    other requests' in-flight LLM calls. The pool is sized to the connection
+    pool, so queued calls wait for a thread instead of a connection.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_db_executor(), functools.partial(context.run, func, *args, **kwargs))
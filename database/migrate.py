@@ -0,0 +1,179 @@
+"""
+Schema migrations for the task management database.
+
+The schema version is kept in SQLite's `PRAGMA user_version`. Each migration
+runs in a single `BEGIN IMMEDIATE` transaction, so readers keep working while
+it runs and a failed migration leaves the database untouched. For small
+databases the write lock is held for well under a second.
+
+Usage:
+    python -m database.migrate            # apply pending migrations
+    python -m database.migrate --dry-run  # list pending migrations
+"""
+import argparse
+from .connection import engine, Base
+from . import models  # noqa: F401 (registers the tables on Base.metadata)
+
+
+def _columns(cursor, table):
+    return {row[1]: row[2].upper() for row in cursor.execute(f"PRAGMA table_info({table})")}
+
+
+def _typed_task_levels(cursor):
+    """Stores task importance/priority as integers and adds the listing indexes."""
+    columns = _columns(cursor, "tasks")
+    if columns.get("importance") != "INTEGER" or columns.get("priority") != "INTEGER":
+        # SQLite can't change a column type in place, so rebuild the table
+        cursor.execute("""
+            CREATE TABLE tasks_new (
+                id INTEGER NOT NULL PRIMARY KEY,
+                title VARCHAR,
+                description VARCHAR,
+                assign_by VARCHAR,
+                assignee VARCHAR,
+                importance INTEGER,
+                priority INTEGER,
+                deadline DATETIME,
+                suggestions VARCHAR,
+                status VARCHAR,
+                updated_at DATETIME,
+                created_at DATETIME
+            )
+        """)
+        # Values outside 1-5 (or non-numeric) fall back to the workflow default of 3
+        cursor.execute("""
+            INSERT INTO tasks_new (id, title, description, assign_by, assignee, importance, priority,
+                                   deadline, suggestions, status, updated_at, created_at)
+            SELECT id, title, description, assign_by, assignee,
+                   CASE WHEN CAST(importance AS INTEGER) BETWEEN 1 AND 5 THEN CAST(importance AS INTEGER) ELSE 3 END,
+                   CASE WHEN CAST(priority AS INTEGER) BETWEEN 1 AND 5 THEN CAST(priority AS INTEGER) ELSE 3 END,
+                   deadline, suggestions, status, updated_at, created_at
+            FROM tasks
+        """)
+        cursor.execute("DROP TABLE tasks")
+        cursor.execute("ALTER TABLE tasks_new RENAME TO tasks")
+
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_tasks_id ON tasks (id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_tasks_title ON tasks (title)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_tasks_assignee_status_deadline ON tasks (assignee, status, deadline)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_tasks_assignee_created_at ON tasks (assignee, created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_tasks_assign_by_created_at ON tasks (assign_by, created_at)")
+
+
+def _task_updated_at_index(cursor):
+    """Indexes tasks.updated_at so the listing version token is an index lookup."""
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_tasks_updated_at ON tasks (updated_at)")
+
+
+def _task_tombstones(cursor):
+    """Records deleted tasks in task_tombstones so the change feed can report deletions."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS task_tombstones (
+            task_id INTEGER NOT NULL PRIMARY KEY,
+            assignee VARCHAR,
+            assign_by VARCHAR,
+            deleted_at DATETIME
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_task_tombstones_deleted_at ON task_tombstones (deleted_at)")
+    # Triggers catch every delete, including ones made outside the application.
+    # Timestamps are padded to microseconds to match how SQLAlchemy stores DateTime.
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tr_tasks_tombstone AFTER DELETE ON tasks
+        BEGIN
+            INSERT OR REPLACE INTO task_tombstones (task_id, assignee, assign_by, deleted_at)
+            VALUES (OLD.id, OLD.assignee, OLD.assign_by, strftime('%Y-%m-%d %H:%M:%f', 'now') || '000');
+        END
+    """)
+    # SQLite may reuse the id of a deleted task; a new task must not look deleted
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tr_tasks_clear_tombstone AFTER INSERT ON tasks
+        BEGIN
+            DELETE FROM task_tombstones WHERE task_id = NEW.id;
+        END
+    """)
+
+
+def _task_job_heartbeat(cursor):
+    """Adds task_jobs.heartbeat_at, refreshed while a job runs so long jobs aren't requeued."""
+    if "heartbeat_at" not in _columns(cursor, "task_jobs"):
+        cursor.execute("ALTER TABLE task_jobs ADD COLUMN heartbeat_at DATETIME")
+
+
+# (version, description, function). Append new migrations at the end; never reorder.
+MIGRATIONS = [
+    (1, "Store task importance/priority as integers and add listing indexes", _typed_task_levels),
+    (2, "Index tasks.updated_at", _task_updated_at_index),
+    (3, "Add task tombstones for the change feed", _task_tombstones),
+    (4, "Add a heartbeat to task jobs", _task_job_heartbeat),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_version(bind=engine):
+    with bind.connect() as connection:
+        return connection.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def pending_migrations(bind=engine):
+    version = get_version(bind)
+    return [m for m in MIGRATIONS if m[0] > version]
+
+
+def migrate(bind=engine, verbose=True):
+    """
+    Creates missing tables and applies pending migrations in order.
+
+    Returns the list of applied migration versions.
+    """
+    Base.metadata.create_all(bind=bind)
+    applied = []
+    raw = bind.raw_connection()
+    try:
+        connection = raw.driver_connection
+        # Manage transactions explicitly; pysqlite's implicit ones don't cover DDL
+        previous_isolation = connection.isolation_level
+        connection.isolation_level = None
+        cursor = connection.cursor()
+        try:
+            for version, description, apply in MIGRATIONS:
+                cursor.execute("BEGIN IMMEDIATE")
+                try:
+                    # Re-check under the write lock in case another process just migrated
+                    if cursor.execute("PRAGMA user_version").fetchone()[0] >= version:
+                        cursor.execute("ROLLBACK")
+                        continue
+                    apply(cursor)
+                    cursor.execute(f"PRAGMA user_version = {int(version)}")
+                    cursor.execute("COMMIT")
+                except Exception:
+                    cursor.execute("ROLLBACK")
+                    raise
+                applied.append(version)
+                if verbose:
+                    print(f"✅ Applied migration {version}: {description}")
+        finally:
+            cursor.close()
+            connection.isolation_level = previous_isolation
+    finally:
+        raw.close()
+    return applied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upgrade the task management database schema in place.")
+    parser.add_argument("--dry-run", action="store_true", help="List pending migrations without applying them.")
+    args = parser.parse_args()
+
+    print(f"Database: {engine.url}")
+    print(f"Current schema version: {get_version()} (latest: {LATEST_VERSION})")
+    if args.dry_run:
+        for version, description, _ in pending_migrations():
+            print(f"  pending {version}: {description}")
+        return
+    if not migrate():
+        print("Schema is up to date.")
+
+
+if __name__ == "__main__":
+    main()
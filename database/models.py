@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, Float, String, DateTime, Index
 from datetime import datetime
 from .connection import Base
 
@@ -14,16 +14,71 @@ class User(Base):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # "Assigned to me" listings, filtered by status and sorted by deadline or creation time
+        Index("ix_tasks_assignee_status_deadline", "assignee", "status", "deadline"),
+        Index("ix_tasks_assignee_created_at", "assignee", "created_at"),
+        # "Assigned by me" listings
+        Index("ix_tasks_assign_by_created_at", "assign_by", "created_at"),
+        # max(updated_at) for the listing ETag
+        Index("ix_tasks_updated_at", "updated_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     description = Column(String)
     assign_by = Column(String)  # User ID
     assignee = Column(String)   # User ID
-    importance = Column(String) # between 1-5 
-    priority = Column(String)   # between 1-5
+    importance = Column(Integer) # between 1-5 
+    priority = Column(Integer)   # between 1-5
     deadline = Column(DateTime)
     suggestions = Column(String)
     status = Column(String, default="open")
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+class TaskTombstone(Base):
+    __tablename__ = "task_tombstones"
+
+    # Written by the tr_tasks_tombstone trigger (see database/migrate.py) whenever a task is deleted
+    task_id = Column(Integer, primary_key=True)
+    assignee = Column(String)
+    assign_by = Column(String)
+    deleted_at = Column(DateTime, index=True)
+
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache"
+
+    key = Column(String, primary_key=True)  # sha256 of agent, model, instruction and prompt
+    agent_name = Column(String, index=True)
+    response = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, index=True)
+
+class LoginAttempt(Base):
+    __tablename__ = "login_attempts"
+
+    key = Column(String, primary_key=True)  # normalized email
+    count = Column(Integer, default=0)
+    last_attempt = Column(Float, index=True)  # unix timestamp of the latest failure
+
+class TaskJob(Base):
+    __tablename__ = "task_jobs"
+    __table_args__ = (
+        # Lets clients retry POST /api/tasks safely with the same Idempotency-Key
+        Index("ix_task_jobs_user_idempotency_key", "user_id", "idempotency_key", unique=True),
+        Index("ix_task_jobs_status_created_at", "status", "created_at"),
+    )
+
+    id = Column(String, primary_key=True)
+    user_id = Column(String, index=True)
+    description = Column(String)
+    idempotency_key = Column(String, nullable=True)
+    status = Column(String, default="queued")  # queued, running, done, failed
+    result = Column(String, nullable=True)     # JSON of the workflow result
+    error = Column(String, nullable=True)
+    attempts = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)  # refreshed while a worker runs the job
+    finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,288 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+import config
+from database import SessionLocal, TaskJob, run_in_db_executor
+
+JOB_STATUSES = ("queued", "running", "done", "failed")
+
+class QueueFullException(Exception):
+    pass
+
+def _serialize_job(job):
+    return {
+        "id": job.id,
+        "status": job.status,
+        "description": job.description,
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error,
+        "created_at": job.created_at.strftime("%Y-%m-%d %H:%M:%S") if job.created_at else None,
+        "started_at": job.started_at.strftime("%Y-%m-%d %H:%M:%S") if job.started_at else None,
+        "finished_at": job.finished_at.strftime("%Y-%m-%d %H:%M:%S") if job.finished_at else None,
+    }
+
+def enqueue_job(user_id, description, idempotency_key=None, max_pending=None):
+    """
+    Persists a new task creation job and returns it.
+
+    If the user already submitted a job with the same idempotency key, that
+    job is returned instead of creating a duplicate.
+    """
+    max_pending = config.get_job_queue_max_pending() if max_pending is None else max_pending
+    with SessionLocal() as db:
+        if idempotency_key:
+            existing = db.query(TaskJob).filter(TaskJob.user_id == user_id, TaskJob.idempotency_key == idempotency_key).first()
+            if existing:
+                return _serialize_job(existing)
+
+        if max_pending > 0 and db.query(TaskJob).filter(TaskJob.status == "queued").count() >= max_pending:
+            raise QueueFullException("Task queue is full. Please try again later.")
+
+        job = TaskJob(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            description=description,
+            idempotency_key=idempotency_key,
+            status="queued",
+            created_at=datetime.utcnow()
+        )
+        db.add(job)
+        try:
+            db.commit()
+        except IntegrityError:
+            # A concurrent retry with the same key won the race
+            db.rollback()
+            existing = db.query(TaskJob).filter(TaskJob.user_id == user_id, TaskJob.idempotency_key == idempotency_key).first()
+            return _serialize_job(existing)
+        return _serialize_job(job)
+
+def get_job(job_id, user_id):
+    """Returns the job if it belongs to the user, otherwise None."""
+    with SessionLocal() as db:
+        job = db.query(TaskJob).filter(TaskJob.id == job_id, TaskJob.user_id == user_id).first()
+        return _serialize_job(job) if job else None
+
+def claim_next_job():
+    """
+    Atomically moves the oldest queued job to 'running' and returns (id, user_id, description, attempts).
+
+    The conditional UPDATE makes claiming safe when several worker processes
+    poll the same table. `attempts` identifies this run of the job to
+    `heartbeat_job`, `finish_job` and `release_job`. Returns None when nothing
+    is queued.
+    """
+    with SessionLocal() as db:
+        while True:
+            job = db.query(TaskJob).filter(TaskJob.status == "queued").order_by(TaskJob.created_at).first()
+            if not job:
+                return None
+            now = datetime.utcnow()
+            attempts = (job.attempts or 0) + 1
+            claimed = db.query(TaskJob)\
+                .filter(TaskJob.id == job.id, TaskJob.status == "queued", TaskJob.attempts == job.attempts)\
+                .update({"status": "running", "started_at": now, "heartbeat_at": now, "attempts": attempts},
+                        synchronize_session=False)
+            db.commit()
+            if claimed:
+                return job.id, job.user_id, job.description, attempts
+
+def _this_run(job_id, attempts):
+    return TaskJob.id == job_id, TaskJob.status == "running", TaskJob.attempts == attempts
+
+def heartbeat_job(job_id, attempts):
+    """Marks this run of the job as alive. Returns False if it was requeued or finished meanwhile."""
+    with SessionLocal() as db:
+        updated = db.query(TaskJob).filter(*_this_run(job_id, attempts))\
+            .update({"heartbeat_at": datetime.utcnow()}, synchronize_session=False)
+        db.commit()
+        return bool(updated)
+
+def finish_job(job_id, attempts, result=None, error=None):
+    """
+    Records the outcome of this run of the job.
+
+    Returns False, recording nothing, if the job was requeued (and possibly
+    claimed again) since this run claimed it.
+    """
+    with SessionLocal() as db:
+        updated = db.query(TaskJob).filter(*_this_run(job_id, attempts)).update({
+            "status": "failed" if error else "done",
+            "result": json.dumps(result) if result is not None else None,
+            "error": error,
+            "finished_at": datetime.utcnow()
+        }, synchronize_session=False)
+        db.commit()
+        return bool(updated)
+
+def release_job(job_id, attempts):
+    """Puts a job this process stopped running back in the queue, without counting the interrupted attempt."""
+    with SessionLocal() as db:
+        db.query(TaskJob).filter(*_this_run(job_id, attempts))\
+            .update({"status": "queued", "started_at": None, "heartbeat_at": None, "attempts": attempts - 1},
+                    synchronize_session=False)
+        db.commit()
+
+def requeue_stale_jobs(stale_seconds=None, max_attempts=None):
+    """
+    Puts 'running' jobs back in the queue if their heartbeat stopped too long ago.
+
+    Workers refresh the heartbeat of the jobs they run, so only jobs whose
+    worker process died mid-workflow go stale; this lets them run again. A job that has already been started `max_attempts`
+    times is marked failed instead, so one that keeps crashing its worker
+    isn't requeued forever.
+
+    Returns:
+        tuple: (number requeued, number failed)
+    """
+    stale_seconds = config.get_job_stale_seconds() if stale_seconds is None else stale_seconds
+    max_attempts = config.get_job_max_attempts() if max_attempts is None else max_attempts
+    now = datetime.utcnow()
+    # Jobs claimed before the heartbeat column existed only have started_at
+    last_seen = func.coalesce(TaskJob.heartbeat_at, TaskJob.started_at)
+    stale = (TaskJob.status == "running", last_seen < now - timedelta(seconds=stale_seconds))
+    with SessionLocal() as db:
+        failed = db.query(TaskJob)\
+            .filter(*stale, TaskJob.attempts >= max_attempts)\
+            .update({"status": "failed", "error": f"Abandoned after {max_attempts} attempts.", "finished_at": now},
+                    synchronize_session=False)
+        requeued = db.query(TaskJob)\
+            .filter(*stale)\
+            .update({"status": "queued", "started_at": None, "heartbeat_at": None}, synchronize_session=False)
+        db.commit()
+        return requeued, failed
+
+
+class TaskJobQueue:
+    """
+    Runs queued task creation jobs on a bounded pool of asyncio workers.
+
+    Jobs live in the `task_jobs` table, so anything still queued when the
+    process stops is picked up after a restart, and jobs running when it stops
+    are put back in the queue. Running jobs get a heartbeat every
+    `heartbeat_interval` seconds; jobs whose heartbeat stopped (their process
+    died) are requeued every `requeue_interval` seconds once they are stale. Workers are woken immediately by `enqueue` and
+    otherwise poll the table, which also lets them pick up jobs enqueued by
+    other worker processes.
+    """
+    def __init__(self, run_job, workers=None, poll_interval=None, requeue_interval=None, heartbeat_interval=None):
+        """
+        Args:
+            run_job: async callable (user_id, description) -> JSON-serializable result.
+            workers (int): Number of concurrent jobs.
+            poll_interval (float): Seconds between table polls when idle.
+            requeue_interval (float): Seconds between checks for abandoned jobs.
+            heartbeat_interval (float): Seconds between heartbeats of a running job.
+        """
+        self.run_job = run_job
+        self.workers = workers or config.get_job_queue_workers()
+        self.poll_interval = poll_interval or config.get_job_queue_poll_interval()
+        self.requeue_interval = requeue_interval or config.get_job_requeue_interval()
+        self.heartbeat_interval = heartbeat_interval or config.get_job_heartbeat_interval()
+        self._wakeup = None
+        self._tasks = []
+
+    async def enqueue(self, user_id, description, idempotency_key=None):
+        job = await run_in_db_executor(enqueue_job, user_id, description, idempotency_key)
+        if self._wakeup:
+            self._wakeup.set()
+        return job
+
+    async def get(self, job_id, user_id):
+        return await run_in_db_executor(get_job, job_id, user_id)
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        await self._requeue_stale()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._requeue_loop()))
+        print(f"✅ Task job queue started with {self.workers} workers.")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _requeue_stale(self):
+        try:
+            requeued, failed = await run_in_db_executor(requeue_stale_jobs)
+        except Exception as e:
+            print(f"Warning: Could not requeue interrupted task jobs: {e}")
+            return
+        if failed:
+            print(f"Warning: Marked {failed} repeatedly interrupted task job(s) as failed.")
+        if requeued:
+            print(f"Requeued {requeued} interrupted task job(s).")
+            self._wakeup.set()
+
+    async def _requeue_loop(self):
+        # Jobs abandoned by a crashed process are picked up without waiting for a restart of this one
+        while True:
+            await asyncio.sleep(self.requeue_interval)
+            await self._requeue_stale()
+
+    async def _worker(self, index):
+        while True:
+            # Clear before claiming so an enqueue racing with an empty claim isn't missed
+            self._wakeup.clear()
+            try:
+                claimed = await run_in_db_executor(claim_next_job)
+            except Exception as e:
+                # e.g. "database is locked"; a worker that died here would shrink the pool until restart
+                print(f"Warning: Task job worker {index} could not claim a job: {e}")
+                await asyncio.sleep(self.poll_interval)
+                continue
+            if not claimed:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            job_id, user_id, description, run = claimed
+            heartbeat = asyncio.create_task(self._heartbeat(job_id, run))
+            try:
+                result = await self.run_job(user_id, description)
+            except asyncio.CancelledError:
+                # Shutting down: hand the job back rather than leave it 'running' until it is stale
+                await self._release(job_id, run)
+                raise
+            except Exception as e:
+                print(f"Task job {job_id} failed: {e}")
+                await self._finish(job_id, run, error=str(e) or type(e).__name__)
+            else:
+                await self._finish(job_id, run, result=result)
+            finally:
+                heartbeat.cancel()
+
+    async def _heartbeat(self, job_id, run):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                if not await run_in_db_executor(heartbeat_job, job_id, run):
+                    print(f"Warning: Task job {job_id} was requeued while this worker was still running it.")
+                    return
+            except Exception as e:
+                # A missed heartbeat is harmless unless they keep failing for JOB_STALE_SECONDS
+                print(f"Warning: Could not refresh the heartbeat of task job {job_id}: {e}")
+
+    async def _release(self, job_id, run):
+        try:
+            await run_in_db_executor(release_job, job_id, run)
+        except Exception as e:
+            print(f"Warning: Could not requeue task job {job_id} on shutdown; it is requeued once stale: {e}")
+
+    async def _finish(self, job_id, run, result=None, error=None, attempts=3):
+        """Records the job's outcome, retrying transient database errors a few times."""
+        for attempt in range(1, attempts + 1):
+            try:
+                if not await run_in_db_executor(finish_job, job_id, run, result=result, error=error):
+                    print(f"Warning: Task job {job_id} was requeued during this run; its outcome is left to the new run.")
+                return
+            except Exception as e:
+                print(f"Warning: Could not record the outcome of task job {job_id} (attempt {attempt}/{attempts}): {e}")
+                if attempt < attempts:
+                    await asyncio.sleep(self.poll_interval)
@@ -1,46 +1,67 @@
 import asyncio
+import functools
 import uuid
 from datetime import datetime, timedelta
-from google.adk.runners import Runner
 from database import init_db
 import config
 from agents import create_root_agent, create_job_description_agent
-from agents.task_agents import TaskCreationWorkflow
+from agents.job_description_agent import job_description_runner_pool
+from agents.llm_limiter import llm_limiter
+from agents.task_agents import TaskCreationWorkflow, BatchTaskCreationWorkflow
+from agents.response_cache import response_cache
 from tools.task_interaction import handle_show_my_tasks
+from tools.candidate_index import build_candidate_index
+from tools.task_tools import purge_task_tombstones
 import session_manager
 import cli
-from google.adk.sessions import InMemorySessionService
-
-# Setup environment
-config.setup_environment()
-
-# Initialize database
-init_db()
-
-# Setup Agent, Session Service, and Runner
-root_agent = create_root_agent()
-job_description_agent = create_job_description_agent()
-
-session_service = session_manager.create_session_service()
-runner = Runner(agent=root_agent, session_service=session_service, app_name="task_management_system")
-job_description_runner = Runner(agent=job_description_agent, session_service=InMemorySessionService(), app_name="job_desc_gen")
-
-print("AI TASK MANAGEMENT SYSTEM")
-print("=" * 60)
-print("\nCommands:")
-print("  /task <description>  - Create a new task with AI assistance")
-print("  /show_my_tasks       - View and manage your tasks interactively")
-print("  /help                - Show this help message")
-print("  /exit or /quit       - Exit the application")
-print("\nExamples:")
-print("  /task Fix the authentication bug in the login module")
-print("  /task Prepare Q4 financial report with charts and analysis")
-print("  What's the weather today?")
-print("=" * 60 + "\n")
+
+def startup():
+    """Prepares the environment and database before the first prompt."""
+    config.setup_environment()
+    init_db()
+    build_candidate_index()
+    response_cache.purge_expired()
+    purge_task_tombstones()
+
+def print_banner():
+    print("AI TASK MANAGEMENT SYSTEM")
+    print("=" * 60)
+    print("\nCommands:")
+    print("  /task <description>  - Create a new task with AI assistance")
+    print("  /task_batch <file>   - Create one task per line of a text file")
+    print("  /show_my_tasks       - View and manage your tasks interactively")
+    print("  /help                - Show this help message")
+    print("  /exit or /quit       - Exit the application")
+    print("\nExamples:")
+    print("  /task Fix the authentication bug in the login module")
+    print("  /task Prepare Q4 financial report with charts and analysis")
+    print("  What's the weather today?")
+    print("=" * 60 + "\n")
+
+# Agents, the Runner and the ADK session service are created on first use, so the
+# login prompt doesn't wait for google.adk to be imported
+@functools.cache
+def get_job_description_agent():
+    return create_job_description_agent()
+
+@functools.cache
+def get_session_service():
+    return session_manager.create_session_service()
+
+@functools.cache
+def get_runner():
+    from google.adk.runners import Runner
+    return Runner(agent=create_root_agent(), session_service=get_session_service(), app_name="task_management_system")
 
 async def generate_job_description(position):
     """Generates a job description using the AI agent."""
-    response = await job_description_runner.run_debug(f"Write a job description for: {position}")
+    prompt = f"Write a job description for: {position}"
+    job_description_agent = get_job_description_agent()
+    cached = response_cache.get(job_description_agent, prompt)
+    if cached is not None:
+        return cached
+
+    response = await job_description_runner_pool.run(job_description_agent, prompt)
     
     # Extract text from response
     texts = []
@@ -51,7 +72,41 @@ async def generate_job_description(position):
                 if hasattr(part, 'text') and part.text:
                     texts.append(part.text)
     
-    return "\n".join(texts).strip()
+    job_description = "\n".join(texts).strip()
+    response_cache.set(job_description_agent, prompt, job_description)
+    return job_description
+
+def read_task_file(path):
+    """Reads one task description per line, skipping blank lines and '#' comments."""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
+
+async def handle_task_batch(user_id, path):
+    """Creates a task for every description in the given file and prints per-item results."""
+    if not path:
+        cli.print_output("Please provide a file path after /task_batch.")
+        return
+    try:
+        descriptions = read_task_file(path)
+    except OSError as e:
+        cli.print_output(f"Could not read '{path}': {e}")
+        return
+    if not descriptions:
+        cli.print_output(f"No task descriptions found in '{path}'.")
+        return
+    max_items = config.get_batch_max_items()
+    if len(descriptions) > max_items:
+        cli.print_output(f"'{path}' has {len(descriptions)} tasks; a batch may contain at most {max_items}.")
+        return
+
+    cli.print_output(f"Creating {len(descriptions)} tasks...")
+    result = await BatchTaskCreationWorkflow(user_id).run(descriptions)
+    for item in result["results"]:
+        if item["status"] == "success":
+            cli.print_output(f"  [{item['index'] + 1}] ✅ '{item['task_title']}' assigned to {item['assignee_name']}")
+        else:
+            cli.print_output(f"  [{item['index'] + 1}] ❌ {item['description']}: {item['error']}")
+    cli.print_output(f"{result['created']} created, {result['failed']} failed.")
 
 async def run_agent():
     """Main function to run the agent after authentication."""
@@ -59,6 +114,7 @@ async def run_agent():
     if not user:
         return
 
+    session_service = get_session_service()
     last_session = session_manager.get_last_session(user.id)
     session_id = None
 
@@ -99,6 +155,10 @@ async def run_agent():
         if not user_input:
             continue
 
+        if user_input.startswith("/task_batch"):
+            await handle_task_batch(user.id, user_input[len("/task_batch"):].strip())
+            continue
+
         if user_input.startswith("/task"):
             task_description = user_input[5:].strip()
             if not task_description:
@@ -121,12 +181,16 @@ async def run_agent():
         if user_input == "/help":
             print("\nCommands:")
             print("  /task <description>  - Create a new task with AI assistance")
+            print("  /task_batch <file>   - Create one task per line of a text file")
             print("  /show_my_tasks       - View and manage your tasks interactively")
             print("  /help                - Show this help message")
             print("  /exit or        - Exit the application")
             continue
 
-        response = await runner.run_debug(f"User {user.first_name} ({user.email}) says: {user_input}", session_id=session_id)
+        runner = get_runner()
+        # Counted against the shared LLM concurrency limit like the pooled agent calls
+        async with llm_limiter.slot(runner.agent.name):
+            response = await runner.run_debug(f"User {user.first_name} ({user.email}) says: {user_input}", session_id=session_id)
         if session:
             session.state['user_id'] = user.id
             await session_service.update_session(session=session)
@@ -135,4 +199,6 @@ async def run_agent():
         cli.print_output("\n".join(texts))
 
 if __name__ == "__main__":
+    startup()
+    print_banner()
     asyncio.run(run_agent())
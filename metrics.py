@@ -0,0 +1,277 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Counters, gauges and histograms live in the module-level `registry` and are served
+by the server at `GET /metrics`. Recording is a dict lookup and a few
+integer additions under a per-metric lock, so instrumentation stays on in
+production. Set METRICS_ENABLED=false to turn recording into a no-op.
+
+Label values must come from small, fixed sets (agent names, function names,
+route templates), never from user input, to keep the number of series bounded.
+"""
+import functools
+import threading
+import time
+from bisect import bisect_left
+import config
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+AGENT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+# Anything else (the method is client-controlled) is labeled "other"
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type = None
+
+    def __init__(self, registry, name, help, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames) or not all(name in labels for name in self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}.")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_series(key, value))
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _render_series(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _render_series(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, registry, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # Per-bucket (non-cumulative) counts, with a final +Inf bucket, then sum
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def time(self, **labels):
+        """Context manager that observes the duration of its block in seconds."""
+        return _Timer(self, labels)
+
+    def count(self, **labels):
+        series = self._values.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def _render_series(self, key, value):
+        counts, total = value
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = 'le="' + _format_value(bound) + '"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    def __init__(self, enabled=None):
+        self.enabled = config.get_metrics_enabled() if enabled is None else enabled
+        self._metrics = {}
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered.")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._register(Counter(self, name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()):
+        return self._register(Gauge(self, name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self, name, help, labelnames, buckets))
+
+    def render(self):
+        """Returns every metric in the Prometheus text format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# Agents (see agents/task_agents.py)
+agent_call_seconds = registry.histogram(
+    "agent_call_duration_seconds", "Duration of LLM agent calls, per attempt.", ("agent", "outcome"), AGENT_BUCKETS)
+agent_retries = registry.counter("agent_retries_total", "Agent calls retried after a transient error.", ("agent",))
+agent_server_errors = registry.counter("agent_server_errors_total", "ServerError responses from the model API.", ("agent", "code"))
+agent_tokens = registry.counter("agent_tokens_total", "Tokens used by agent calls.", ("agent", "kind"))
+agent_hedges = registry.counter(
+    "agent_hedges_total", "Hedged agent calls by which call answered first (won: the hedge).", ("agent", "result"))
+agent_hedges_skipped = registry.counter(
+    "agent_hedges_skipped_total", "Slow agent calls not hedged because of the rate cap or a saturated limiter.", ("agent", "reason"))
+deadline_parser_results = registry.counter(
+    "deadline_parser_total", "Task descriptions whose deadline was (hit) or wasn't (miss) resolved without the deadline agent.",
+    ("result",))
+
+# LLM concurrency limiter and retry budget (see agents/llm_limiter.py)
+llm_concurrency_limit = registry.gauge("llm_concurrency_limit", "Current adaptive limit on in-flight LLM calls.")
+llm_in_flight = registry.gauge("llm_in_flight", "LLM calls currently in flight.")
+llm_queue_wait_seconds = registry.histogram(
+    "llm_queue_wait_seconds", "Time LLM calls waited for a concurrency slot.", ("agent",))
+llm_retry_budget_exhausted = registry.counter(
+    "llm_retry_budget_exhausted_total", "Retries refused because the shared retry budget was empty.")
+
+# Database (see tools/task_tools.py)
+db_query_seconds = registry.histogram(
+    "db_query_duration_seconds", "Duration of task database functions.", ("function",), DB_BUCKETS)
+db_query_errors = registry.counter("db_query_errors_total", "Task database functions that raised.", ("function",))
+
+# HTTP (see MetricsMiddleware)
+http_request_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency until the response is complete.", ("method", "route", "status"))
+
+
+def timed_db(fn):
+    """Decorator recording a database function's duration (and failures) under its name."""
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            db_query_errors.inc(function=name)
+            raise
+        finally:
+            db_query_seconds.observe(time.perf_counter() - start, function=name)
+    return wrapper
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency per method, route template and status.
+
+    Routes are labeled by their template ("/api/tasks/jobs/{job_id}") or mount
+    path ("/static"), never by the raw URL; unmatched requests share one label,
+    as do methods outside HTTP_METHODS.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        root_path = scope.get("root_path", "")
+        method = scope["method"] if scope["method"] in HTTP_METHODS else "other"
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_request_seconds.observe(
+                time.perf_counter() - start, method=method, route=self.route_label(scope, root_path), status=status
+            )
+
+    @staticmethod
+    def route_label(scope, root_path):
+        route = getattr(scope.get("route"), "path", None)
+        if route:
+            return route
+        # Mounted apps (static files) don't set "route", but extend root_path by the mount path
+        mount = scope.get("root_path", "")[len(root_path):]
+        return mount or "unmatched"
@@ -1,39 +1,74 @@
-from fastapi import FastAPI, HTTPException, Depends, Request, status
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
+from datetime import datetime, timezone
+from contextlib import asynccontextmanager
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.middleware.sessions import SessionMiddleware
-from database.models import User
 from tools import auth
-from tools.task_tools import get_all_tasks, update_task_status
-from agents.task_agents import TaskCreationWorkflow
+from tools.task_tools import (query_tasks_async, update_task_status_async, update_task_statuses_async, get_tasks_version_async,
+                              get_task_changes_async, changes_cursor_now, purge_task_tombstones, iter_tasks_ndjson,
+                              iter_tasks_csv)
+from agents.task_agents import TaskCreationWorkflow, BatchTaskCreationWorkflow
+from agents.response_cache import response_cache
+from job_queue import TaskJobQueue, QueueFullException
+from static_assets import PrecompressedStaticFiles, prepare_static_assets
+import metrics
 import uvicorn
-import os
+import json
+import asyncio
+import hashlib
+from email.utils import format_datetime
 import config
 from database import init_db
+from tools.candidate_index import build_candidate_index
 
 import logging
 
-# Setup environment
-config.setup_environment()
-init_db()
-
-# Configure logging
-logging.basicConfig(
-    filename='app.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+async def run_task_job(user_id, description):
+    workflow = TaskCreationWorkflow(user_id)
+    return await workflow.run(description)
+
+job_queue = TaskJobQueue(run_task_job)
+
+def startup():
+    """Prepares the environment, database and static assets before the first request."""
+    logging.basicConfig(
+        filename='app.log',
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    config.setup_environment()
+    init_db()
+    build_candidate_index()
+    response_cache.purge_expired()
+    purge_task_tombstones()
+    prepare_static_assets()
+
+@asynccontextmanager
+async def lifespan(app):
+    # Runs at worker startup rather than at import time, so merely importing the app stays cheap
+    startup()
+    if config.get_task_job_queue_enabled():
+        await job_queue.start()
+    yield
+    await job_queue.stop()
+
+app = FastAPI(lifespan=lifespan)
 
 # Add session middleware
 app.add_middleware(SessionMiddleware, secret_key="some-random-secret-key")
+# Outermost, so the recorded latency covers every other middleware
+app.add_middleware(metrics.MetricsMiddleware)
 
 # Mount static files
+# Hashed, precompressed build output first; the plain directory serves unbuilt files
+static_dist = PrecompressedStaticFiles()
+app.mount("/static/dist", static_dist, name="static_dist")
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 class LoginRequest(BaseModel):
@@ -51,12 +86,27 @@ class RegisterRequest(BaseModel):
 class TaskRequest(BaseModel):
     description: str
 
+class BatchTaskRequest(BaseModel):
+    descriptions: List[str]
+
 class TaskStatusUpdate(BaseModel):
     status: str
 
+class BulkStatusItem(BaseModel):
+    task_id: int
+    status: str
+
+class BulkStatusUpdate(BaseModel):
+    updates: List[BulkStatusItem]
+
 @app.post("/api/login")
 async def login(request: Request, login_data: LoginRequest):
-    user = auth.authenticate_user(login_data.email, login_data.password)
+    try:
+        user = await auth.authenticate_user_async(login_data.email, login_data.password)
+    except auth.RateLimitException as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except auth.PasswordHashingBusyException as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
@@ -74,7 +124,7 @@ async def logout(request: Request):
 @app.post("/api/register")
 async def register(request: Request, register_data: RegisterRequest):
     try:
-        user = auth.create_user(
+        user = await auth.create_user_async(
             register_data.first_name,
             register_data.last_name,
             register_data.email,
@@ -88,6 +138,8 @@ async def register(request: Request, register_data: RegisterRequest):
         return {"message": "Registration successful", "user": {"name": f"{user.first_name} {user.last_name}", "email": user.email}}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except auth.PasswordHashingBusyException as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
 
 @app.get("/api/me")
 async def get_current_user(request: Request):
@@ -96,12 +148,28 @@ async def get_current_user(request: Request):
         raise HTTPException(status_code=401, detail="Not authenticated")
     return {"id": user_id, "name": request.session.get("user_name"), "email": request.session.get("user_email")}
 
+async def enqueue_task_job(request, user_id, description):
+    """Queues a task creation job and returns the 202 response pointing at its status."""
+    try:
+        job = await job_queue.enqueue(user_id, description, request.headers.get("Idempotency-Key"))
+    except QueueFullException as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    status_url = f"/api/tasks/jobs/{job['id']}"
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job["id"], "status": job["status"], "status_url": status_url},
+        headers={"Location": status_url}
+    )
+
 @app.post("/api/tasks")
 async def create_task(request: Request, task_data: TaskRequest):
     user_id = request.session.get("user_id")
     if not user_id:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
+    if config.get_task_job_queue_enabled():
+        return await enqueue_task_job(request, user_id, task_data.description)
+
     print(f"Creating task for user {user_id}: {task_data.description}")
     try:
         workflow = TaskCreationWorkflow(user_id)
@@ -115,14 +183,256 @@ async def create_task(request: Request, task_data: TaskRequest):
         traceback.print_exc()
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
+@app.post("/api/tasks/batch")
+async def create_tasks_batch(request: Request, batch: BatchTaskRequest):
+    user_id = request.session.get("user_id")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    if not batch.descriptions:
+        raise HTTPException(status_code=400, detail="No task descriptions provided.")
+    max_items = config.get_batch_max_items()
+    if len(batch.descriptions) > max_items:
+        raise HTTPException(status_code=400, detail=f"A batch may contain at most {max_items} tasks.")
+
+    print(f"Creating {len(batch.descriptions)} tasks for user {user_id}")
+    try:
+        return await BatchTaskCreationWorkflow(user_id).run(batch.descriptions)
+    except Exception as e:
+        logger.error(f"Error creating task batch: {e}", exc_info=True)
+        print(f"Error creating task batch: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+# Workflows started by streaming requests; kept referenced so they finish even if the client disconnects
+background_workflows = set()
+
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/api/tasks/stream")
+async def create_task_stream(request: Request, task_data: TaskRequest):
+    """
+    Creates a task and streams each workflow stage's result as Server-Sent Events.
+
+    With TASK_JOB_QUEUE_ENABLED the task is queued instead, exactly as by
+    `POST /api/tasks` (202 with the job's status URL), so streaming clients
+    stay within the queue's bounded workers.
+    """
+    user_id = request.session.get("user_id")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    if config.get_task_job_queue_enabled():
+        return await enqueue_task_job(request, user_id, task_data.description)
+
+    events = asyncio.Queue()
+
+    async def on_progress(event, data):
+        await events.put((event, data))
+
+    async def run_workflow():
+        try:
+            workflow = TaskCreationWorkflow(user_id)
+            await workflow.run(task_data.description, on_progress=on_progress)
+        except Exception as e:
+            logger.error(f"Error creating task: {e}", exc_info=True)
+            print(f"Error creating task: {e}")
+            await events.put(("error", {"detail": "Internal Server Error"}))
+
+    print(f"Creating task (streaming) for user {user_id}: {task_data.description}")
+    # The workflow runs independently of the response, so a closed tab doesn't waste the LLM calls already made
+    workflow_task = asyncio.create_task(run_workflow())
+    background_workflows.add(workflow_task)
+    workflow_task.add_done_callback(background_workflows.discard)
+
+    async def stream():
+        while True:
+            event, data = await events.get()
+            yield format_sse(event, data)
+            if event in ("saved", "error"):
+                break
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/tasks/jobs/{job_id}")
+async def get_task_job(request: Request, job_id: str):
+    user_id = request.session.get("user_id")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    job = await job_queue.get(job_id, user_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+EXPORT_FORMATS = {
+    "ndjson": (iter_tasks_ndjson, "application/x-ndjson"),
+    "csv": (iter_tasks_csv, "text/csv; charset=utf-8"),
+}
+
+@app.get("/api/tasks/export")
+async def export_tasks(
+    request: Request,
+    format: str = "ndjson",
+    assignee: Optional[str] = None,
+    assign_by: Optional[str] = None,
+    status: Optional[str] = None,
+    min_priority: Optional[int] = None,
+    max_priority: Optional[int] = None,
+    min_importance: Optional[int] = None,
+    max_importance: Optional[int] = None,
+    deadline_after: Optional[datetime] = None,
+    deadline_before: Optional[datetime] = None,
+    sort: str = "created_at",
+    order: str = "desc",
+):
+    """
+    Streams every matching task as NDJSON or CSV.
+
+    Takes the same filters as `GET /api/tasks`. Rows are read from the database
+    in fixed-size batches while the response is sent, so memory use doesn't
+    grow with the number of tasks.
+    """
+    user_id = request.session.get("user_id")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid format '{format}'. Expected 'ndjson' or 'csv'.")
+
+    iter_export, media_type = EXPORT_FORMATS[format]
+    try:
+        chunks = iter_export(
+            assignee=assignee, assign_by=assign_by, status=status,
+            min_priority=min_priority, max_priority=max_priority,
+            min_importance=min_importance, max_importance=max_importance,
+            deadline_after=deadline_after, deadline_before=deadline_before,
+            sort=sort, order=order
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Starlette iterates sync generators in a worker thread, keeping the event loop free
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"'}
+    )
+
+@app.get("/api/tasks/changes")
+async def task_changes(
+    request: Request,
+    since: Optional[str] = None,
+    assignee: Optional[str] = None,
+    assign_by: Optional[str] = None,
+    limit: int = 500,
+):
+    """
+    Change feed for client-side task lists.
+
+    Returns tasks created or updated after the `since` cursor and the ids of
+    deleted tasks. Pass the returned `next_since` on the next call, and call
+    again immediately while `has_more` is true.
+    """
+    user_id = request.session.get("user_id")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    try:
+        return await get_task_changes_async(since=since, assignee=assignee, assign_by=assign_by, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def task_list_etag(version, user_id, query):
+    """Builds the listing ETag from the tasks version token, the user and the query string."""
+    last_modified, count = version
+    raw = f"{user_id}|{query}|{last_modified.isoformat() if last_modified else ''}|{count}"
+    return '"' + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32] + '"'
+
+def etag_matches(etag, if_none_match):
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
 @app.get("/api/tasks")
-async def list_tasks(request: Request):
+async def list_tasks(
+    request: Request,
+    response: Response,
+    assignee: Optional[str] = None,
+    assign_by: Optional[str] = None,
+    status: Optional[str] = None,
+    min_priority: Optional[int] = None,
+    max_priority: Optional[int] = None,
+    min_importance: Optional[int] = None,
+    max_importance: Optional[int] = None,
+    deadline_after: Optional[datetime] = None,
+    deadline_before: Optional[datetime] = None,
+    sort: str = "created_at",
+    order: str = "desc",
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    with_total: bool = False,
+):
+    """
+    Lists tasks filtered and sorted in SQL.
+
+    The body is a JSON list of tasks. When `limit` is given the list is one
+    page; the cursor for the next page is returned in the `X-Next-Cursor`
+    header and, with `with_total=true`, the match count in `X-Total-Count`.
+    `X-Changes-Since` is a `GET /api/tasks/changes` cursor for following the
+    listing with deltas.
+
+    Responses carry an `ETag` and `Last-Modified` derived from the tasks
+    table's version token; a matching `If-None-Match` gets a 304 without
+    running the listing query.
+    """
     user_id = request.session.get("user_id")
     if not user_id:
         raise HTTPException(status_code=401, detail="Not authenticated")
-    
-    tasks = get_all_tasks()
-    return tasks
+
+    version = await get_tasks_version_async()
+    validators = {"ETag": task_list_etag(version, user_id, request.url.query), "Cache-Control": "private, no-cache"}
+    if version[0]:
+        validators["Last-Modified"] = format_datetime(version[0].replace(tzinfo=timezone.utc), usegmt=True)
+    if etag_matches(validators["ETag"], request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=validators)
+    response.headers.update(validators)
+    # Taken before the listing is read, so no later change is missed
+    response.headers["X-Changes-Since"] = changes_cursor_now()
+
+    try:
+        page = await query_tasks_async(
+            assignee=assignee, assign_by=assign_by, status=status,
+            min_priority=min_priority, max_priority=max_priority,
+            min_importance=min_importance, max_importance=max_importance,
+            deadline_after=deadline_after, deadline_before=deadline_before,
+            sort=sort, order=order, limit=limit, cursor=cursor, with_total=with_total
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    if page["total"] is not None:
+        response.headers["X-Total-Count"] = str(page["total"])
+    return page["tasks"]
+
+@app.patch("/api/tasks/status")
+async def update_statuses(bulk_update: BulkStatusUpdate, request: Request):
+    user_id = request.session.get("user_id")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    if not bulk_update.updates:
+        raise HTTPException(status_code=400, detail="No status updates provided.")
+
+    try:
+        results = await update_task_statuses_async(
+            [(item.task_id, item.status) for item in bulk_update.updates], user_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    updated = sum(1 for item in results if item["success"])
+    return {"updated": updated, "failed": len(results) - updated, "results": results}
 
 @app.patch("/api/tasks/{task_id}/status")
 async def update_status(task_id: int, status_update: TaskStatusUpdate, request: Request):
@@ -130,7 +440,7 @@ async def update_status(task_id: int, status_update: TaskStatusUpdate, request:
     if not user_id:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    success, message = update_task_status(task_id, status_update.status, user_id)
+    success, message = await update_task_status_async(task_id, status_update.status, user_id)
     if not success:
         if "Permission denied" in message:
              raise HTTPException(status_code=403, detail=message)
@@ -138,10 +448,33 @@ async def update_status(task_id: int, status_update: TaskStatusUpdate, request:
     
     return {"message": message}
 
+@app.get("/api/llm-cache/stats")
+async def llm_cache_stats(request: Request):
+    user_id = request.session.get("user_id")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return response_cache.get_stats()
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus scrape endpoint."""
+    if not metrics.registry.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/")
-async def read_root():
+async def read_root(request: Request):
     from fastapi.responses import FileResponse
-    return FileResponse('static/index.html')
+    try:
+        response = await static_dist.get_response("index.html", request.scope)
+    except StarletteHTTPException as e:
+        if e.status_code != 404:
+            raise
+        # Assets not built yet (`python -m static_assets`); serve the sources unoptimized
+        return FileResponse('static/index.html')
+    # Ask for viewport hints so images can be served at the right width
+    response.headers["accept-ch"] = "Sec-CH-Viewport-Width, Sec-CH-DPR"
+    return response
 
 if __name__ == "__main__":
     uvicorn.run("server:app", host="127.0.0.1", port=8000, reload=True)
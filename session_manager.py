@@ -1,16 +1,20 @@
-from google.adk.sessions import DatabaseSessionService
-from sqlalchemy import create_engine, text
-import database
+from sqlalchemy import text
+import inspect
+from database.connection import engine, get_async_engine, engine_options, DATABASE_URL
 
-def create_session_service(db_url="sqlite:///task_management.db"):
-    """Creates and returns the database session service."""
-    session_service = DatabaseSessionService(db_url)
+def create_session_service():
+    """Creates and returns the database session service on the shared database engine."""
+    from google.adk.sessions import DatabaseSessionService
+    if "db_engine" in inspect.signature(DatabaseSessionService.__init__).parameters:
+        # Newer ADK releases are asyncio-based and accept an existing AsyncEngine
+        session_service = DatabaseSessionService(db_engine=get_async_engine())
+    else:
+        session_service = DatabaseSessionService(DATABASE_URL, **engine_options(DATABASE_URL))
     print("✅ Database Session Service created.")
     return session_service
 
-def get_last_session(user_id, db_url="sqlite:///task_management.db"):
+def get_last_session(user_id):
     """Retrieves the most recent session for the given user."""
-    engine = create_engine(db_url)
     with engine.connect() as connection:
         # Query for the latest session for this user
         result = connection.execute(
@@ -22,9 +26,8 @@ def get_last_session(user_id, db_url="sqlite:///task_management.db"):
             return {"id": result[0], "update_time": result[1]}
     return None
 
-def update_session_user_id(session_id, user_id, db_url="sqlite:///task_management.db"):
+def update_session_user_id(session_id, user_id):
     """Updates the user_id for the given session."""
-    engine = create_engine(db_url)
     with engine.connect() as connection:
         with connection.begin():
             connection.execute(
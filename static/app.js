@@ -26,10 +26,12 @@ const api = {
         if (!response.ok) return null;
         return response.json();
     },
-    createTask: async (description) => {
+    createTask: async (description, idempotencyKey) => {
+        const headers = { 'Content-Type': 'application/json' };
+        if (idempotencyKey) headers['Idempotency-Key'] = idempotencyKey;
         const response = await fetch('/api/tasks', {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
+            headers,
             body: JSON.stringify({ description })
         });
         if (!response.ok) {
@@ -41,11 +43,103 @@ const api = {
                 throw new Error(errorText || 'Failed to create task');
             }
         }
+        if (response.status === 202) {
+            // Queued: poll the job until the workflow finishes
+            const job = await response.json();
+            return api.waitForJob(job.status_url);
+        }
         return response.json();
     },
-    getTasks: async () => {
-        const response = await fetch('/api/tasks');
-        if (!response.ok) return [];
+    waitForJob: async (statusUrl, intervalMs = 1000, timeoutMs = 300000) => {
+        const deadline = Date.now() + timeoutMs;
+        while (Date.now() < deadline) {
+            await new Promise(resolve => setTimeout(resolve, intervalMs));
+            const response = await fetch(statusUrl);
+            if (!response.ok) throw new Error('Failed to check task status');
+            const job = await response.json();
+            if (job.status === 'done') return { message: job.result };
+            if (job.status === 'failed') throw new Error(job.error || 'Failed to create task');
+        }
+        throw new Error('Task is still being created. It will appear in the list when ready.');
+    },
+    createTaskStream: async (description, onEvent, idempotencyKey) => {
+        const headers = { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' };
+        if (idempotencyKey) headers['Idempotency-Key'] = idempotencyKey;
+        const response = await fetch('/api/tasks/stream', {
+            method: 'POST',
+            headers,
+            body: JSON.stringify({ description })
+        });
+        if (!response.ok) {
+            const errorText = await response.text();
+            let detail = errorText;
+            try {
+                detail = JSON.parse(errorText).detail || errorText;
+            } catch (e) { /* not JSON */ }
+            throw new Error(detail || 'Failed to create task');
+        }
+        if (response.status === 202) {
+            // The server queues tasks (TASK_JOB_QUEUE_ENABLED), so there are no stage events to stream
+            const job = await response.json();
+            onEvent('queued', job);
+            return api.waitForJob(job.status_url);
+        }
+
+        // Parse the Server-Sent Events stream: blocks of "event:" / "data:" lines separated by a blank line
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const block = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                let event = 'message';
+                let data = '';
+                block.split('\n').forEach(line => {
+                    if (line.startsWith('event:')) event = line.slice(6).trim();
+                    else if (line.startsWith('data:')) data += line.slice(5).trim();
+                });
+                const payload = data ? JSON.parse(data) : {};
+                if (event === 'error') throw new Error(payload.detail || 'Failed to create task');
+                onEvent(event, payload);
+                if (event === 'saved') return payload;
+            }
+        }
+        throw new Error('Connection closed before the task was saved');
+    },
+    getTasks: async (params = {}) => {
+        const query = new URLSearchParams();
+        Object.entries(params).forEach(([key, value]) => {
+            if (value !== null && value !== undefined && value !== '') query.append(key, value);
+        });
+        const url = `/api/tasks?${query.toString()}`;
+        // Revalidate with the last ETag; a 304 means the cached page is still current
+        const cached = api.taskListCache.get(url);
+        const response = await fetch(url, { headers: cached ? { 'If-None-Match': cached.etag } : {} });
+        if (response.status === 304 && cached) return cached.page;
+        if (!response.ok) return { tasks: [], nextCursor: null, total: 0, changesSince: null };
+        const page = {
+            tasks: await response.json(),
+            nextCursor: response.headers.get('X-Next-Cursor'),
+            total: parseInt(response.headers.get('X-Total-Count') || '0', 10),
+            changesSince: response.headers.get('X-Changes-Since')
+        };
+        const etag = response.headers.get('ETag');
+        if (etag) api.taskListCache.set(url, { etag, page });
+        return page;
+    },
+    taskListCache: new Map(),
+    getTaskChanges: async (params = {}) => {
+        const query = new URLSearchParams();
+        Object.entries(params).forEach(([key, value]) => {
+            if (value !== null && value !== undefined && value !== '') query.append(key, value);
+        });
+        const response = await fetch(`/api/tasks/changes?${query.toString()}`);
+        if (!response.ok) throw new Error('Failed to load tasks');
         return response.json();
     },
     updateStatus: async (taskId, status) => {
@@ -91,10 +185,15 @@ const app = {
     currentPage: 1,
     itemsPerPage: 6,
     currentTab: 'assigned_to_me',
+    // pageCursors[i] is the cursor that loads page i + 1 (keyset pagination)
+    pageCursors: [null],
+    // The page on screen; reloading the same page patches it from the change feed
+    loadedPage: null,
 
     switchTab: (tab) => {
         app.currentTab = tab;
         app.currentPage = 1; // Reset to first page
+        app.pageCursors = [null];
 
         // Update UI
         const assignedToMeBtn = document.getElementById('tab-assigned-to-me');
@@ -117,28 +216,54 @@ const app = {
         app.loadTasks();
     },
 
-    loadTasks: async () => {
-        const allTasks = await api.getTasks();
+    patchLoadedPage: async (page, filter) => {
+        // Returns the page with changes since it was loaded applied, or null if they don't fit in place
+        const changes = await api.getTaskChanges({ ...filter, since: page.changesSince, limit: app.itemsPerPage });
+        const onPage = new Set(page.tasks.map(task => task.id));
+        // New, deleted or other pages' tasks shift the page, so those need a fresh listing
+        if (changes.full || changes.has_more || changes.deleted.length ||
+            changes.tasks.some(task => !onPage.has(task.id))) {
+            return null;
+        }
+        const changed = new Map(changes.tasks.map(task => [task.id, task]));
+        return {
+            ...page,
+            tasks: page.tasks.map(task => changed.get(task.id) || task),
+            changesSince: changes.next_since
+        };
+    },
 
-        // Filter tasks based on current tab
-        const tasks = allTasks.filter(task => {
-            if (app.currentTab === 'assigned_to_me') {
-                return task.assignee == app.user.id;
-            } else {
-                return task.assign_by == app.user.id;
+    loadTasks: async () => {
+        // Filtering and pagination happen on the server; only the visible page is fetched
+        const filter = app.currentTab === 'assigned_to_me' ? { assignee: app.user.id } : { assign_by: app.user.id };
+        const params = {
+            ...filter,
+            limit: app.itemsPerPage,
+            cursor: app.pageCursors[app.currentPage - 1],
+            with_total: true
+        };
+        const key = JSON.stringify(params);
+        let page = null;
+        if (app.loadedPage && app.loadedPage.key === key && app.loadedPage.changesSince) {
+            try {
+                page = await app.patchLoadedPage(app.loadedPage, filter);
+            } catch (err) {
+                console.error('Failed to sync tasks:', err);
             }
-        });
+        }
+        if (!page) {
+            page = { ...(await api.getTasks(params)), key };
+        }
+        app.loadedPage = page;
+        const { tasks, nextCursor, total } = page;
+        app.pageCursors[app.currentPage] = nextCursor;
 
         const taskList = document.getElementById('task-list');
         taskList.innerHTML = '';
 
-        // Pagination Logic
-        const startIndex = (app.currentPage - 1) * app.itemsPerPage;
-        const endIndex = startIndex + app.itemsPerPage;
-        const paginatedTasks = tasks.slice(startIndex, endIndex);
-        const totalPages = Math.ceil(tasks.length / app.itemsPerPage);
+        const totalPages = Math.ceil(total / app.itemsPerPage);
 
-        paginatedTasks.forEach(task => {
+        tasks.forEach(task => {
             const div = document.createElement('div');
             div.className = 'bg-white p-6 rounded-xl shadow-md hover:shadow-lg transition duration-200 border border-gray-100 cursor-pointer';
             div.onclick = () => app.openModal(task);
@@ -302,8 +427,9 @@ const app = {
             true
         ));
 
-        // Page Numbers
-        for (let i = 1; i <= totalPages; i++) {
+        // Page Numbers (only pages whose cursor is known can be jumped to)
+        const reachablePages = Math.min(totalPages, app.pageCursors.filter((c, i) => i === 0 || c).length);
+        for (let i = 1; i <= reachablePages; i++) {
             nav.appendChild(createButton(
                 i,
                 () => {
@@ -324,12 +450,12 @@ const app = {
                 <path fill-rule="evenodd" d="M7.21 14.77a.75.75 0 01.02-1.06L11.168 10 7.23 6.29a.75.75 0 111.04-1.08l4.5 4.25a.75.75 0 010 1.08l-4.5 4.25a.75.75 0 01-1.06-.02z" clip-rule="evenodd" />
             </svg>`,
             () => {
-                if (app.currentPage < totalPages) {
+                if (app.pageCursors[app.currentPage]) {
                     app.currentPage++;
                     app.loadTasks();
                 }
             },
-            app.currentPage === totalPages,
+            !app.pageCursors[app.currentPage],
             false,
             false,
             true,
@@ -348,6 +474,32 @@ const app = {
         if (importance >= 3) return 'bg-blue-100 text-blue-800';
         return 'bg-gray-100 text-gray-800';
     },
+    resetTaskProgress: () => {
+        const list = document.getElementById('task-progress');
+        list.querySelectorAll('li').forEach(item => {
+            item.querySelector('.stage-state').textContent = '…';
+            item.querySelector('.stage-value').textContent = '';
+        });
+        list.classList.remove('hidden');
+    },
+    showTaskProgress: (event, data) => {
+        if (event === 'queued') {
+            document.getElementById('task-progress').classList.add('hidden');
+            return;
+        }
+        const item = document.querySelector(`#task-progress li[data-stage="${event}"]`);
+        if (!item) return;
+        const values = {
+            deadline: () => data.deadline,
+            assignee: () => data.assignee_name,
+            details: () => data.title,
+            priority: () => `P${data.priority} / I${data.importance}`,
+            suggestions: () => data.suggestions,
+            saved: () => ''
+        };
+        item.querySelector('.stage-state').textContent = '✓';
+        item.querySelector('.stage-value').textContent = values[event]();
+    },
     showToast: (message, type = 'success') => {
         const container = document.getElementById('toast-container');
         const toast = document.createElement('div');
@@ -447,9 +599,19 @@ document.addEventListener('DOMContentLoaded', () => {
         button.textContent = 'Creating...';
 
         try {
-            await api.createTask(description);
+            const idempotencyKey = window.crypto && crypto.randomUUID ? crypto.randomUUID() : null;
+            if (window.ReadableStream && window.TextDecoder) {
+                // Show each stage's result as soon as it is ready
+                app.resetTaskProgress();
+                await api.createTaskStream(description, app.showTaskProgress, idempotencyKey);
+            } else {
+                await api.createTask(description, idempotencyKey);
+            }
             e.target.reset();
             app.showToast('Task created successfully');
+            // New tasks sort first, so go back to the first page
+            app.currentPage = 1;
+            app.pageCursors = [null];
             app.loadTasks();
         } catch (err) {
             app.showToast(err.message, 'error');
@@ -0,0 +1,377 @@
+"""
+Static asset pipeline for the web UI.
+
+`build_static_assets()` copies everything under `static/` to `static/dist/`
+with content-hashed filenames, precompressed gzip/brotli copies of text
+assets and WebP/AVIF/resized variants of images. References to
+`/static/<file>` in HTML, CSS and JS are rewritten to the hashed names, so
+hashed files can be cached forever (`Cache-Control: immutable`).
+
+`PrecompressedStaticFiles` serves the build output and picks the best
+encoding from `Accept-Encoding` and the best image variant from `Accept`
+(and viewport client hints when the browser sends them).
+
+Pillow and brotli are optional. Without Pillow images are only hashed;
+without brotli only gzip copies are built.
+
+Building (brotli at quality 11, AVIF encoding) is CPU-heavy, so it is a
+deploy step; at startup the server only reads the manifest unless
+STATIC_ASSETS_BUILD=auto. A build is written beside `static/dist/` and
+swapped in when complete, under a file lock so that concurrent builds (e.g.
+several workers starting with STATIC_ASSETS_BUILD=auto) run one at a time.
+
+Usage:
+    python -m static_assets    # build static/dist
+"""
+import contextlib
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+import tempfile
+from starlette.datastructures import Headers
+from starlette.staticfiles import StaticFiles
+import config
+
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: builds aren't serialized, but each still swaps in a complete directory
+    fcntl = None
+
+SOURCE_DIR = "static"
+BUILD_DIR = os.path.join("static", "dist")
+MANIFEST_NAME = "manifest.json"
+# Served at "/" under a fixed name, so it must always be revalidated
+UNHASHED_FILES = {"index.html"}
+TEXT_EXTENSIONS = {".html", ".css", ".js", ".svg", ".json", ".txt"}
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg"}
+IMAGE_WIDTHS = (640, 1280, 1920)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+STATIC_REFERENCE_RE = re.compile(r"/static/([\w./-]+)")
+
+
+def _content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def _hashed_name(rel_path, digest, suffix=""):
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{digest}{suffix}{ext}"
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _write_compressed(build_dir, rel_path, data):
+    """Writes .gz/.br copies next to a text asset when they are smaller. Returns the encodings built."""
+    encodings = []
+    compressed = {"gzip": (".gz", gzip.compress(data, compresslevel=9, mtime=0))}
+    if brotli is not None:
+        compressed["br"] = (".br", brotli.compress(data, quality=11))
+    for encoding, (suffix, payload) in compressed.items():
+        if len(payload) < len(data):
+            _write(os.path.join(build_dir, rel_path + suffix), payload)
+            encodings.append(encoding)
+    return encodings
+
+
+def _image_variants(build_dir, source_path, hashed_path):
+    """Builds WebP/AVIF and downscaled copies of an image. Returns manifest variant entries."""
+    if Image is None:
+        return []
+    formats = [("WEBP", ".webp", "image/webp", {"quality": 80, "method": 6})]
+    if features.check("avif"):
+        formats.insert(0, ("AVIF", ".avif", "image/avif", {"quality": 60}))
+
+    variants = []
+    root, source_ext = os.path.splitext(hashed_path)
+    with Image.open(source_path) as original:
+        original.load()
+        source_type = mimetypes.guess_type(source_path)[0]
+        widths = [w for w in IMAGE_WIDTHS if w < original.width] + [original.width]
+        for width in widths:
+            if width == original.width:
+                image, suffix = original, ""
+            else:
+                height = round(original.height * width / original.width)
+                image, suffix = original.resize((width, height), Image.LANCZOS), f"-{width}"
+                # Downscaled copy in the source format, for browsers without WebP/AVIF
+                rel = root + suffix + source_ext
+                image.save(os.path.join(build_dir, rel))
+                variants.append({"path": rel, "type": source_type, "width": width})
+            for pil_format, ext, media_type, options in formats:
+                rel = root + suffix + ext
+                image.save(os.path.join(build_dir, rel), pil_format, **options)
+                variants.append({"path": rel, "type": media_type, "width": width})
+    return variants
+
+
+def _source_files(source_dir, build_dir):
+    """Returns (logical path, full path) for every source file, skipping the build, its staging copies and lock."""
+    source_dir = os.path.abspath(source_dir)
+    build_dir = os.path.abspath(build_dir)
+    build_parent, build_name = os.path.split(build_dir)
+
+    def skipped(root, name):
+        return root == build_parent and (name == build_name or name.startswith(f".{build_name}"))
+
+    sources = []
+    for root, dirs, files in os.walk(source_dir):
+        dirs[:] = [d for d in dirs if not skipped(root, d)]
+        for name in sorted(files):
+            if not skipped(root, name):
+                full = os.path.join(root, name)
+                sources.append((os.path.relpath(full, source_dir).replace(os.sep, "/"), full))
+    return sources
+
+
+@contextlib.contextmanager
+def _build_lock(build_dir):
+    """Holds an exclusive lock on `.dist.lock` next to the build directory."""
+    if fcntl is None:
+        yield
+        return
+    build_parent, build_name = os.path.split(build_dir)
+    os.makedirs(build_parent, exist_ok=True)
+    with open(os.path.join(build_parent, f".{build_name}.lock"), "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _swap_into_place(staging_dir, build_dir):
+    # os.replace can't overwrite a non-empty directory, so the old build is moved aside first
+    old_dir = None
+    if os.path.isdir(build_dir):
+        old_dir = staging_dir + "-old"
+        os.replace(build_dir, old_dir)
+    os.replace(staging_dir, build_dir)
+    if old_dir:
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def _build(sources, build_dir):
+    """Writes the build of `sources` and its manifest into the empty directory `build_dir`."""
+    # Binary assets first and HTML last, so references always point at already-hashed names
+    sources.sort(key=lambda item: (os.path.splitext(item[0])[1] in TEXT_EXTENSIONS, item[0].endswith(".html")))
+
+    manifest = {}
+    source_hashes = {}
+
+    def rewrite(match):
+        entry = manifest.get(match.group(1))
+        return f"/static/dist/{entry['path']}" if entry else match.group(0)
+
+    for rel_path, full in sources:
+        with open(full, "rb") as f:
+            data = f.read()
+        source_hashes[rel_path] = _content_hash(data)
+        ext = os.path.splitext(rel_path)[1].lower()
+        if ext in TEXT_EXTENSIONS:
+            data = STATIC_REFERENCE_RE.sub(rewrite, data.decode("utf-8")).encode("utf-8")
+
+        out_path = rel_path if rel_path in UNHASHED_FILES else _hashed_name(rel_path, _content_hash(data))
+        _write(os.path.join(build_dir, out_path), data)
+        entry = {"path": out_path, "encodings": [], "variants": []}
+        if ext in TEXT_EXTENSIONS:
+            entry["encodings"] = _write_compressed(build_dir, out_path, data)
+        elif ext in IMAGE_EXTENSIONS:
+            entry["variants"] = _image_variants(build_dir, full, out_path)
+        manifest[rel_path] = entry
+
+    with open(os.path.join(build_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump({"sources": source_hashes, "assets": manifest}, f, indent=2)
+    return manifest
+
+
+def build_static_assets(source_dir=SOURCE_DIR, build_dir=BUILD_DIR, verbose=True, force=True):
+    """
+    Builds the hashed, compressed and image-optimized copy of `source_dir`.
+
+    With force=False an up-to-date build (checked after taking the build lock,
+    so a build another process just finished counts) is kept as is.
+
+    Returns the manifest: logical path -> {"path", "encodings", "variants"}.
+    """
+    source_dir = os.path.abspath(source_dir)
+    build_dir = os.path.abspath(build_dir)
+    with _build_lock(build_dir):
+        if not force and not is_stale(source_dir, build_dir):
+            return load_manifest(build_dir)["assets"]
+        if Image is None and verbose:
+            print("Warning: Pillow is not installed; images are served without WebP/AVIF or resized variants.")
+        if brotli is None and verbose:
+            print("Warning: brotli is not installed; text assets are precompressed with gzip only.")
+
+        staging_dir = tempfile.mkdtemp(prefix=f".{os.path.basename(build_dir)}-", dir=os.path.dirname(build_dir))
+        os.chmod(staging_dir, 0o755)  # mkdtemp creates it private to this user
+        try:
+            manifest = _build(_source_files(source_dir, build_dir), staging_dir)
+            _swap_into_place(staging_dir, build_dir)
+        except BaseException:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+
+    if verbose:
+        print(f"✅ Built {len(manifest)} static assets into {build_dir}.")
+    return manifest
+
+
+def load_manifest(build_dir=BUILD_DIR):
+    """Returns the build manifest, or None if the assets haven't been built."""
+    try:
+        with open(os.path.join(build_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_stale(source_dir=SOURCE_DIR, build_dir=BUILD_DIR):
+    """True if the build is missing or any source file was added, removed or changed since."""
+    manifest = load_manifest(build_dir)
+    if manifest is None:
+        return True
+    current = {}
+    for rel_path, full in _source_files(source_dir, build_dir):
+        with open(full, "rb") as f:
+            current[rel_path] = _content_hash(f.read())
+    return current != manifest.get("sources")
+
+
+def prepare_static_assets():
+    """
+    Checks the static build at startup.
+
+    With STATIC_ASSETS_BUILD=off (the default) only the manifest is read; a
+    missing build is reported and `static/` is served unoptimized. With 'auto'
+    a stale build is rebuilt, once across workers starting together.
+    """
+    if config.get_static_assets_build() != "auto":
+        if load_manifest() is None:
+            print("Warning: static assets are not built; run `python -m static_assets` to serve optimized assets.")
+        return
+    if is_stale():
+        build_static_assets(force=False)
+
+
+def parse_accept(value):
+    """Parses an Accept or Accept-Encoding header into {token: q}."""
+    accepted = {}
+    for part in (value or "").split(","):
+        token, _, params = part.strip().partition(";")
+        if not token:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, number = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(number)
+                except ValueError:
+                    q = 0.0
+        accepted[token.strip().lower()] = q
+    return accepted
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    Serves the output of `build_static_assets` with content negotiation.
+
+    Text assets are answered with their brotli or gzip copy when the client
+    accepts it. Images are answered with the smallest acceptable format
+    (AVIF, then WebP) at the narrowest width covering the viewport from the
+    `Sec-CH-Viewport-Width`/`Sec-CH-DPR` client hints, or at full size without
+    hints. Hashed files are marked immutable; everything else is revalidated.
+    """
+    ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+    def __init__(self, directory=BUILD_DIR, **kwargs):
+        super().__init__(directory=directory, check_dir=False, **kwargs)
+        self.build_dir = directory
+        self._manifest = None
+
+    def _assets(self):
+        if self._manifest is None:
+            manifest = load_manifest(self.build_dir) or {}
+            self._manifest = {entry["path"]: entry for entry in manifest.get("assets", {}).values()}
+        return self._manifest
+
+    def negotiate(self, path, headers):
+        """Returns (file to serve, Content-Encoding or None, Vary header or None)."""
+        entry = self._assets().get(path)
+        if not entry:
+            return path, None, None
+
+        if entry["encodings"]:
+            accepted = parse_accept(headers.get("accept-encoding"))
+            for encoding, suffix in self.ENCODINGS:
+                if encoding in entry["encodings"] and accepted.get(encoding, accepted.get("*", 0)) > 0:
+                    return path + suffix, encoding, "Accept-Encoding"
+            return path, None, "Accept-Encoding"
+
+        if entry["variants"]:
+            accepted = parse_accept(headers.get("accept"))
+            original_type = mimetypes.guess_type(path)[0]
+            types = [t for t in ("image/avif", "image/webp") if accepted.get(t, 0) > 0] + [original_type]
+            target = None
+            try:
+                viewport = float(headers.get("sec-ch-viewport-width"))
+                target = viewport * float(headers.get("sec-ch-dpr") or 1)
+            except (TypeError, ValueError):
+                pass
+            full_width = max(v["width"] for v in entry["variants"])
+            candidates = entry["variants"] + [{"path": path, "type": original_type, "width": full_width}]
+            for media_type in types:
+                matching = sorted((v for v in candidates if v["type"] == media_type), key=lambda v: v["width"])
+                if not matching:
+                    continue
+                if target is None:
+                    chosen = matching[-1]
+                else:
+                    chosen = next((v for v in matching if v["width"] >= target), matching[-1])
+                return chosen["path"], None, "Accept, Sec-CH-Viewport-Width, Sec-CH-DPR"
+        return path, None, None
+
+    async def get_response(self, path, scope):
+        headers = Headers(scope=scope)
+        served, encoding, vary = self.negotiate(path.replace(os.sep, "/"), headers)
+        response = await super().get_response(served, scope)
+        if response.status_code in (200, 304):
+            if encoding:
+                response.headers["content-encoding"] = encoding
+                response.headers["content-type"] = self._media_type(path)
+            if vary:
+                response.headers["vary"] = vary
+            hashed = path in self._assets() and os.path.basename(path) not in UNHASHED_FILES
+            response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL if hashed else "no-cache"
+        return response
+
+    @staticmethod
+    def _media_type(path):
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if media_type.startswith("text/") or media_type in ("application/javascript", "image/svg+xml"):
+            media_type += "; charset=utf-8"
+        return media_type
+
+
+if __name__ == "__main__":
+    build_static_assets()
@@ -0,0 +1,72 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tools.candidate_index import CandidateIndex, shortlist_candidates, tokenize, make_shortlister
+
+CANDIDATES = [
+    {"id": "1", "name": "Ann Lee", "position": "Backend Developer", "job_description": "Builds Python APIs and database schemas."},
+    {"id": "2", "name": "Bob Ray", "position": "Accountant", "job_description": "Prepares financial reports and budgets."},
+    {"id": "3", "name": "Cid Moe", "position": "Designer", "job_description": "Designs user interfaces and brand assets."},
+    {"id": "4", "name": "Dee Kay", "position": "Frontend Developer", "job_description": "Builds web interfaces in JavaScript."},
+]
+
+class TestCandidateIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = CandidateIndex()
+        self.index.build(CANDIDATES)
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("Fix the Login-Bug in API v2"), ["fix", "login", "bug", "api", "v2"])
+        self.assertEqual(tokenize(None), [])
+
+    def test_search_ranks_best_match_first(self):
+        results = self.index.search("Prepare the Q4 financial report", 2)
+        self.assertEqual(results[0]["id"], "2")
+        self.assertEqual(len(results), 2)
+
+    def test_position_outweighs_description(self):
+        results = self.index.search("developer", 4)
+        self.assertEqual({r["id"] for r in results[:2]}, {"1", "4"})
+
+    def test_pads_with_non_matching_candidates(self):
+        results = self.index.search("quantum cryptography", 3)
+        self.assertEqual([r["id"] for r in results], ["1", "2", "3"])
+
+    def test_incremental_add_and_replace(self):
+        self.index.add({"id": "5", "name": "Eve Fox", "position": "Security Engineer", "job_description": "Audits authentication."})
+        self.assertEqual(self.index.search("authentication audit", 1)[0]["id"], "5")
+
+        self.index.add({"id": "5", "name": "Eve Fox", "position": "Accountant", "job_description": "Payroll."})
+        self.assertEqual(len(self.index), 5)
+        self.assertEqual(self.index.search("payroll", 1)[0]["id"], "5")
+        self.assertNotIn("authentication", self.index.postings)
+
+    @patch('tools.candidate_index.get_all_candidates', return_value=CANDIDATES)
+    def test_shortlist_builds_lazily(self, mock_candidates):
+        # A fresh, unbuilt index stands in for the shared one for the length of the test
+        with patch('tools.candidate_index.candidate_index', CandidateIndex()):
+            results = shortlist_candidates("design new brand assets", k=1)
+            self.assertEqual(results[0]["id"], "3")
+            shortlist_candidates("design", k=1)
+        mock_candidates.assert_called_once()
+
+    @patch('tools.candidate_index.get_all_candidates', return_value=CANDIDATES)
+    def test_shortlist_disabled(self, mock_candidates):
+        self.assertEqual(shortlist_candidates("anything", k=0), CANDIDATES)
+
+    @patch('tools.candidate_index.get_all_candidates', return_value=CANDIDATES)
+    def test_shortlister_reads_users_once(self, mock_candidates):
+        shortlist = make_shortlister(k=2)
+        self.assertEqual(shortlist("design brand assets")[0]["id"], "3")
+        self.assertEqual(len(shortlist("python database")), 2)
+        mock_candidates.assert_called_once()
+        self.assertEqual(make_shortlister(k=0)("anything"), CANDIDATES)
+
+if __name__ == '__main__':
+    unittest.main()
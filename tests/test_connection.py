@@ -0,0 +1,39 @@
+import unittest
+import sys
+import os
+import tempfile
+from sqlalchemy.pool import QueuePool
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.connection import create_db_engine
+
+class TestCreateDbEngine(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+        for suffix in ("-wal", "-shm"):
+            self.addCleanup(lambda p=self.path + suffix: os.path.exists(p) and os.remove(p))
+
+    def test_sqlite_pragmas_applied(self):
+        engine = create_db_engine(f"sqlite:///{self.path}")
+        self.addCleanup(engine.dispose)
+        with engine.connect() as connection:
+            pragma = lambda name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+            self.assertEqual(pragma("journal_mode"), "wal")
+            self.assertEqual(pragma("synchronous"), 1)  # NORMAL
+            self.assertEqual(pragma("busy_timeout"), 5000)
+            self.assertEqual(pragma("cache_size"), -65536)
+        self.assertIsInstance(engine.pool, QueuePool)
+
+    def test_in_memory_database(self):
+        engine = create_db_engine("sqlite://")
+        self.addCleanup(engine.dispose)
+        with engine.connect() as connection:
+            self.assertEqual(connection.exec_driver_sql("SELECT 1").scalar(), 1)
+
+if __name__ == '__main__':
+    unittest.main()
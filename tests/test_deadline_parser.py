@@ -0,0 +1,80 @@
+import unittest
+import sys
+import os
+from datetime import datetime
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tools.deadline_parser import parse_deadline
+
+# A Wednesday morning
+NOW = datetime(2026, 10, 14, 10, 0)
+
+class TestParseDeadline(unittest.TestCase):
+
+    def test_resolves_explicit_and_relative_deadlines(self):
+        cases = {
+            "Fix the login bug by Friday 5pm": datetime(2026, 10, 16, 17, 0),
+            "Ship the release notes tomorrow": datetime(2026, 10, 15, 17, 0),
+            "Migrate the database in 3 days": datetime(2026, 10, 17, 17, 0),
+            "Write the report within two weeks": datetime(2026, 10, 28, 17, 0),
+            "Restart the workers in 2 hours": datetime(2026, 10, 14, 12, 0),
+            "Renew the certificate, expires 2026-11-02": datetime(2026, 11, 2, 17, 0),
+            "Deploy on 2026-11-02 09:30": datetime(2026, 11, 2, 9, 30),
+            "Send the invoice Nov 2 at 3:30 p.m.": datetime(2026, 11, 2, 15, 30),
+            "Plan the offsite for the 2nd of November 2027": datetime(2027, 11, 2, 17, 0),
+            "Book the venue by Jan 5": datetime(2027, 1, 5, 17, 0),
+            "Close the books at end of month": datetime(2026, 10, 31, 17, 0),
+            "Review the PR before noon": datetime(2026, 10, 14, 12, 0),
+            "Call the vendor by 9am": datetime(2026, 10, 15, 9, 0),
+            "Finish the slides by Wednesday": datetime(2026, 10, 14, 17, 0),
+            "Update the runbook the day after tomorrow at 14:00": datetime(2026, 10, 16, 14, 0),
+            "Finish the report in 10 days, by Oct 24": datetime(2026, 10, 24, 17, 0),
+            "Ship it Friday, Oct 16": datetime(2026, 10, 16, 17, 0),
+            "Publish the survey results by May 3": datetime(2027, 5, 3, 17, 0),
+            "Renew the lease on the 3rd of may": datetime(2027, 5, 3, 17, 0),
+            "may 3rd works for the launch": datetime(2027, 5, 3, 17, 0),
+            "Send the notes from the 10:30 meeting by Friday": datetime(2026, 10, 16, 17, 0),
+            "Fix the 5am cron job by tomorrow": datetime(2026, 10, 15, 17, 0),
+            "Rotate the keys 9am on Friday": datetime(2026, 10, 16, 9, 0),
+            "Send the invoice Nov 2, 3:30pm": datetime(2026, 11, 2, 15, 30),
+            "Move the 9am standup to Friday at 10am": datetime(2026, 10, 16, 10, 0),
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(parse_deadline(text, NOW), expected)
+
+    def test_leaves_vague_or_conflicting_deadlines_to_the_agent(self):
+        for text in (
+            "Fix the login bug",
+            "This may take a while to investigate",
+            "Prepare notes for the 10:30 meeting",
+            "Finish it next Friday",
+            "Send the draft tomorrow morning",
+            "Either today or tomorrow",
+            "Takes about 2 weeks",
+            "Due Feb 30",
+            "Restart the workers in 2 hours at 5pm",
+            "by 13pm",
+            "Call the client tomorrow at 9",
+            "Update the docs by 0900 tomorrow",
+            "Rotate the keys on Friday at 1730h",
+            "Interview candidates; may 3 of them need visas",
+            "May 3 of them join the call?",
+            "Only the 2 may attend",
+            "Send the status report every Monday",
+            "Back up the database weekly by Friday",
+            "Water the plants on Tuesdays at 5pm",
+            "",
+        ):
+            with self.subTest(text=text):
+                self.assertIsNone(parse_deadline(text, NOW))
+
+    def test_relative_deadline_that_already_passed_is_not_resolved(self):
+        evening = datetime(2026, 10, 14, 18, 0)
+        self.assertIsNone(parse_deadline("Finish it today", evening))
+        self.assertEqual(parse_deadline("Finish it by 5pm", evening), datetime(2026, 10, 15, 17, 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import unittest
+import asyncio
+import gc
+import sys
+import os
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import metrics
+from agents.hedging import HedgingPolicy
+from agents.llm_limiter import AdaptiveConcurrencyLimiter
+
+class FakeAgentCalls:
+    """Async call factory whose n-th call takes delays[n] seconds (then the last delay) and returns n."""
+    def __init__(self, *delays, fail=()):
+        self.delays = delays
+        self.fail = fail
+        self.started = 0
+        self.cancelled = []
+
+    async def __call__(self):
+        n = self.started
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delays[min(n, len(self.delays) - 1)])
+        except asyncio.CancelledError:
+            self.cancelled.append(n)
+            raise
+        if n in self.fail:
+            raise RuntimeError(f"call {n} failed")
+        return n
+
+class TestHedgingPolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.limiter = AdaptiveConcurrencyLimiter(initial_limit=8, min_limit=1, max_limit=8)
+        self.policy = HedgingPolicy(enabled=True, percentile=90, max_rate=1.0, min_samples=10, limiter=self.limiter)
+
+    def warm_up(self, name="agent", seconds=0.01):
+        for _ in range(10):
+            self.policy.record(name, seconds)
+
+    def test_hedge_delay_is_the_configured_percentile(self):
+        self.assertIsNone(self.policy.hedge_delay("agent"))
+        for i in range(1, 101):
+            self.policy.record("agent", i / 1000)
+        self.assertEqual(self.policy.hedge_delay("agent"), 0.09)
+
+    def test_slow_call_is_hedged_and_the_loser_cancelled(self):
+        self.warm_up()
+        calls = FakeAgentCalls(1.0, 0.01)
+        won = metrics.agent_hedges.value(agent="agent", result="won")
+
+        async def scenario():
+            result = await self.policy.run("agent", calls)
+            await asyncio.sleep(0)
+            return result
+
+        self.assertEqual(asyncio.run(scenario()), 1)
+        self.assertEqual(calls.started, 2)
+        self.assertEqual(calls.cancelled, [0])
+        self.assertEqual(metrics.agent_hedges.value(agent="agent", result="won"), won + 1)
+
+    def test_cancelled_loser_is_recorded(self):
+        self.warm_up()
+        calls = FakeAgentCalls(1.0, 0.01)
+
+        async def scenario():
+            await self.policy.run("agent", calls)
+            await asyncio.sleep(0)
+
+        asyncio.run(scenario())
+        samples = self.policy._latencies["agent"]
+        # The winner and the loser, which ran for at least the hedge delay before it was cancelled
+        self.assertEqual(len(samples), 12)
+        self.assertGreaterEqual(max(samples), 0.02)
+
+    def test_loser_failing_alongside_the_winner_has_its_error_retrieved(self):
+        self.warm_up()
+        unhandled = []
+
+        async def scenario():
+            asyncio.get_running_loop().set_exception_handler(lambda loop, context: unhandled.append(context))
+            release = asyncio.Event()
+            started = []
+
+            async def call():
+                started.append(None)
+                if len(started) == 1:
+                    await release.wait()
+                    return "first"
+                # Fails in the same loop iteration that lets the first call finish
+                release.set()
+                raise RuntimeError("hedge failed")
+
+            result = await self.policy.run("agent", call)
+            gc.collect()
+            return result
+
+        self.assertEqual(asyncio.run(scenario()), "first")
+        self.assertEqual(unhandled, [])
+
+    def test_fast_calls_and_cold_agents_are_not_hedged(self):
+        calls = FakeAgentCalls(0.05)
+        self.assertEqual(asyncio.run(self.policy.run("cold_agent", calls)), 0)
+        self.warm_up()
+        self.assertEqual(asyncio.run(self.policy.run("agent", FakeAgentCalls(0.001))), 0)
+        self.assertEqual(calls.started, 1)
+
+    def test_rate_cap_and_saturated_limiter_skip_hedges(self):
+        self.warm_up()
+        self.policy.max_rate = 0.5
+        skipped = metrics.agent_hedges_skipped.value(agent="agent", reason="rate_cap")
+        calls = FakeAgentCalls(0.05)
+        asyncio.run(self.policy.run("agent", calls))
+        self.assertEqual(calls.started, 1)
+        self.assertEqual(metrics.agent_hedges_skipped.value(agent="agent", reason="rate_cap"), skipped + 1)
+
+        self.policy.tokens = 5
+        self.limiter.in_flight = self.limiter.capacity
+        calls = FakeAgentCalls(0.05)
+        asyncio.run(self.policy.run("agent", calls))
+        self.assertEqual(calls.started, 1)
+        self.limiter.in_flight = 0
+
+    def test_failed_call_falls_back_to_the_other(self):
+        self.warm_up()
+        calls = FakeAgentCalls(0.05, 0.1, fail=(0,))
+        self.assertEqual(asyncio.run(self.policy.run("agent", calls)), 1)
+
+        calls = FakeAgentCalls(0.05, 0.1, fail=(0, 1))
+        with self.assertRaisesRegex(RuntimeError, "call 0 failed"):
+            asyncio.run(self.policy.run("agent", calls))
+
+    def test_disabled_policy_makes_a_single_call(self):
+        policy = HedgingPolicy(enabled=False)
+        calls = FakeAgentCalls(0.01)
+        self.assertEqual(asyncio.run(policy.run("agent", calls)), 0)
+        self.assertEqual(calls.started, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,254 @@
+import unittest
+import asyncio
+import sys
+import os
+import tempfile
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.connection import Base
+from database.models import TaskJob
+import job_queue
+from job_queue import TaskJobQueue, QueueFullException
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        # A file rather than a shared in-memory connection: workers use the database from several executor threads
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        engine = create_engine(f"sqlite:///{tmp.name}/jobs.db", connect_args={"check_same_thread": False})
+        self.addCleanup(engine.dispose)
+        Base.metadata.create_all(bind=engine)
+        self.Session = sessionmaker(bind=engine)
+        patcher = patch.object(job_queue, "SessionLocal", self.Session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_idempotency_key_returns_existing_job(self):
+        first = job_queue.enqueue_job("u1", "Write docs", idempotency_key="abc")
+        again = job_queue.enqueue_job("u1", "Write docs", idempotency_key="abc")
+        other_user = job_queue.enqueue_job("u2", "Write docs", idempotency_key="abc")
+        self.assertEqual(first["id"], again["id"])
+        self.assertNotEqual(first["id"], other_user["id"])
+        with self.Session() as db:
+            self.assertEqual(db.query(TaskJob).count(), 2)
+
+    def test_rejects_when_queue_is_full(self):
+        job_queue.enqueue_job("u1", "one", max_pending=2)
+        job_queue.enqueue_job("u1", "two", max_pending=2)
+        with self.assertRaises(QueueFullException):
+            job_queue.enqueue_job("u1", "three", max_pending=2)
+
+    def test_claim_is_fifo_and_exclusive(self):
+        first = job_queue.enqueue_job("u1", "first")
+        job_queue.enqueue_job("u1", "second")
+        self.assertEqual(job_queue.claim_next_job()[0], first["id"])
+        self.assertEqual(job_queue.claim_next_job()[2], "second")
+        self.assertIsNone(job_queue.claim_next_job())
+        self.assertEqual(job_queue.get_job(first["id"], "u1")["status"], "running")
+
+    def test_get_job_is_scoped_to_owner(self):
+        job = job_queue.enqueue_job("u1", "private")
+        self.assertIsNone(job_queue.get_job(job["id"], "u2"))
+
+    def test_requeues_only_stale_running_jobs(self):
+        stale = job_queue.enqueue_job("u1", "stale")
+        fresh = job_queue.enqueue_job("u1", "fresh")
+        job_queue.claim_next_job()
+        job_queue.claim_next_job()
+        with self.Session() as db:
+            db.get(TaskJob, stale["id"]).heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+            db.commit()
+
+        self.assertEqual(job_queue.requeue_stale_jobs(stale_seconds=600, max_attempts=3), (1, 0))
+        self.assertEqual(job_queue.get_job(stale["id"], "u1")["status"], "queued")
+        self.assertEqual(job_queue.get_job(fresh["id"], "u1")["status"], "running")
+
+    def test_repeatedly_abandoned_job_is_failed(self):
+        job = job_queue.enqueue_job("u1", "crashes its worker")
+        for attempt in range(1, 4):
+            self.assertEqual(job_queue.claim_next_job()[0], job["id"])
+            with self.Session() as db:
+                db.get(TaskJob, job["id"]).heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+                db.commit()
+            expected = (0, 1) if attempt == 3 else (1, 0)
+            self.assertEqual(job_queue.requeue_stale_jobs(stale_seconds=600, max_attempts=3), expected)
+
+        failed = job_queue.get_job(job["id"], "u1")
+        self.assertEqual(failed["status"], "failed")
+        self.assertEqual(failed["error"], "Abandoned after 3 attempts.")
+        self.assertIsNone(job_queue.claim_next_job())
+
+    def test_jobs_claimed_before_heartbeats_go_stale_by_start_time(self):
+        job = job_queue.enqueue_job("u1", "legacy")
+        job_queue.claim_next_job()
+        with self.Session() as db:
+            row = db.get(TaskJob, job["id"])
+            row.started_at, row.heartbeat_at = datetime.utcnow() - timedelta(hours=1), None
+            db.commit()
+        self.assertEqual(job_queue.requeue_stale_jobs(stale_seconds=600, max_attempts=3), (1, 0))
+
+    def test_outcome_is_only_recorded_by_the_current_run(self):
+        job = job_queue.enqueue_job("u1", "slow")
+        first_run = job_queue.claim_next_job()[3]
+        with self.Session() as db:
+            db.get(TaskJob, job["id"]).heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+            db.commit()
+        job_queue.requeue_stale_jobs(stale_seconds=600, max_attempts=3)
+        second_run = job_queue.claim_next_job()[3]
+
+        self.assertFalse(job_queue.heartbeat_job(job["id"], first_run))
+        self.assertFalse(job_queue.finish_job(job["id"], first_run, error="late"))
+        self.assertTrue(job_queue.heartbeat_job(job["id"], second_run))
+        self.assertTrue(job_queue.finish_job(job["id"], second_run, result={"status": "success"}))
+        self.assertEqual(job_queue.get_job(job["id"], "u1")["status"], "done")
+
+    def test_long_running_job_keeps_its_heartbeat_and_is_not_requeued(self):
+        release = asyncio.Event()
+        runs = []
+
+        async def run_job(user_id, description):
+            runs.append(description)
+            await release.wait()
+            return {"status": "success"}
+
+        async def scenario():
+            queue = TaskJobQueue(run_job, workers=2, poll_interval=0.01, requeue_interval=0.02, heartbeat_interval=0.02)
+            with patch.object(job_queue.config, "get_job_stale_seconds", return_value=0.2):
+                await queue.start()
+                try:
+                    job = await queue.enqueue("u1", "slow")
+                    # Runs for several times JOB_STALE_SECONDS
+                    await asyncio.sleep(0.8)
+                    release.set()
+                    for _ in range(100):
+                        job = await queue.get(job["id"], "u1")
+                        if job["status"] == "done":
+                            break
+                        await asyncio.sleep(0.02)
+                    return job
+                finally:
+                    await queue.stop()
+
+        self.assertEqual(asyncio.run(scenario())["status"], "done")
+        self.assertEqual(runs, ["slow"])
+
+    def test_stop_puts_running_jobs_back_in_the_queue(self):
+        started = asyncio.Event()
+
+        async def run_job(user_id, description):
+            started.set()
+            await asyncio.sleep(60)
+
+        async def scenario():
+            queue = TaskJobQueue(run_job, workers=1, poll_interval=0.01)
+            await queue.start()
+            job = await queue.enqueue("u1", "interrupted")
+            await asyncio.wait_for(started.wait(), timeout=5)
+            await queue.stop()
+            return job
+
+        job = asyncio.run(scenario())
+        with self.Session() as db:
+            row = db.get(TaskJob, job["id"])
+            self.assertEqual((row.status, row.attempts, row.started_at), ("queued", 0, None))
+        self.assertEqual(job_queue.claim_next_job()[0], job["id"])
+
+    def test_queue_requeues_abandoned_jobs_periodically(self):
+        async def run_job(user_id, description):
+            return {"status": "success"}
+
+        async def scenario():
+            queue = TaskJobQueue(run_job, workers=1, poll_interval=0.01, requeue_interval=0.05)
+            await queue.start()
+            try:
+                # Abandoned by another process after this one started
+                job = await queue.enqueue("u1", "orphan")
+                await asyncio.sleep(0.1)
+                with self.Session() as db:
+                    row = db.get(TaskJob, job["id"])
+                    row.status, row.heartbeat_at, row.result = "running", datetime.utcnow() - timedelta(hours=1), None
+                    db.commit()
+                with patch.object(job_queue.config, "get_job_stale_seconds", return_value=600):
+                    for _ in range(100):
+                        job = await queue.get(job["id"], "u1")
+                        if job["status"] == "done" and job["result"]:
+                            break
+                        await asyncio.sleep(0.02)
+                return job
+            finally:
+                await queue.stop()
+
+        self.assertEqual(asyncio.run(scenario())["status"], "done")
+
+    def test_workers_run_jobs_and_record_results(self):
+        async def run_job(user_id, description):
+            if description == "boom":
+                raise RuntimeError("agent unavailable")
+            return {"status": "success", "task_title": description.title()}
+
+        async def scenario():
+            queue = TaskJobQueue(run_job, workers=2, poll_interval=0.05)
+            await queue.start()
+            try:
+                ok = await queue.enqueue("u1", "write docs")
+                bad = await queue.enqueue("u1", "boom")
+                for _ in range(100):
+                    ok_job = await queue.get(ok["id"], "u1")
+                    bad_job = await queue.get(bad["id"], "u1")
+                    if ok_job["status"] == "done" and bad_job["status"] == "failed":
+                        break
+                    await asyncio.sleep(0.02)
+                return ok_job, bad_job
+            finally:
+                await queue.stop()
+
+        ok_job, bad_job = asyncio.run(scenario())
+        self.assertEqual(ok_job["status"], "done")
+        self.assertEqual(ok_job["result"]["task_title"], "Write Docs")
+        self.assertEqual(bad_job["status"], "failed")
+        self.assertEqual(bad_job["error"], "agent unavailable")
+
+    def test_workers_survive_database_errors(self):
+        from sqlalchemy.exc import OperationalError
+        real_claim, real_finish = job_queue.claim_next_job, job_queue.finish_job
+        failures = {"claim": 2, "finish": 1}
+
+        def flaky(name, fn):
+            def wrapper(*args, **kwargs):
+                if failures[name]:
+                    failures[name] -= 1
+                    raise OperationalError("UPDATE task_jobs", {}, Exception("database is locked"))
+                return fn(*args, **kwargs)
+            return wrapper
+
+        async def run_job(user_id, description):
+            return {"status": "success"}
+
+        async def scenario():
+            queue = TaskJobQueue(run_job, workers=1, poll_interval=0.01)
+            await queue.start()
+            try:
+                job = await queue.enqueue("u1", "write docs")
+                for _ in range(100):
+                    job = await queue.get(job["id"], "u1")
+                    if job["status"] == "done":
+                        break
+                    await asyncio.sleep(0.02)
+                return job, queue._tasks[0].done()
+            finally:
+                await queue.stop()
+
+        with patch.object(job_queue, "claim_next_job", flaky("claim", real_claim)), \
+                patch.object(job_queue, "finish_job", flaky("finish", real_finish)):
+            job, worker_died = asyncio.run(scenario())
+        self.assertEqual(job["status"], "done")
+        self.assertFalse(worker_died)
+
+if __name__ == '__main__':
+    unittest.main()
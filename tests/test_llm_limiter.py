@@ -0,0 +1,147 @@
+import unittest
+import asyncio
+import sys
+import os
+from unittest.mock import patch
+from google.genai.errors import ClientError, ServerError
+from tenacity import RetryError, wait_none
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import metrics
+from agents.llm_limiter import AdaptiveConcurrencyLimiter, RetryBudget, is_overload_error
+from agents.task_agents import TaskCreationWorkflow, task_runner_pool, deadline_agent
+
+def server_error(code=503):
+    return ServerError(code, {"error": {"code": code, "message": "overloaded", "status": "UNAVAILABLE"}}, None)
+
+class TestAdaptiveConcurrencyLimiter(unittest.TestCase):
+
+    def test_caps_in_flight_calls_and_queues_the_rest_in_order(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=1, max_limit=2)
+        peak = 0
+        started = []
+
+        async def call(i):
+            nonlocal peak
+            async with limiter.slot("agent"):
+                started.append(i)
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+
+        async def scenario():
+            await asyncio.gather(*(call(i) for i in range(6)))
+
+        asyncio.run(scenario())
+        self.assertEqual(peak, 2)
+        self.assertEqual(started, list(range(6)))
+        self.assertEqual((limiter.in_flight, limiter.queued), (0, 0))
+
+    def test_overload_halves_the_limit_once_per_episode(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, min_limit=1, max_limit=16, backoff=0.5)
+
+        async def failing_call():
+            async with limiter.slot("agent"):
+                await asyncio.sleep(0.01)
+                raise server_error()
+
+        async def scenario():
+            # Eight calls fail together: one overload episode
+            return await asyncio.gather(*(failing_call() for _ in range(8)), return_exceptions=True)
+
+        results = asyncio.run(scenario())
+        self.assertTrue(all(isinstance(r, ServerError) for r in results))
+        self.assertEqual(limiter.capacity, 4)
+
+        # A later failure is a new episode
+        with self.assertRaises(ServerError):
+            asyncio.run(failing_call())
+        self.assertEqual(limiter.capacity, 2)
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_successes_grow_the_limit_additively_up_to_the_maximum(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=1, max_limit=4)
+
+        async def call():
+            async with limiter.slot("agent"):
+                await asyncio.sleep(0)
+
+        async def scenario(n):
+            for _ in range(n):
+                await asyncio.gather(call(), call())
+
+        asyncio.run(scenario(2))
+        self.assertEqual(limiter.capacity, 3)
+        asyncio.run(scenario(50))
+        self.assertEqual(limiter.capacity, 4)
+
+    def test_other_errors_and_cancellation_release_slots_without_shrinking(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, min_limit=1, max_limit=1)
+
+        async def scenario():
+            with self.assertRaises(ValueError):
+                async with limiter.slot("agent"):
+                    raise ValueError("bad prompt")
+
+            async def hold():
+                async with limiter.slot("agent"):
+                    await asyncio.sleep(10)
+
+            holder = asyncio.create_task(hold())
+            waiter = asyncio.create_task(hold())
+            await asyncio.sleep(0.01)
+            self.assertEqual((limiter.in_flight, limiter.queued), (1, 1))
+            waiter.cancel()
+            holder.cancel()
+            await asyncio.gather(holder, waiter, return_exceptions=True)
+
+        asyncio.run(scenario())
+        self.assertEqual((limiter.in_flight, limiter.queued, limiter.capacity), (0, 0, 1))
+
+    def test_rate_limit_responses_count_as_overload(self):
+        self.assertTrue(is_overload_error(server_error(500)))
+        self.assertTrue(is_overload_error(ClientError(429, {"error": {"code": 429, "message": "quota"}}, None)))
+        self.assertFalse(is_overload_error(ClientError(400, {"error": {"code": 400, "message": "bad"}}, None)))
+        self.assertFalse(is_overload_error(ValueError()))
+
+class TestRetryBudget(unittest.TestCase):
+
+    def test_retries_are_limited_by_recent_successes(self):
+        now = [0.0]
+        budget = RetryBudget(ratio=0.5, min_per_second=0.1, max_balance=2, clock=lambda: now[0])
+        exhausted = metrics.llm_retry_budget_exhausted.value()
+        self.assertTrue(budget.try_spend())
+        self.assertTrue(budget.try_spend())
+        self.assertFalse(budget.try_spend())
+        self.assertEqual(metrics.llm_retry_budget_exhausted.value(), exhausted + 1)
+
+        budget.deposit()
+        self.assertFalse(budget.try_spend())
+        budget.deposit()
+        self.assertTrue(budget.try_spend())
+
+        # The reserve refills slowly without traffic
+        now[0] += 10
+        self.assertTrue(budget.try_spend())
+        self.assertFalse(budget.try_spend())
+
+    def test_workflow_stops_retrying_when_the_budget_is_empty(self):
+        attempts = []
+
+        async def failing_run(agent, prompt):
+            attempts.append(prompt)
+            raise server_error()
+
+        empty = RetryBudget(ratio=0.2, min_per_second=0, max_balance=1)
+        with patch("agents.task_agents.llm_retry_budget", empty), \
+                patch.object(task_runner_pool, "run", failing_run), \
+                patch.object(TaskCreationWorkflow._run_agent.retry, "wait", wait_none()):
+            with self.assertRaises(RetryError):
+                asyncio.run(TaskCreationWorkflow("u1")._run_agent(deadline_agent, "prompt"))
+
+        # One retry from the budget instead of the four the attempt limit allows
+        self.assertEqual(len(attempts), 2)
+
+if __name__ == '__main__':
+    unittest.main()
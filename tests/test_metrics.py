@@ -0,0 +1,128 @@
+import unittest
+import asyncio
+import sys
+import os
+from unittest.mock import patch, MagicMock
+from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
+from fastapi.testclient import TestClient
+from tenacity import wait_none
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import metrics
+from metrics import MetricsRegistry, MetricsMiddleware
+from agents.task_agents import TaskCreationWorkflow, task_runner_pool, deadline_agent
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry(enabled=True)
+
+    def test_histogram_renders_cumulative_buckets(self):
+        histogram = self.registry.histogram("call_seconds", "Call duration.", ("agent",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, agent='say "hi"')
+        lines = self.registry.render().splitlines()
+        self.assertIn("# TYPE call_seconds histogram", lines)
+        self.assertIn('call_seconds_bucket{agent="say \\"hi\\"",le="0.1"} 2', lines)
+        self.assertIn('call_seconds_bucket{agent="say \\"hi\\"",le="1.0"} 3', lines)
+        self.assertIn('call_seconds_bucket{agent="say \\"hi\\"",le="+Inf"} 4', lines)
+        self.assertIn('call_seconds_sum{agent="say \\"hi\\""} 3.65', lines)
+        self.assertIn('call_seconds_count{agent="say \\"hi\\""} 4', lines)
+
+    def test_counter_and_label_checks(self):
+        counter = self.registry.counter("retries_total", "Retries.", ("agent",))
+        counter.inc(agent="a")
+        counter.inc(2, agent="a")
+        self.assertIn('retries_total{agent="a"} 3', self.registry.render())
+        with self.assertRaises(ValueError):
+            counter.inc(model="a")
+        with self.assertRaises(ValueError):
+            self.registry.counter("retries_total", "Duplicate.")
+
+    def test_disabled_registry_records_nothing(self):
+        registry = MetricsRegistry(enabled=False)
+        counter = registry.counter("things_total", "Things.")
+        counter.inc()
+        self.assertEqual(counter.value(), 0)
+
+    def test_timed_db_records_duration_and_errors(self):
+        @metrics.timed_db
+        def flaky_query(fail):
+            if fail:
+                raise RuntimeError("locked")
+            return "rows"
+
+        calls = metrics.db_query_seconds.count(function="flaky_query")
+        self.assertEqual(flaky_query(False), "rows")
+        with self.assertRaises(RuntimeError):
+            flaky_query(True)
+        self.assertEqual(metrics.db_query_seconds.count(function="flaky_query"), calls + 2)
+        self.assertEqual(metrics.db_query_errors.value(function="flaky_query"), 1)
+
+class TestMetricsMiddleware(unittest.TestCase):
+
+    def test_labels_requests_by_route_template(self):
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+
+        @app.get("/items/{item_id}")
+        async def get_item(item_id: int):
+            return {"id": item_id}
+
+        app.mount("/files", StaticFiles(directory=os.path.dirname(__file__)), name="files")
+        client = TestClient(app)
+        before = metrics.http_request_seconds.count(method="GET", route="/items/{item_id}", status="200")
+        client.get("/items/1")
+        client.get("/items/2")
+        client.get("/files/test_metrics.py")
+        client.get("/missing")
+
+        self.assertEqual(metrics.http_request_seconds.count(method="GET", route="/items/{item_id}", status="200"), before + 2)
+        self.assertGreaterEqual(metrics.http_request_seconds.count(method="GET", route="/files", status="200"), 1)
+        self.assertGreaterEqual(metrics.http_request_seconds.count(method="GET", route="unmatched", status="404"), 1)
+
+    def test_labels_unknown_methods_as_other(self):
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+        client = TestClient(app)
+        before = metrics.http_request_seconds.count(method="other", route="unmatched", status="404")
+        client.request("FOOBAR", "/missing")
+        client.request("X-RANDOM-1234", "/missing")
+
+        self.assertEqual(metrics.http_request_seconds.count(method="other", route="unmatched", status="404"), before + 2)
+        self.assertNotIn('method="FOOBAR"', metrics.registry.render())
+
+class TestAgentMetrics(unittest.TestCase):
+
+    def test_counts_server_errors_retries_and_tokens(self):
+        from google.genai.errors import ServerError
+        usage = MagicMock(prompt_token_count=12, candidates_token_count=3)
+        attempts = []
+
+        async def flaky_run(agent, prompt):
+            attempts.append(prompt)
+            if len(attempts) < 3:
+                raise ServerError(503, {"error": {"code": 503, "message": "overloaded", "status": "UNAVAILABLE"}}, None)
+            return [MagicMock(usage_metadata=usage)]
+
+        labels = {"agent": deadline_agent.name}
+        retries = metrics.agent_retries.value(**labels)
+        errors = metrics.agent_server_errors.value(code="503", **labels)
+        prompt_tokens = metrics.agent_tokens.value(kind="prompt", **labels)
+        failed_calls = metrics.agent_call_seconds.count(outcome="error", **labels)
+
+        with patch.object(task_runner_pool, "run", flaky_run), \
+                patch.object(TaskCreationWorkflow._run_agent.retry, "wait", wait_none()):
+            asyncio.run(TaskCreationWorkflow("u1")._run_agent(deadline_agent, "prompt"))
+
+        self.assertEqual(len(attempts), 3)
+        self.assertEqual(metrics.agent_retries.value(**labels), retries + 2)
+        self.assertEqual(metrics.agent_server_errors.value(code="503", **labels), errors + 2)
+        self.assertEqual(metrics.agent_call_seconds.count(outcome="error", **labels), failed_calls + 2)
+        self.assertEqual(metrics.agent_tokens.value(kind="prompt", **labels), prompt_tokens + 12)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import sys
+import os
+import sqlite3
+import tempfile
+from sqlalchemy import create_engine
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.migrate import migrate, get_version, pending_migrations, LATEST_VERSION
+
+# The tasks table as created before importance/priority became integers
+LEGACY_SCHEMA = """
+CREATE TABLE users (id VARCHAR NOT NULL PRIMARY KEY, first_name VARCHAR, last_name VARCHAR, email VARCHAR,
+                    hashed_password VARCHAR, position VARCHAR, job_description VARCHAR);
+CREATE TABLE tasks (id INTEGER NOT NULL PRIMARY KEY, title VARCHAR, description VARCHAR, assign_by VARCHAR,
+                    assignee VARCHAR, importance VARCHAR, priority VARCHAR, deadline DATETIME, suggestions VARCHAR,
+                    status VARCHAR, updated_at DATETIME, created_at DATETIME);
+CREATE INDEX ix_tasks_id ON tasks (id);
+CREATE INDEX ix_tasks_title ON tasks (title);
+INSERT INTO tasks (id, title, assignee, importance, priority, status)
+VALUES (1, 'a', 'u1', '4', '5', 'open'), (2, 'b', 'u1', 'high', NULL, 'open'), (3, 'c', 'u2', '9', '2', 'closed');
+"""
+
+class TestMigrate(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+        self.engine = create_engine(f"sqlite:///{self.path}")
+        self.addCleanup(self.engine.dispose)
+
+    def test_upgrades_legacy_database(self):
+        with sqlite3.connect(self.path) as conn:
+            conn.executescript(LEGACY_SCHEMA)
+        self.assertEqual(len(pending_migrations(self.engine)), LATEST_VERSION)
+
+        self.assertEqual(migrate(self.engine, verbose=False), list(range(1, LATEST_VERSION + 1)))
+        self.assertEqual(get_version(self.engine), LATEST_VERSION)
+
+        with sqlite3.connect(self.path) as conn:
+            types = {row[1]: row[2] for row in conn.execute("PRAGMA table_info(tasks)")}
+            self.assertEqual((types["importance"], types["priority"]), ("INTEGER", "INTEGER"))
+            rows = conn.execute("SELECT id, importance, priority, typeof(priority) FROM tasks ORDER BY id").fetchall()
+            self.assertEqual(rows, [(1, 4, 5, "integer"), (2, 3, 3, "integer"), (3, 3, 2, "integer")])
+            indexes = {row[1] for row in conn.execute("PRAGMA index_list(tasks)")}
+            self.assertTrue({"ix_tasks_assignee_status_deadline", "ix_tasks_assign_by_created_at", "ix_tasks_updated_at"} <= indexes)
+            plan = " ".join(str(r) for r in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM tasks WHERE assignee = 'u1' AND status = 'open' ORDER BY deadline"))
+            self.assertIn("ix_tasks_assignee_status_deadline", plan)
+
+        # Running again is a no-op
+        self.assertEqual(migrate(self.engine, verbose=False), [])
+
+    def test_fresh_database(self):
+        migrate(self.engine, verbose=False)
+        self.assertEqual(get_version(self.engine), LATEST_VERSION)
+        self.assertEqual(pending_migrations(self.engine), [])
+
+if __name__ == '__main__':
+    unittest.main()
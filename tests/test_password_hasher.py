@@ -0,0 +1,76 @@
+import unittest
+import asyncio
+import sys
+import os
+import time
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.connection import Base
+from tools import auth
+from tools.auth import PasswordHasher, PasswordHashingBusyException
+
+class TestPasswordHasher(unittest.TestCase):
+
+    def test_rejects_when_saturated(self):
+        hasher = PasswordHasher(workers=1, queue_size=1)
+
+        async def scenario():
+            calls = [hasher.run(time.sleep, 0.1) for _ in range(3)]
+            return await asyncio.gather(*calls, return_exceptions=True)
+
+        results = asyncio.run(scenario())
+        self.assertEqual(sum(isinstance(r, PasswordHashingBusyException) for r in results), 1)
+        self.assertEqual(hasher.rejected, 1)
+        self.assertEqual(hasher.pending, 0)
+
+    def test_event_loop_stays_responsive(self):
+        hasher = PasswordHasher(workers=2, queue_size=8)
+
+        async def scenario():
+            ticks = 0
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.005)
+                    ticks += 1
+            tick_task = asyncio.create_task(ticker())
+            hashed = await hasher.run(auth.get_password_hash, "Password123")
+            ok = await hasher.run(auth.verify_password, "Password123", hashed)
+            tick_task.cancel()
+            return ok, ticks
+
+        ok, ticks = asyncio.run(scenario())
+        self.assertTrue(ok)
+        self.assertGreater(ticks, 5)
+
+class TestAsyncAuth(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        patcher = patch('tools.auth.SessionLocal', sessionmaker(bind=engine))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        auth.login_rate_limiter.clear()
+
+    def test_register_and_login(self):
+        async def scenario():
+            user = await auth.create_user_async("Ann", "Lee", "ann@example.com", "Password123", "Developer")
+            with self.assertRaises(ValueError):
+                await auth.create_user_async("Ann", "Lee", "ann@example.com", "Password123")
+            ok = await auth.authenticate_user_async("ann@example.com", "Password123")
+            bad = await auth.authenticate_user_async("ann@example.com", "Wrong123")
+            return user, ok, bad
+
+        user, ok, bad = asyncio.run(scenario())
+        self.assertEqual(ok.id, user.id)
+        self.assertIsNone(bad)
+
+if __name__ == '__main__':
+    unittest.main()
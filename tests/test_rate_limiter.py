@@ -0,0 +1,110 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.connection import Base
+from database.models import LoginAttempt
+from tools.rate_limiter import MemoryRateLimiter, SQLiteRateLimiter, create_login_rate_limiter
+
+class RateLimiterBehaviour:
+    """Shared checks run against both backends."""
+
+    def make_limiter(self, **kwargs):
+        raise NotImplementedError
+
+    def test_locks_out_after_max_attempts(self):
+        limiter = self.make_limiter()
+        for _ in range(3):
+            self.assertTrue(limiter.is_allowed("a@example.com"))
+            limiter.record_failure("a@example.com")
+        self.assertFalse(limiter.is_allowed("a@example.com"))
+        # Keys are case-insensitive
+        self.assertFalse(limiter.is_allowed("A@Example.com "))
+        self.assertTrue(limiter.is_allowed("b@example.com"))
+
+    def test_reset_clears_failures(self):
+        limiter = self.make_limiter()
+        for _ in range(3):
+            limiter.record_failure("a@example.com")
+        limiter.reset("a@example.com")
+        self.assertTrue(limiter.is_allowed("a@example.com"))
+
+    def test_lockout_expires(self):
+        limiter = self.make_limiter()
+        with patch('tools.rate_limiter.time.time', return_value=1000.0):
+            for _ in range(3):
+                limiter.record_failure("a@example.com")
+            self.assertFalse(limiter.is_allowed("a@example.com"))
+        with patch('tools.rate_limiter.time.time', return_value=1061.0):
+            self.assertTrue(limiter.is_allowed("a@example.com"))
+            # A new failure starts a fresh window rather than relocking immediately
+            limiter.record_failure("a@example.com")
+            self.assertTrue(limiter.is_allowed("a@example.com"))
+
+class TestMemoryRateLimiter(RateLimiterBehaviour, unittest.TestCase):
+
+    def make_limiter(self, max_entries=100):
+        return MemoryRateLimiter(max_attempts=3, lockout_seconds=60, max_entries=max_entries)
+
+    def test_hard_size_cap(self):
+        limiter = self.make_limiter(max_entries=10)
+        for i in range(1000):
+            limiter.record_failure(f"user{i}@example.com")
+        self.assertEqual(len(limiter), 10)
+
+    def test_expired_entries_evicted(self):
+        limiter = self.make_limiter()
+        with patch('tools.rate_limiter.time.time', return_value=1000.0):
+            for i in range(50):
+                limiter.record_failure(f"user{i}@example.com")
+        with patch('tools.rate_limiter.time.time', return_value=2000.0):
+            limiter.is_allowed("someone@example.com")
+        self.assertEqual(len(limiter), 0)
+
+class TestSQLiteRateLimiter(RateLimiterBehaviour, unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.Session = sessionmaker(bind=engine)
+        patcher = patch('tools.rate_limiter.SessionLocal', self.Session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_limiter(self, max_entries=100, sweep_every=100):
+        return SQLiteRateLimiter(max_attempts=3, lockout_seconds=60, max_entries=max_entries, sweep_every=sweep_every)
+
+    def test_shared_between_instances(self):
+        worker1, worker2 = self.make_limiter(), self.make_limiter()
+        for _ in range(2):
+            worker1.record_failure("a@example.com")
+        worker2.record_failure("a@example.com")
+        self.assertFalse(worker1.is_allowed("a@example.com"))
+        self.assertFalse(worker2.is_allowed("a@example.com"))
+
+    def test_sweep_caps_table(self):
+        limiter = self.make_limiter(max_entries=5, sweep_every=10)
+        for i in range(20):
+            limiter.record_failure(f"user{i}@example.com")
+        with self.Session() as session:
+            self.assertEqual(session.query(LoginAttempt).count(), 5)
+            # The most recent failures survive
+            self.assertIsNotNone(session.get(LoginAttempt, "user19@example.com"))
+
+class TestFactory(unittest.TestCase):
+
+    def test_backends(self):
+        self.assertIsInstance(create_login_rate_limiter("memory"), MemoryRateLimiter)
+        self.assertIsInstance(create_login_rate_limiter("sqlite"), SQLiteRateLimiter)
+        with self.assertRaises(ValueError):
+            create_login_rate_limiter("redis")
+
+if __name__ == '__main__':
+    unittest.main()
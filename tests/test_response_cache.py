@@ -0,0 +1,116 @@
+import unittest
+import asyncio
+import sys
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.connection import Base
+from database.models import LLMCacheEntry
+from agents.response_cache import ResponseCache
+
+def make_agent(name="details_agent", instruction="Write a title."):
+    return SimpleNamespace(name=name, model="gemini-2.5-flash-lite", instruction=instruction)
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.Session = sessionmaker(bind=engine)
+        patcher = patch('agents.response_cache.SessionLocal', self.Session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = ResponseCache(max_entries=2, ttls={}, enabled=True)
+
+    def test_miss_then_memory_hit(self):
+        agent = make_agent()
+        self.assertIsNone(self.cache.get(agent, "Task: fix login"))
+        self.cache.set(agent, "Task: fix login", "Fix login")
+        # Whitespace differences normalize to the same key
+        self.assertEqual(self.cache.get(agent, "  Task:   fix login "), "Fix login")
+        stats = self.cache.get_stats()
+        self.assertEqual((stats["misses"], stats["memory_hits"]), (1, 1))
+
+    def test_sqlite_tier_survives_new_instance(self):
+        agent = make_agent()
+        self.cache.set(agent, "Task: fix login", "Fix login")
+        fresh = ResponseCache(max_entries=2, ttls={}, enabled=True)
+        self.assertEqual(fresh.get(agent, "Task: fix login"), "Fix login")
+        self.assertEqual(fresh.get_stats()["db_hits"], 1)
+        self.assertEqual(fresh.get(agent, "Task: fix login"), "Fix login")
+        self.assertEqual(fresh.get_stats()["memory_hits"], 1)
+
+    def test_key_includes_instruction(self):
+        self.cache.set(make_agent(), "Task: fix login", "Fix login")
+        self.assertIsNone(self.cache.get(make_agent(instruction="Changed."), "Task: fix login"))
+
+    def test_lru_eviction(self):
+        agent = make_agent()
+        for i in range(3):
+            self.cache.set(agent, f"prompt {i}", f"answer {i}")
+        self.assertEqual(self.cache.get_stats()["evictions"], 1)
+        self.assertEqual(self.cache.get_stats()["memory_entries"], 2)
+        # Evicted from memory but still served from SQLite
+        self.assertEqual(self.cache.get(agent, "prompt 0"), "answer 0")
+
+    def test_time_sensitive_agents_bypass(self):
+        agent = make_agent(name="deadline_agent")
+        self.cache.set(agent, "Task: x. Current time: 2025-01-01 10:00:00", "2025-01-02 17:00:00")
+        self.assertIsNone(self.cache.get(agent, "Task: x. Current time: 2025-01-01 10:00:00"))
+        self.assertEqual(self.cache.get_stats()["bypassed"], 1)
+        with self.Session() as session:
+            self.assertEqual(session.query(LLMCacheEntry).count(), 0)
+
+    def test_expired_entries(self):
+        agent = make_agent()
+        self.cache.set(agent, "Task: fix login", "Fix login")
+        with self.Session() as session:
+            session.query(LLMCacheEntry).update({"expires_at": datetime.utcnow() - timedelta(seconds=1)})
+            session.commit()
+        self.cache.clear()
+        self.assertIsNone(self.cache.get(agent, "Task: fix login"))
+
+        self.cache.set(agent, "other", "value")
+        with self.Session() as session:
+            session.query(LLMCacheEntry).update({"expires_at": datetime.utcnow() - timedelta(seconds=1)})
+            session.commit()
+        self.assertEqual(self.cache.purge_expired(), 1)
+    def test_async_variants(self):
+        agent = make_agent()
+        async def scenario():
+            self.assertIsNone(await self.cache.aget(agent, "Task: fix login"))
+            await self.cache.aset(agent, "Task: fix login", "Fix login")
+            return await self.cache.aget(agent, "Task: fix login")
+        self.assertEqual(asyncio.run(scenario()), "Fix login")
+        self.assertEqual(self.cache.get_stats()["memory_hits"], 1)
+
+    def test_workflow_caches_only_replies_that_parse(self):
+        from agents.task_agents import TaskCreationWorkflow
+        replies = ["not json", '{"importance": "4", "priority": "5"}']
+
+        async def fake_run_agent(workflow, agent, prompt):
+            text = replies.pop(0)
+            return [SimpleNamespace(content=SimpleNamespace(parts=[SimpleNamespace(text=text)]))]
+
+        async def scenario():
+            workflow = TaskCreationWorkflow("user1")
+            return [await workflow._predict_priority("Fix login") for _ in range(3)]
+
+        with patch('agents.task_agents.response_cache', self.cache), \
+                patch.object(TaskCreationWorkflow, '_run_agent', fake_run_agent):
+            results = asyncio.run(scenario())
+
+        # The malformed reply falls back to defaults and isn't cached; the valid one is, and is reused
+        self.assertEqual(results, [("3", "3"), ("4", "5"), ("4", "5")])
+        self.assertEqual(replies, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import asyncio
+import sys
+import os
+from unittest.mock import patch
+from google.adk.agents import Agent
+from google.adk.events import Event
+from google.adk.runners import Runner
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.runner_pool import AgentRunnerPool
+from agents.lazy_agent import LazyAgent
+
+AGENT = Agent(name="echo_agent", model="gemini-2.5-flash-lite", instruction="Echo the prompt.")
+
+class TestAgentRunnerPool(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = AgentRunnerPool("test_app")
+        self.session_ids = []
+
+    def fake_run_async(self, fail=False):
+        test = self
+
+        async def run_async(runner, *, user_id, session_id, new_message, run_config=None):
+            test.session_ids.append(session_id)
+            await asyncio.sleep(0.01)
+            # The session exists while the call is in flight
+            test.assertIsNotNone(await runner.session_service.get_session(
+                app_name=runner.app_name, user_id=user_id, session_id=session_id))
+            if fail:
+                raise RuntimeError("model unavailable")
+            yield Event(author=AGENT.name, content=new_message)
+        return run_async
+
+    def test_reuses_one_runner_per_agent(self):
+        self.assertIs(self.pool.runner_for(AGENT), self.pool.runner_for(AGENT))
+        self.assertIsInstance(self.pool.runner_for(AGENT), Runner)
+
+    def test_builds_lazy_agents_with_their_current_model(self):
+        lazy = LazyAgent(name="lazy_agent", model="gemini-2.5-flash-lite", instruction="Echo the prompt.")
+        lazy.model = "gemini-2.5-flash"
+        runner = self.pool.runner_for(lazy)
+        self.assertEqual(runner.agent.name, "lazy_agent")
+        self.assertEqual(runner.agent.model, "gemini-2.5-flash")
+        self.assertIs(lazy.build(), runner.agent)
+
+    def test_sessions_are_deleted_after_each_call(self):
+        async def scenario():
+            with patch.object(Runner, "run_async", self.fake_run_async()):
+                results = await asyncio.gather(*(self.pool.run(AGENT, f"prompt {i}") for i in range(20)))
+            return results, await self.pool.session_count()
+
+        results, remaining = asyncio.run(scenario())
+        self.assertEqual(results[3][0].content.parts[0].text, "prompt 3")
+        self.assertEqual(remaining, 0)
+        # Concurrent calls never share a session
+        self.assertEqual(len(set(self.session_ids)), 20)
+
+    def test_failed_calls_also_release_their_session(self):
+        async def scenario():
+            with patch.object(Runner, "run_async", self.fake_run_async(fail=True)):
+                with self.assertRaises(RuntimeError):
+                    await self.pool.run(AGENT, "prompt")
+            return await self.pool.session_count()
+
+        self.assertEqual(asyncio.run(scenario()), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+import sys
+import os
+import shutil
+import subprocess
+import tempfile
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+HEAVY_PREFIXES = ("google.adk", "google.genai")
+
+class TestLazyStartup(unittest.TestCase):
+
+    def setUp(self):
+        self.scratch_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.scratch_dir)
+        self.db_path = os.path.join(self.scratch_dir, "startup.db")
+        self.env = dict(os.environ, DATABASE_URL=f"sqlite:///{self.db_path}")
+        self.env.pop("GOOGLE_API_KEY", None)
+
+    def test_importing_entry_points_is_side_effect_free(self):
+        for module in ("server", "main"):
+            with self.subTest(module=module):
+                code = f"import sys, {module}; print(sorted(m for m in sys.modules if m.startswith({HEAVY_PREFIXES!r})))"
+                completed = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, env=self.env,
+                                           capture_output=True, text=True)
+                self.assertEqual(completed.returncode, 0, completed.stderr)
+                # No agent SDK import, no API key check and no database until startup
+                self.assertEqual(completed.stdout.strip().splitlines()[-1], "[]")
+                self.assertFalse(os.path.exists(self.db_path))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from starlette.datastructures import Headers
+from fastapi.testclient import TestClient
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import static_assets
+import server
+from static_assets import build_static_assets, is_stale, parse_accept, prepare_static_assets, PrecompressedStaticFiles
+
+INDEX_HTML = '<link href="/static/style.css"><div style="background: url(\'/static/assets/bg.png\')"></div>' * 20
+STYLE_CSS = "body { color: #333; }\n" * 50
+
+class TestStaticAssets(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.source = os.path.join(self.root, "static")
+        self.build = os.path.join(self.source, "dist")
+        os.makedirs(os.path.join(self.source, "assets"))
+        with open(os.path.join(self.source, "index.html"), "w") as f:
+            f.write(INDEX_HTML)
+        with open(os.path.join(self.source, "style.css"), "w") as f:
+            f.write(STYLE_CSS)
+        if static_assets.Image is not None:
+            static_assets.Image.new("RGB", (800, 400), "white").save(os.path.join(self.source, "assets", "bg.png"))
+        else:
+            with open(os.path.join(self.source, "assets", "bg.png"), "wb") as f:
+                f.write(b"\x89PNG fake")
+
+    def build_assets(self):
+        return build_static_assets(self.source, self.build, verbose=False)
+
+    def test_hashes_and_rewrites_references(self):
+        manifest = self.build_assets()
+        css = manifest["style.css"]["path"]
+        self.assertRegex(css, r"^style\.[0-9a-f]{10}\.css$")
+        # index.html keeps its name; the files it references are hashed
+        self.assertEqual(manifest["index.html"]["path"], "index.html")
+        with open(os.path.join(self.build, "index.html")) as f:
+            html = f.read()
+        self.assertIn(f"/static/dist/{css}", html)
+        self.assertIn(f"/static/dist/{manifest['assets/bg.png']['path']}", html)
+        self.assertIn("gzip", manifest["style.css"]["encodings"])
+
+    def test_builds_without_optional_dependencies(self):
+        with patch.object(static_assets, "Image", None), patch.object(static_assets, "brotli", None):
+            manifest = self.build_assets()
+        self.assertEqual(manifest["style.css"]["encodings"], ["gzip"])
+        self.assertEqual(manifest["assets/bg.png"]["variants"], [])
+
+    @unittest.skipIf(static_assets.Image is None, "Pillow is not installed")
+    def test_image_variants(self):
+        variants = self.build_assets()["assets/bg.png"]["variants"]
+        self.assertIn({"image/webp"}, [{v["type"]} for v in variants])
+        self.assertEqual(sorted({v["width"] for v in variants}), [640, 800])
+        for variant in variants:
+            self.assertTrue(os.path.exists(os.path.join(self.build, variant["path"])))
+
+    def test_stale_detection(self):
+        self.assertTrue(is_stale(self.source, self.build))
+        self.build_assets()
+        self.assertFalse(is_stale(self.source, self.build))
+        with open(os.path.join(self.source, "style.css"), "a") as f:
+            f.write("a { color: red; }\n")
+        self.assertTrue(is_stale(self.source, self.build))
+
+    def test_rebuild_swaps_in_a_complete_build(self):
+        first = self.build_assets()["style.css"]["path"]
+        with open(os.path.join(self.source, "style.css"), "a") as f:
+            f.write("a { color: red; }\n")
+        second = self.build_assets()["style.css"]["path"]
+
+        self.assertNotEqual(first, second)
+        self.assertFalse(os.path.exists(os.path.join(self.build, first)))
+        self.assertTrue(os.path.exists(os.path.join(self.build, second)))
+        # No staging or old copies left beside the build
+        self.assertEqual(sorted(n for n in os.listdir(self.source) if n.startswith(".dist")), [".dist.lock"])
+
+    def test_concurrent_builds_run_once(self):
+        with patch.object(static_assets, "_build", wraps=static_assets._build) as build:
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                manifests = list(pool.map(
+                    lambda _: build_static_assets(self.source, self.build, verbose=False, force=False), range(4)))
+        self.assertEqual(build.call_count, 1)
+        self.assertTrue(all(manifest == manifests[0] for manifest in manifests))
+        self.assertFalse(is_stale(self.source, self.build))
+
+    def test_startup_only_reads_the_manifest_unless_auto(self):
+        with patch("static_assets.is_stale", return_value=True), patch("static_assets.build_static_assets") as build:
+            with patch.dict(os.environ, {"STATIC_ASSETS_BUILD": "off"}), patch("static_assets.load_manifest") as load:
+                prepare_static_assets()
+            build.assert_not_called()
+            load.assert_called_once_with()
+
+            with patch.dict(os.environ, {"STATIC_ASSETS_BUILD": "auto"}):
+                prepare_static_assets()
+            build.assert_called_once_with(force=False)
+
+    def test_root_serves_the_build_or_the_sources_without_one(self):
+        client = TestClient(server.app)
+        with patch("server.static_dist", PrecompressedStaticFiles(self.build)):
+            response = client.get("/")
+            self.assertEqual(response.status_code, 200)
+            with open(os.path.join("static", "index.html"), "rb") as f:
+                self.assertEqual(response.content, f.read())
+
+            self.build_assets()
+            response = client.get("/")
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("/static/dist/style.", response.text)
+            self.assertIn("Sec-CH-Viewport-Width", response.headers["accept-ch"])
+
+    def test_parse_accept(self):
+        self.assertEqual(parse_accept("br;q=1.0, gzip;q=0.5, identity;q=0"), {"br": 1.0, "gzip": 0.5, "identity": 0.0})
+        self.assertEqual(parse_accept(None), {})
+
+    def test_negotiates_encoding(self):
+        manifest = self.build_assets()
+        files = PrecompressedStaticFiles(self.build)
+        css = manifest["style.css"]["path"]
+
+        served, encoding, vary = files.negotiate(css, Headers({"accept-encoding": "gzip, deflate"}))
+        self.assertEqual((served, encoding, vary), (css + ".gz", "gzip", "Accept-Encoding"))
+        self.assertEqual(files.negotiate(css, Headers({"accept-encoding": "gzip;q=0"}))[:2], (css, None))
+        self.assertEqual(files.negotiate(css, Headers({}))[:2], (css, None))
+        if "br" in manifest["style.css"]["encodings"]:
+            self.assertEqual(files.negotiate(css, Headers({"accept-encoding": "gzip, br"}))[1], "br")
+
+    @unittest.skipIf(static_assets.Image is None, "Pillow is not installed")
+    def test_negotiates_image_variant(self):
+        manifest = self.build_assets()
+        files = PrecompressedStaticFiles(self.build)
+        png = manifest["assets/bg.png"]["path"]
+
+        served, _, vary = files.negotiate(png, Headers({"accept": "image/webp,*/*"}))
+        self.assertTrue(served.endswith(".webp"))
+        self.assertNotIn("-640", served)
+        self.assertIn("Accept", vary)
+        # A 300px viewport at 2x needs 600px, so the 640px variant is enough
+        served = files.negotiate(png, Headers({"accept": "image/webp", "sec-ch-viewport-width": "300", "sec-ch-dpr": "2"}))[0]
+        self.assertTrue(served.endswith("-640.webp"))
+        # Browsers that only accept */* get the original format
+        self.assertEqual(files.negotiate(png, Headers({"accept": "*/*"}))[0], png)
+
+if __name__ == '__main__':
+    unittest.main()
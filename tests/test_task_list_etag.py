@@ -0,0 +1,113 @@
+import unittest
+import sys
+import os
+import tempfile
+from datetime import datetime
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.connection import Base
+from database.models import User, Task
+from tools.auth import get_password_hash, login_rate_limiter
+import server
+
+PASSWORD = "Passw0rd!123"
+
+class TestTaskListETag(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # bcrypt is slow; hash once for every user
+        cls.password_hash = get_password_hash(PASSWORD)
+
+    def setUp(self):
+        # A file rather than a shared in-memory connection: requests use the database from executor threads
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        engine = create_engine(f"sqlite:///{tmp.name}/tasks.db", connect_args={"check_same_thread": False})
+        self.addCleanup(engine.dispose)
+        Base.metadata.create_all(bind=engine)
+        self.Session = sessionmaker(bind=engine)
+        for target in ('tools.task_tools.SessionLocal', 'tools.auth.SessionLocal'):
+            patcher = patch(target, self.Session)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(login_rate_limiter.clear)
+
+        with self.Session() as session:
+            session.add_all([
+                User(id="u1", first_name="Ann", last_name="Lee", email="ann@example.com", hashed_password=self.password_hash),
+                User(id="u2", first_name="Bob", last_name="Ray", email="bob@example.com", hashed_password=self.password_hash),
+                Task(id=1, title="Fix login", assign_by="u2", assignee="u1", importance=3, priority=3, status="open",
+                     created_at=datetime(2025, 1, 1, 9, 0), updated_at=datetime(2025, 1, 1, 9, 0)),
+            ])
+            session.commit()
+
+    def client_for(self, email):
+        client = TestClient(server.app)
+        response = client.post("/api/login", json={"email": email, "password": PASSWORD})
+        self.assertEqual(response.status_code, 200)
+        return client
+
+    def test_unchanged_listing_revalidates_with_304(self):
+        client = self.client_for("ann@example.com")
+        first = client.get("/api/tasks")
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual([t["id"] for t in first.json()], [1])
+        etag = first.headers["ETag"]
+        self.assertEqual(first.headers["Cache-Control"], "private, no-cache")
+        self.assertIn("Last-Modified", first.headers)
+
+        again = client.get("/api/tasks", headers={"If-None-Match": etag})
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b"")
+        self.assertEqual(again.headers["ETag"], etag)
+
+    def test_if_none_match_forms(self):
+        client = self.client_for("ann@example.com")
+        etag = client.get("/api/tasks").headers["ETag"]
+        for header in (f"W/{etag}", f'"stale", {etag}', "*"):
+            with self.subTest(header=header):
+                self.assertEqual(client.get("/api/tasks", headers={"If-None-Match": header}).status_code, 304)
+        self.assertEqual(client.get("/api/tasks", headers={"If-None-Match": '"stale"'}).status_code, 200)
+
+    def test_update_changes_the_etag(self):
+        client = self.client_for("ann@example.com")
+        etag = client.get("/api/tasks").headers["ETag"]
+        self.assertEqual(client.patch("/api/tasks/1/status", json={"status": "finished"}).status_code, 200)
+
+        after = client.get("/api/tasks", headers={"If-None-Match": etag})
+        self.assertEqual(after.status_code, 200)
+        self.assertNotEqual(after.headers["ETag"], etag)
+        self.assertEqual(after.json()[0]["status"], "finished")
+
+    def test_changes_since_header_follows_the_listing(self):
+        client = self.client_for("ann@example.com")
+        since = client.get("/api/tasks").headers["X-Changes-Since"]
+        self.assertEqual(client.get(f"/api/tasks/changes?assignee=u1&since={since}").json()["tasks"], [])
+
+        client.patch("/api/tasks/1/status", json={"status": "finished"})
+        changes = client.get(f"/api/tasks/changes?assignee=u1&since={since}").json()
+        self.assertFalse(changes["full"])
+        self.assertEqual([(t["id"], t["status"]) for t in changes["tasks"]], [(1, "finished")])
+
+    def test_etag_varies_by_user_and_query(self):
+        ann = self.client_for("ann@example.com")
+        bob = self.client_for("bob@example.com")
+        etag = ann.get("/api/tasks").headers["ETag"]
+
+        self.assertEqual(bob.get("/api/tasks", headers={"If-None-Match": etag}).status_code, 200)
+        filtered = ann.get("/api/tasks?status=open", headers={"If-None-Match": etag})
+        self.assertEqual(filtered.status_code, 200)
+        self.assertNotEqual(filtered.headers["ETag"], etag)
+
+    def test_requires_login(self):
+        self.assertEqual(TestClient(server.app).get("/api/tasks").status_code, 401)
+
+if __name__ == '__main__':
+    unittest.main()
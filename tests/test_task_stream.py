@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest.mock import AsyncMock, patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.connection import Base
+from database.models import User
+from tools.auth import get_password_hash, login_rate_limiter
+import server
+
+PASSWORD = "Passw0rd!123"
+
+class TestCreateTaskStream(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        engine = create_engine(f"sqlite:///{tmp.name}/tasks.db", connect_args={"check_same_thread": False})
+        self.addCleanup(engine.dispose)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        patcher = patch('tools.auth.SessionLocal', Session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(login_rate_limiter.clear)
+        with Session() as session:
+            session.add(User(id="u1", first_name="Ann", last_name="Lee", email="ann@example.com",
+                             hashed_password=get_password_hash(PASSWORD)))
+            session.commit()
+
+        self.client = TestClient(server.app)
+        self.assertEqual(self.client.post("/api/login", json={"email": "ann@example.com", "password": PASSWORD}).status_code, 200)
+
+    @patch('server.TaskCreationWorkflow')
+    def test_queue_mode_enqueues_instead_of_streaming(self, mock_workflow):
+        enqueue = AsyncMock(return_value={"id": "job-1", "status": "queued"})
+        with patch.dict(os.environ, {"TASK_JOB_QUEUE_ENABLED": "true"}), patch.object(server.job_queue, "enqueue", enqueue):
+            response = self.client.post("/api/tasks/stream", json={"description": "Fix the login bug"},
+                                        headers={"Idempotency-Key": "key-1"})
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()["status_url"], "/api/tasks/jobs/job-1")
+        self.assertEqual(response.headers["Location"], "/api/tasks/jobs/job-1")
+        enqueue.assert_awaited_once_with("u1", "Fix the login bug", "key-1")
+        mock_workflow.assert_not_called()
+
+    def test_queue_mode_reports_a_full_queue(self):
+        enqueue = AsyncMock(side_effect=server.QueueFullException("Task queue is full. Please try again later."))
+        with patch.dict(os.environ, {"TASK_JOB_QUEUE_ENABLED": "true"}), patch.object(server.job_queue, "enqueue", enqueue):
+            response = self.client.post("/api/tasks/stream", json={"description": "Fix the login bug"})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["Retry-After"], "5")
+
+    @patch('server.TaskCreationWorkflow')
+    def test_streams_stage_events_without_the_queue(self, mock_workflow):
+        async def run(description, on_progress=None):
+            await on_progress("deadline", {"deadline": "2030-06-01 17:00:00"})
+            await on_progress("saved", {"status": "success"})
+
+        mock_workflow.return_value.run = run
+        with patch.dict(os.environ, {"TASK_JOB_QUEUE_ENABLED": "false"}):
+            response = self.client.post("/api/tasks/stream", json={"description": "Fix the login bug"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        self.assertIn("event: deadline", response.text)
+        self.assertIn("event: saved", response.text)
+
+if __name__ == '__main__':
+    unittest.main()
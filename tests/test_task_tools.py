@@ -0,0 +1,262 @@
+import unittest
+import sys
+import os
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.connection import Base
+from database.models import User, Task, TaskTombstone
+from database.migrate import migrate
+from tools.task_tools import (query_tasks, get_all_tasks, save_tasks_to_db, update_task_statuses, MAX_BULK_STATUS_UPDATES,
+                              get_tasks_version, get_task_changes, encode_cursor, purge_task_tombstones,
+                              iter_tasks, iter_tasks_ndjson, iter_tasks_csv)
+
+BASE_TIME = datetime(2025, 1, 1, 9, 0, 0)
+
+class TestQueryTasks(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.Session = sessionmaker(bind=engine)
+        patcher = patch('tools.task_tools.SessionLocal', self.Session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        with self.Session() as session:
+            session.add_all([
+                User(id="u1", first_name="Ann", last_name="Lee", email="ann@example.com"),
+                User(id="u2", first_name="Bob", last_name="Ray", email="bob@example.com"),
+            ])
+            for i in range(1, 21):
+                session.add(Task(
+                    id=i,
+                    title=f"Task {i}",
+                    assign_by="u1" if i % 2 else "u2",
+                    assignee="u2" if i % 2 else "u1",
+                    importance=i % 5 + 1,
+                    priority=i % 5 + 1,
+                    # Pairs of tasks share a deadline to exercise the id tie-breaker
+                    deadline=None if i == 20 else BASE_TIME + timedelta(days=i // 2),
+                    status="finished" if i % 4 == 0 else "open",
+                    created_at=BASE_TIME + timedelta(hours=i),
+                    updated_at=BASE_TIME + timedelta(hours=i),
+                ))
+            session.commit()
+
+    def collect(self, **kwargs):
+        ids, cursor = [], None
+        while True:
+            page = query_tasks(cursor=cursor, **kwargs)
+            ids.extend(t["id"] for t in page["tasks"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                return ids
+
+    def test_default_sort_newest_first(self):
+        page = query_tasks(limit=3, with_total=True)
+        self.assertEqual([t["id"] for t in page["tasks"]], [20, 19, 18])
+        self.assertEqual(page["total"], 20)
+        self.assertEqual(page["tasks"][0]["assignee_name"], "Ann Lee")
+
+    def test_filters(self):
+        page = query_tasks(assignee="u2", status="open", limit=None, with_total=True)
+        self.assertTrue(all(t["assignee"] == "u2" and t["status"] == "open" for t in page["tasks"]))
+        self.assertEqual(page["total"], len(page["tasks"]))
+
+        page = query_tasks(min_priority=4, max_priority=5, limit=None)
+        self.assertTrue(all(t["priority"] >= 4 for t in page["tasks"]))
+        self.assertEqual(len(page["tasks"]), 8)
+
+        page = query_tasks(deadline_after=BASE_TIME + timedelta(days=2), deadline_before=BASE_TIME + timedelta(days=3), limit=None)
+        self.assertEqual(sorted(t["id"] for t in page["tasks"]), [4, 5, 6, 7])
+
+    def test_keyset_pages_cover_everything_once(self):
+        for sort in ("created_at", "deadline", "priority", "id"):
+            for order in ("asc", "desc"):
+                ids = self.collect(sort=sort, order=order, limit=3)
+                self.assertEqual(sorted(ids), list(range(1, 21)), f"{sort} {order}")
+
+    def test_keyset_matches_offset_order(self):
+        full = [t["id"] for t in query_tasks(sort="deadline", order="asc", limit=None)["tasks"]]
+        self.assertEqual(self.collect(sort="deadline", order="asc", limit=4), full)
+        # NULL deadlines sort first ascending
+        self.assertEqual(full[0], 20)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            query_tasks(sort="title")
+        with self.assertRaises(ValueError):
+            query_tasks(order="sideways")
+        with self.assertRaises(ValueError):
+            query_tasks(cursor="not-a-cursor")
+        cursor = query_tasks(sort="id", limit=1)["next_cursor"]
+        with self.assertRaises(ValueError):
+            query_tasks(sort="deadline", cursor=cursor)
+
+    def test_get_all_tasks(self):
+        self.assertEqual(len(get_all_tasks()), 20)
+
+    def test_save_tasks_in_one_transaction(self):
+        task = {"title": "New", "description": "d", "assign_by": "u1", "assignee_id": "u2",
+                "importance": "4", "priority": 9, "deadline": BASE_TIME, "suggestions": ""}
+        ids = save_tasks_to_db([task, dict(task, title="Newer")])
+        self.assertEqual(len(ids), 2)
+        with self.Session() as session:
+            saved = session.get(Task, ids[1])
+            self.assertEqual((saved.title, saved.importance, saved.priority), ("Newer", 4, 3))
+
+        # A bad row rolls back the whole batch
+        with self.assertRaises(Exception):
+            save_tasks_to_db([task, dict(task, deadline="not a date")])
+        self.assertEqual(len(get_all_tasks()), 22)
+
+    def test_bulk_status_update(self):
+        # Odd ids are assigned to u2, even ids to u1
+        results = update_task_statuses([(1, "finished"), (2, "finished"), (3, "in progress"), (999, "finished"), (1, "in progress")], "u2")
+        outcome = {r["task_id"]: (r["success"], r["status"]) for r in results}
+        self.assertEqual(outcome, {
+            1: (True, "in progress"),
+            2: (False, "finished"),
+            3: (True, "in progress"),
+            999: (False, "finished"),
+        })
+        self.assertEqual([r["task_id"] for r in results], [1, 2, 3, 999])
+        self.assertIn("Permission denied", results[1]["message"])
+        with self.Session() as session:
+            self.assertEqual(session.get(Task, 1).status, "in progress")
+            self.assertEqual(session.get(Task, 2).status, "open")
+
+    def test_version_changes_on_writes(self):
+        before = get_tasks_version()
+        self.assertEqual(before[1], 20)
+        self.assertEqual(get_tasks_version(), before)
+        update_task_statuses([(1, "finished")], "u2")
+        after_update = get_tasks_version()
+        self.assertGreater(after_update[0], before[0])
+        with self.Session() as session:
+            session.delete(session.get(Task, 2))
+            session.commit()
+        self.assertEqual(get_tasks_version()[1], 19)
+
+    def test_export_matches_listing(self):
+        filters = {"status": "open", "min_priority": 2, "sort": "deadline", "order": "asc"}
+        listed = query_tasks(limit=None, **filters)["tasks"]
+        exported = list(iter_tasks(batch_size=3, **filters))
+        self.assertEqual(exported, listed)
+
+    def test_export_ndjson_and_csv(self):
+        lines = list(iter_tasks_ndjson(assignee="u1", batch_size=4))
+        self.assertEqual(len(lines), 10)
+        self.assertTrue(all(line.endswith("\n") for line in lines))
+        self.assertEqual({json.loads(line)["assignee"] for line in lines}, {"u1"})
+
+        chunks = list(iter_tasks_csv(assignee="u1", batch_size=4))
+        # 10 rows in batches of 4: header + 4 rows, 4 rows, then the last 2
+        self.assertEqual(len(chunks), 3)
+        rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(rows[0]["assignee_name"], "Ann Lee")
+
+    def test_export_validates_before_streaming(self):
+        with self.assertRaises(ValueError):
+            iter_tasks_csv(sort="password")
+
+    def test_bulk_status_update_limit(self):
+        with self.assertRaises(ValueError):
+            update_task_statuses([(i, "open") for i in range(MAX_BULK_STATUS_UPDATES + 1)], "u1")
+
+
+class TestTaskChanges(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        # migrate() also installs the tombstone triggers
+        migrate(engine, verbose=False)
+        self.Session = sessionmaker(bind=engine)
+        for target, value in (('tools.task_tools.SessionLocal', self.Session),
+                              ('config.get_change_feed_overlap_seconds', lambda: 0)):
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.old = datetime.utcnow() - timedelta(hours=1)
+        with self.Session() as session:
+            for i in range(1, 6):
+                session.add(Task(id=i, title=f"Task {i}", assignee="u1" if i <= 3 else "u2", assign_by="u9",
+                                 status="open", created_at=self.old, updated_at=self.old + timedelta(seconds=i)))
+            session.commit()
+
+    def sync(self, since=None, **kwargs):
+        return get_task_changes(since=since, assignee="u1", **kwargs)
+
+    def test_full_sync_pages_through_matching_tasks(self):
+        first = self.sync(limit=2)
+        self.assertTrue(first["full"])
+        self.assertTrue(first["has_more"])
+        second = self.sync(first["next_since"], limit=2)
+        self.assertFalse(second["full"])
+        self.assertFalse(second["has_more"])
+        ids = [t["id"] for t in first["tasks"] + second["tasks"]]
+        self.assertEqual(ids, [1, 2, 3])
+
+    def test_returns_only_changes_and_tombstones(self):
+        cursor = self.sync()["next_since"]
+        self.assertEqual(self.sync(cursor)["tasks"], [])
+
+        update_task_statuses([(2, "finished")], "u1")
+        with self.Session() as session:
+            session.delete(session.get(Task, 3))
+            session.delete(session.get(Task, 4))  # assigned to someone else
+            session.commit()
+
+        changes = self.sync(cursor)
+        self.assertEqual([(t["id"], t["status"]) for t in changes["tasks"]], [(2, "finished")])
+        self.assertEqual(changes["deleted"], [3])
+
+    def test_reused_id_clears_tombstone(self):
+        cursor = self.sync()["next_since"]
+        with self.Session() as session:
+            session.delete(session.get(Task, 3))
+            session.commit()
+            session.add(Task(id=3, title="Reborn", assignee="u1", status="open",
+                             created_at=datetime.utcnow(), updated_at=datetime.utcnow()))
+            session.commit()
+        changes = self.sync(cursor)
+        self.assertEqual(changes["deleted"], [])
+        self.assertEqual([t["title"] for t in changes["tasks"]], ["Reborn"])
+
+    def test_caught_up_cursor_overlaps_recent_writes(self):
+        update_task_statuses([(1, "finished")], "u1")
+        with patch('config.get_change_feed_overlap_seconds', lambda: 60):
+            cursor = self.sync()["next_since"]
+            # The recent write is inside the overlap window, so it is sent again
+            self.assertEqual([t["id"] for t in self.sync(cursor)["tasks"]], [1])
+
+    def test_expired_cursor_forces_full_sync(self):
+        stale = encode_cursor("changes", datetime.utcnow() - timedelta(days=365), 0)
+        changes = self.sync(stale)
+        self.assertTrue(changes["full"])
+        self.assertEqual(len(changes["tasks"]), 3)
+
+    def test_purge_old_tombstones(self):
+        with self.Session() as session:
+            session.add(TaskTombstone(task_id=99, deleted_at=datetime.utcnow() - timedelta(days=365)))
+            session.commit()
+        self.assertEqual(purge_task_tombstones(), 1)
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            self.sync("not-a-cursor")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,217 @@
+import unittest
+import asyncio
+import sys
+import os
+from unittest.mock import patch
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.task_agents import TaskCreationWorkflow, BatchTaskCreationWorkflow
+
+CANDIDATES = [{"id": "user2", "name": "Jane Doe", "position": "Developer", "job_description": "Writes code"}]
+
+RESPONSES = {
+    "deadline_agent": "2025-12-31 17:00:00",
+    "assignee_agent": "user2",
+    "details_agent": '```json\n{"title": "Fix login", "description": "Fix the login bug"}\n```',
+    "priority_agent": '{"importance": "4", "priority": "5"}',
+    "suggestion_agent": "Start with the auth module.",
+    "enrichment_agent": '{"title": "Fix login", "description": "Fix the login bug", "deadline": "2025-12-31 17:00:00", '
+                        '"importance": 4, "priority": "5", "suggestions": "Start with the auth module."}',
+}
+
+def fake_ask(responses, delay=0.05, active=None):
+    async def _ask(self, agent, prompt, parse=None):
+        if active is not None:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(delay)
+        if active is not None:
+            active["now"] -= 1
+        text = responses[agent.name]
+        return parse(text) if parse else text
+    return _ask
+
+@patch('agents.task_agents.shortlist_candidates', return_value=CANDIDATES)
+@patch('agents.task_agents.save_task_to_db_async', return_value="Task 'Fix login' created successfully for assignee user2.")
+class TestTaskCreationWorkflow(unittest.TestCase):
+
+    def test_sequential_run(self, mock_save, mock_candidates):
+        with patch.object(TaskCreationWorkflow, '_ask', fake_ask(RESPONSES)):
+            workflow = TaskCreationWorkflow("user1", concurrent=False)
+            result = asyncio.run(workflow.run("Fix the login bug"))
+
+        self.assertEqual(result["assignee_name"], "Jane Doe")
+        self.assertEqual(result["task_title"], "Fix login")
+        kwargs = mock_save.call_args.kwargs
+        self.assertEqual(kwargs["importance"], "4")
+        self.assertEqual(kwargs["priority"], "5")
+        self.assertEqual(kwargs["deadline"].year, 2025)
+        for stage in ("deadline", "assignee", "details", "priority", "suggestions", "save", "total"):
+            self.assertIn(stage, result["timings"])
+
+    def test_concurrent_run_overlaps_stages(self, mock_save, mock_candidates):
+        active = {"now": 0, "peak": 0}
+        with patch.object(TaskCreationWorkflow, '_ask', fake_ask(RESPONSES, delay=0.1, active=active)):
+            workflow = TaskCreationWorkflow("user1", concurrent=True, max_concurrency=5)
+            result = asyncio.run(workflow.run("Fix the login bug"))
+
+        self.assertEqual(active["peak"], 5)
+        # Five 0.1s stages in parallel should take far less than their sum
+        self.assertLess(result["timings"]["total"], 0.4)
+        self.assertEqual(result["task_title"], "Fix login")
+
+    def test_concurrency_cap(self, mock_save, mock_candidates):
+        active = {"now": 0, "peak": 0}
+        with patch.object(TaskCreationWorkflow, '_ask', fake_ask(RESPONSES, delay=0.02, active=active)):
+            workflow = TaskCreationWorkflow("user1", concurrent=True, max_concurrency=2)
+            asyncio.run(workflow.run("Fix the login bug"))
+
+        self.assertEqual(active["peak"], 2)
+
+    def test_concurrent_fallbacks(self, mock_save, mock_candidates):
+        bad = dict(RESPONSES, deadline_agent="soon", assignee_agent="None",
+                   details_agent="not json", priority_agent="not json")
+        with patch.object(TaskCreationWorkflow, '_ask', fake_ask(bad)):
+            workflow = TaskCreationWorkflow("user1", concurrent=True)
+            result = asyncio.run(workflow.run("Fix the login bug"))
+
+        kwargs = mock_save.call_args.kwargs
+        self.assertEqual(kwargs["assignee_id"], "user1")
+        self.assertEqual(kwargs["title"], "New Task")
+        self.assertEqual(kwargs["description"], "Fix the login bug")
+        self.assertEqual((kwargs["importance"], kwargs["priority"]), ("3", "3"))
+        self.assertEqual(result["assignee_name"], "You")
+
+    def test_concurrent_failure_propagates(self, mock_save, mock_candidates):
+        async def failing_ask(self, agent, prompt, parse=None):
+            if agent.name == "priority_agent":
+                raise RuntimeError("boom")
+            await asyncio.sleep(0.05)
+            return parse(RESPONSES[agent.name]) if parse else RESPONSES[agent.name]
+
+        with patch.object(TaskCreationWorkflow, '_ask', failing_ask):
+            workflow = TaskCreationWorkflow("user1", concurrent=True)
+            with self.assertRaises(RuntimeError):
+                asyncio.run(workflow.run("Fix the login bug"))
+        mock_save.assert_not_called()
+
+    def test_fused_mode_uses_two_calls(self, mock_save, mock_candidates):
+        calls = []
+        async def recording_ask(self, agent, prompt, parse=None):
+            calls.append(agent.name)
+            return parse(RESPONSES[agent.name]) if parse else RESPONSES[agent.name]
+
+        with patch.object(TaskCreationWorkflow, '_ask', recording_ask):
+            workflow = TaskCreationWorkflow("user1", mode="fused")
+            result = asyncio.run(workflow.run("Fix the login bug"))
+
+        self.assertEqual(sorted(calls), ["assignee_agent", "enrichment_agent"])
+        kwargs = mock_save.call_args.kwargs
+        self.assertEqual(kwargs["title"], "Fix login")
+        self.assertEqual((kwargs["importance"], kwargs["priority"]), ("4", "5"))
+        self.assertEqual(kwargs["deadline"].strftime("%Y-%m-%d %H:%M:%S"), "2025-12-31 17:00:00")
+        self.assertEqual(kwargs["suggestions"], "Start with the auth module.")
+        self.assertIn("enrichment", result["timings"])
+
+    def test_stated_deadline_skips_deadline_agent(self, mock_save, mock_candidates):
+        for mode in ("multi_agent", "fused"):
+            calls = []
+            async def recording_ask(self, agent, prompt, parse=None):
+                calls.append(agent.name)
+                return parse(RESPONSES[agent.name]) if parse else RESPONSES[agent.name]
+
+            with patch.object(TaskCreationWorkflow, '_ask', recording_ask):
+                workflow = TaskCreationWorkflow("user1", mode=mode)
+                asyncio.run(workflow.run("Fix the login bug by 2030-06-01"))
+
+            self.assertEqual(calls.count("deadline_agent"), 0)
+            self.assertEqual(mock_save.call_args.kwargs["deadline"].strftime("%Y-%m-%d %H:%M:%S"), "2030-06-01 17:00:00")
+
+    def test_deadline_agent_answer_without_seconds_is_accepted(self, mock_save, mock_candidates):
+        short = dict(RESPONSES, deadline_agent="2025-12-31")
+        with patch.object(TaskCreationWorkflow, '_ask', fake_ask(short)):
+            asyncio.run(TaskCreationWorkflow("user1", concurrent=False).run("Fix the login bug"))
+        self.assertEqual(mock_save.call_args.kwargs["deadline"].strftime("%Y-%m-%d %H:%M:%S"), "2025-12-31 17:00:00")
+
+    def test_fused_mode_invalid_schema_falls_back(self, mock_save, mock_candidates):
+        bad = dict(RESPONSES, enrichment_agent='{"title": "Fix login", "importance": 9}')
+        with patch.object(TaskCreationWorkflow, '_ask', fake_ask(bad)):
+            workflow = TaskCreationWorkflow("user1", mode="fused")
+            asyncio.run(workflow.run("Fix the login bug"))
+
+        kwargs = mock_save.call_args.kwargs
+        self.assertEqual(kwargs["title"], "New Task")
+        self.assertEqual((kwargs["importance"], kwargs["priority"]), ("3", "3"))
+
+    def test_progress_events(self, mock_save, mock_candidates):
+        for mode in ("multi_agent", "fused"):
+            events = []
+
+            async def on_progress(event, data):
+                events.append((event, data))
+
+            with patch.object(TaskCreationWorkflow, '_ask', fake_ask(RESPONSES, delay=0.01)):
+                workflow = TaskCreationWorkflow("user1", concurrent=True, mode=mode)
+                result = asyncio.run(workflow.run("Fix the login bug", on_progress=on_progress))
+
+            names = [event for event, _ in events]
+            self.assertEqual(sorted(names[:-1]), ["assignee", "deadline", "details", "priority", "suggestions"])
+            self.assertEqual(events[-1], ("saved", result))
+            data = dict(events)
+            self.assertEqual(data["deadline"], {"deadline": "2025-12-31 17:00:00"})
+            self.assertEqual(data["assignee"]["assignee_name"], "Jane Doe")
+            self.assertEqual(data["details"]["title"], "Fix login")
+
+    def test_failing_progress_listener_does_not_fail_task(self, mock_save, mock_candidates):
+        async def on_progress(event, data):
+            raise ConnectionError("client went away")
+
+        with patch.object(TaskCreationWorkflow, '_ask', fake_ask(RESPONSES, delay=0.01)):
+            workflow = TaskCreationWorkflow("user1", concurrent=False)
+            result = asyncio.run(workflow.run("Fix the login bug", on_progress=on_progress))
+        self.assertEqual(result["status"], "success")
+
+    def test_unknown_mode(self, mock_save, mock_candidates):
+        with self.assertRaises(ValueError):
+            TaskCreationWorkflow("user1", mode="bogus")
+
+
+@patch('agents.task_agents.make_shortlister', return_value=lambda description: CANDIDATES)
+class TestBatchTaskCreationWorkflow(unittest.TestCase):
+
+    def test_batch_saves_once_and_reports_per_item(self, mock_shortlister):
+        saved = []
+
+        async def save(tasks):
+            saved.append(tasks)
+            return list(range(100, 100 + len(tasks)))
+
+        active = {"now": 0, "peak": 0}
+        with patch.object(TaskCreationWorkflow, '_ask', fake_ask(RESPONSES, delay=0.01, active=active)), \
+                patch('agents.task_agents.save_tasks_to_db_async', side_effect=save):
+            batch = BatchTaskCreationWorkflow("user1", max_concurrency=2, mode="fused")
+            result = asyncio.run(batch.run(["Fix the login bug", "  ", "Fix the signup bug"]))
+
+        mock_shortlister.assert_called_once()
+        self.assertEqual(len(saved), 1)
+        self.assertEqual(len(saved[0]), 2)
+        # Two items in flight, two agent calls each in fused mode
+        self.assertLessEqual(active["peak"], 4)
+        self.assertEqual((result["created"], result["failed"]), (2, 1))
+        first, empty, last = result["results"]
+        self.assertEqual((first["task_id"], first["assignee_name"]), (100, "Jane Doe"))
+        self.assertEqual(empty["status"], "error")
+        self.assertEqual(last["task_id"], 101)
+
+    def test_save_failure_marks_all_items(self, mock_shortlister):
+        with patch.object(TaskCreationWorkflow, '_ask', fake_ask(RESPONSES, delay=0.01)), \
+                patch('agents.task_agents.save_tasks_to_db_async', side_effect=RuntimeError("disk full")):
+            result = asyncio.run(BatchTaskCreationWorkflow("user1").run(["a", "b"]))
+
+        self.assertEqual((result["created"], result["failed"]), (0, 2))
+        self.assertIn("disk full", result["results"][0]["error"])
+
+if __name__ == '__main__':
+    unittest.main()
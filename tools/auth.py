@@ -1,17 +1,24 @@
 from passlib.context import CryptContext
-from database import SessionLocal, User
+from database import SessionLocal, User, run_in_db_executor
+from tools.candidate_index import index_candidate
+from tools.rate_limiter import create_login_rate_limiter
+from concurrent.futures import ThreadPoolExecutor
+import config
+import asyncio
+import threading
 import uuid
 import re
-import time
 
 class RateLimitException(Exception):
     pass
 
+class PasswordHashingBusyException(Exception):
+    pass
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-login_attempts = {}
-LOCKOUT_TIME = 600 # 10 minutes
-MAX_ATTEMPTS = 5
+# Failed-login counters; see tools/rate_limiter.py for the memory and shared SQLite backends
+login_rate_limiter = create_login_rate_limiter()
 
 def get_password_hash(password):
     return pwd_context.hash(password)
@@ -19,23 +26,67 @@ def get_password_hash(password):
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
+class PasswordHasher:
+    """
+    Runs bcrypt hashing/verification on a dedicated thread pool.
+
+    bcrypt releases the GIL, so a few threads hash in parallel without
+    blocking the event loop. At most `workers + queue_size` operations may be
+    in flight; beyond that `PasswordHashingBusyException` is raised so callers
+    can shed load (e.g. answer 503) instead of queueing without bound.
+    """
+    def __init__(self, workers=None, queue_size=None):
+        self.workers = workers or config.get_password_hash_workers()
+        self.queue_size = config.get_password_hash_queue_size() if queue_size is None else queue_size
+        self.max_pending = self.workers + self.queue_size
+        self.pending = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def run(self, func, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHashingBusyException("Server is busy. Please try again shortly.")
+            self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+password_hasher = PasswordHasher()
+
+async def get_password_hash_async(password):
+    return await password_hasher.run(get_password_hash, password)
+
+async def verify_password_async(plain_password, hashed_password):
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
 def is_valid_email(email):
     return re.match(r"(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)", email)
 
 def is_strong_password(password):
     return len(password) >= 8 and any(c.isupper() for c in password) and any(c.islower() for c in password) and any(c.isdigit() for c in password)
 
-def create_user(first_name, last_name, email, password, position=None, job_description=None):
+def validate_new_user(email, password):
     if not is_valid_email(email):
         raise ValueError("Invalid email format.")
     if not is_strong_password(password):
         raise ValueError("Password must be at least 8 characters long and contain at least one uppercase letter, one lowercase letter, and one number.")
 
+def save_user(first_name, last_name, email, hashed_password, position=None, job_description=None):
     with SessionLocal() as db:
         if db.query(User).filter(User.email == email).first():
             raise ValueError("Email already registered.")
 
-        hashed_password = get_password_hash(password)
         db_user = User(
             id=str(uuid.uuid4()),
             first_name=first_name,
@@ -48,26 +99,65 @@ def create_user(first_name, last_name, email, password, position=None, job_descr
         db.add(db_user)
         db.commit()
         db.refresh(db_user)
+        index_candidate(db_user)
         return db_user
 
+def create_user(first_name, last_name, email, password, position=None, job_description=None):
+    validate_new_user(email, password)
+    if get_user_by_email(email):
+        raise ValueError("Email already registered.")
+    return save_user(first_name, last_name, email, get_password_hash(password), position, job_description)
+
 def get_user_by_email(email):
     with SessionLocal() as db:
         return db.query(User).filter(User.email == email).first()
 
-def authenticate_user(email, password):
-    if email in login_attempts and time.time() - login_attempts[email]['time'] < LOCKOUT_TIME and login_attempts[email]['count'] >= MAX_ATTEMPTS:
+def check_login_allowed(email):
+    if not login_rate_limiter.is_allowed(email):
         raise RateLimitException("Too many login attempts. Please try again later.")
 
+def record_failed_login(email):
+    login_rate_limiter.record_failure(email)
+
+def clear_failed_logins(email):
+    login_rate_limiter.reset(email)
+
+async def _run_rate_limiter(func, email):
+    # The shared SQLite backend does I/O; the in-memory one is cheap enough to run inline
+    if login_rate_limiter.blocking:
+        return await run_in_db_executor(func, email)
+    return func(email)
+
+def authenticate_user(email, password):
+    check_login_allowed(email)
+
     user = get_user_by_email(email)
     if not user or not verify_password(password, user.hashed_password):
-        if email in login_attempts:
-            login_attempts[email]['count'] += 1
-            login_attempts[email]['time'] = time.time()
-        else:
-            login_attempts[email] = {'count': 1, 'time': time.time()}
+        record_failed_login(email)
         return None
 
-    if email in login_attempts:
-        del login_attempts[email]
+    clear_failed_logins(email)
+    return user
+
+# Async variants for the FastAPI handlers. Database access runs on the DB
+# thread pool and bcrypt on the password hashing pool, so neither blocks the
+# event loop and a login rush can't starve database work.
+
+async def create_user_async(first_name, last_name, email, password, position=None, job_description=None):
+    validate_new_user(email, password)
+    # Cheap duplicate check first so we don't spend a bcrypt round on it
+    if await run_in_db_executor(get_user_by_email, email):
+        raise ValueError("Email already registered.")
+    hashed_password = await get_password_hash_async(password)
+    return await run_in_db_executor(save_user, first_name, last_name, email, hashed_password, position, job_description)
+
+async def authenticate_user_async(email, password):
+    await _run_rate_limiter(check_login_allowed, email)
+
+    user = await run_in_db_executor(get_user_by_email, email)
+    if not user or not await verify_password_async(password, user.hashed_password):
+        await _run_rate_limiter(record_failed_login, email)
+        return None
 
+    await _run_rate_limiter(clear_failed_logins, email)
     return user
@@ -0,0 +1,181 @@
+import math
+import re
+import heapq
+import threading
+import time
+from collections import Counter
+import config
+from tools.task_tools import get_all_candidates
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it",
+    "of", "on", "or", "that", "the", "to", "with", "will", "this", "who", "our", "we",
+}
+
+def tokenize(text):
+    """Lowercases text and splits it into alphanumeric terms, dropping stopwords."""
+    if not text:
+        return []
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class CandidateIndex:
+    """
+    In-process BM25 index over candidate positions and job descriptions.
+
+    Candidates are the dictionaries returned by `get_all_candidates()`. The
+    position field is weighted higher than the job description since it is
+    the most specific signal of what a person does. Adding a candidate is
+    incremental, so new users can be indexed without a rebuild.
+    """
+    POSITION_WEIGHT = 2
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self.candidates = {}     # candidate id -> candidate dict
+        self.doc_terms = {}      # candidate id -> Counter of term frequencies
+        self.doc_lengths = {}    # candidate id -> number of (weighted) terms
+        self.postings = {}       # term -> {candidate id: term frequency}
+        self.order = {}          # candidate id -> insertion order, used to break ties
+        self.total_length = 0
+        self.built_at = None
+
+    def __len__(self):
+        return len(self.candidates)
+
+    def _terms(self, candidate):
+        terms = Counter(tokenize(candidate.get("job_description")))
+        for term in tokenize(candidate.get("position")):
+            terms[term] += self.POSITION_WEIGHT
+        return terms
+
+    def _remove(self, candidate_id):
+        terms = self.doc_terms.pop(candidate_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            docs = self.postings[term]
+            del docs[candidate_id]
+            if not docs:
+                del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(candidate_id)
+        del self.candidates[candidate_id]
+
+    def add(self, candidate):
+        """Adds or replaces a single candidate in the index."""
+        with self._lock:
+            candidate_id = candidate["id"]
+            self._remove(candidate_id)
+            terms = self._terms(candidate)
+            self.candidates[candidate_id] = candidate
+            self.doc_terms[candidate_id] = terms
+            self.doc_lengths[candidate_id] = sum(terms.values())
+            self.order.setdefault(candidate_id, len(self.order))
+            self.total_length += self.doc_lengths[candidate_id]
+            for term, freq in terms.items():
+                self.postings.setdefault(term, {})[candidate_id] = freq
+
+    def build(self, candidates):
+        """Replaces the index contents with the given candidates."""
+        fresh = CandidateIndex(self.k1, self.b)
+        for candidate in candidates:
+            fresh.add(candidate)
+        # Swap the contents in one step so concurrent searches never see a half-built index
+        with self._lock:
+            for attr in ("candidates", "doc_terms", "doc_lengths", "postings", "order", "total_length"):
+                setattr(self, attr, getattr(fresh, attr))
+            self.built_at = time.monotonic()
+
+    def search(self, query, k):
+        """
+        Returns the top-k candidates for the query, best match first.
+
+        Candidates with no matching terms are ranked after matching ones, so
+        the assignee agent always receives up to k candidates to choose from.
+        """
+        with self._lock:
+            n_docs = len(self.candidates)
+            if n_docs == 0 or k <= 0:
+                return []
+            avg_length = (self.total_length / n_docs) or 1.0
+            scores = {}
+            for term in set(tokenize(query)):
+                docs = self.postings.get(term)
+                if not docs:
+                    continue
+                idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                for candidate_id, freq in docs.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[candidate_id] / avg_length)
+                    scores[candidate_id] = scores.get(candidate_id, 0.0) + idf * freq * (self.k1 + 1) / (freq + norm)
+
+            top = heapq.nsmallest(
+                k, scores, key=lambda cid: (-scores[cid], self.order[cid])
+            )
+            if len(top) < k:
+                # Pad with non-matching candidates in insertion order. `order` is itself kept in
+                # insertion order (ids are only ever added to it), so no sort is needed per search
+                for candidate_id in self.order:
+                    if len(top) >= k:
+                        break
+                    if candidate_id not in scores:
+                        top.append(candidate_id)
+            return [self.candidates[cid] for cid in top]
+
+
+candidate_index = CandidateIndex()
+
+def build_candidate_index():
+    """Builds the candidate index from the users table. Called at startup."""
+    candidate_index.build(get_all_candidates())
+    print(f"✅ Candidate index built ({len(candidate_index)} candidates).")
+
+def index_candidate(user):
+    """Adds a newly created or updated `User` to the candidate index."""
+    if candidate_index.built_at is None:
+        # Not built yet; the user will be picked up by the initial build
+        return
+    candidate_index.add({
+        "id": user.id,
+        "name": f"{user.first_name} {user.last_name}",
+        "position": user.position,
+        "job_description": user.job_description
+    })
+
+def shortlist_candidates(task_description, k=None):
+    """
+    Returns the top-k candidates for a task description.
+
+    The index is built lazily on first use and rebuilt after
+    `CANDIDATE_INDEX_REFRESH_SECONDS` so users registered by other worker
+    processes are eventually picked up. A k of 0 or less disables the
+    shortlist and returns every candidate.
+    """
+    k = config.get_assignee_shortlist_size() if k is None else k
+    if k <= 0:
+        return get_all_candidates()
+
+    refresh = config.get_candidate_index_refresh_seconds()
+    if candidate_index.built_at is None or (refresh > 0 and time.monotonic() - candidate_index.built_at > refresh):
+        build_candidate_index()
+    return candidate_index.search(task_description, k)
+
+def make_shortlister(k=None):
+    """
+    Returns a shortlist function over a private snapshot of the users table.
+
+    Batch task creation uses this so every item ranks the same candidates,
+    and the table is read once per batch instead of once per task.
+    """
+    k = config.get_assignee_shortlist_size() if k is None else k
+    candidates = get_all_candidates()
+    if k <= 0:
+        return lambda task_description: candidates
+    snapshot = CandidateIndex()
+    snapshot.build(candidates)
+    return lambda task_description: snapshot.search(task_description, k)
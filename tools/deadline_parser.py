@@ -0,0 +1,250 @@
+"""
+Rule-based deadline extraction for task descriptions.
+
+`parse_deadline` resolves common explicit and relative deadlines
+("2025-11-02", "Nov 2 at 3pm", "tomorrow", "in 3 days", "by Friday 5pm",
+"end of month") in microseconds, so the workflow can skip the deadline
+agent. Dates without a time get 5:00 PM, the convention the deadline agent
+follows; a time counts only next to the date or after by/before/until/at
+("by Friday 5pm", not "the 5am cron job by Friday"). Anything vague or
+contradictory returns None and is left to the agent. Examples: two
+different dates, "next Friday", "tomorrow morning", "in two weeks or so",
+a time it can't read ("tomorrow at 9", "by 0900"), a recurring deadline
+("every Monday"), or a relative deadline that has already passed.
+"""
+import calendar
+import re
+from datetime import date, datetime, time, timedelta
+
+DEFAULT_TIME = time(17, 0)
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): i for i, name in enumerate(calendar.month_abbr) if name})
+MONTHS["sept"] = 9
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+}
+
+_MONTH = r"(" + "|".join(sorted(MONTHS, key=len, reverse=True)) + r")\.?"
+_ORDINAL = r"(\d{1,2})(?:st|nd|rd|th)?"
+_YEAR = r"(?:,?\s+(\d{4}))?"
+
+ISO_RE = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})(?:[ t](\d{1,2}):(\d{2})(?::\d{2})?)?\b")
+MONTH_DAY_RE = re.compile(rf"\b{_MONTH}\s+{_ORDINAL}\b{_YEAR}")
+DAY_MONTH_RE = re.compile(rf"\b{_ORDINAL}\s+(?:of\s+)?{_MONTH}(?![a-z]){_YEAR}")
+IN_RE = re.compile(r"\b(?:in|within)\s+(\d+|" + "|".join(NUMBER_WORDS) + r")\s+(minute|hour|day|week)s?\b")
+RELATIVE_DAY_RE = re.compile(r"\b((?:the\s+)?day\s+after\s+tomorrow|tomorrow|today|end\s+of\s+(?:the\s+)?day|eod)\b")
+END_OF_RE = re.compile(r"\b(?:end\s+of\s+(?:the\s+)?(week|month)|(eow|eom))\b")
+WEEKDAY_RE = re.compile(r"\b(?:(next|this|coming|following|last)\s+)?(" + "|".join(WEEKDAYS) + r")\b")
+TIME_RE = re.compile(
+    r"(?:\b(by|before|until|till|at)\s+)?"
+    r"(?:\b(\d{1,2})(?::([0-5]\d))?\s*([ap])\.?m\b\.?"  # 5pm, 5:30 p.m.
+    r"|\b([01]?\d|2[0-3]):([0-5]\d)\b"                   # 17:00
+    r"|\b(noon|midday)\b)"
+)
+# Left over after the recognized expressions, these make a deadline too vague to resolve locally
+VAGUE_RE = re.compile(
+    r"\b(minutes?|hours?|days?|weeks?|weekend|months?|quarter|year|tonight|morning|afternoon|evening|night|"
+    r"midnight|asap|soon|eow|eom)\b"
+)
+# What may separate a date from its time ("Friday 5pm", "Nov 2, 3pm", "5pm on Friday")
+ADJACENT_GAP_RE = re.compile(r"[\s,]*(?:on\s+)?")
+# Times TIME_RE doesn't read: "at 9" (am or pm?), "by 0900", "1730h"
+UNREAD_TIME_RE = re.compile(r"\b(?:by|before|until|till|at)\s+\d{1,4}\b|\b(?:[01]\d|2[0-3])[0-5]\d(?:h|hrs)?\b")
+# A recurring deadline has no single date to resolve
+RECURRING_RE = re.compile(
+    r"\b(?:every|daily|weekly|biweekly|fortnightly|monthly|quarterly|yearly|annually|"
+    r"each\s+(?:day|week|month|year|" + "|".join(WEEKDAYS) + r")|(?:" + "|".join(WEEKDAYS) + r")s)\b"
+)
+
+
+def _iso(match, now):
+    year, month, day, hour, minute = match.groups()
+    at = time(int(hour), int(minute)) if hour is not None else None
+    return date(int(year), int(month), int(day)), at, True
+
+
+def _calendar_date(month, day, year, now):
+    resolved = date(int(year) if year else now.year, MONTHS[month], int(day))
+    if not year and resolved < now.date():
+        # "Jan 5" in December means next January
+        resolved = resolved.replace(year=resolved.year + 1)
+    return resolved, None, True
+
+
+def _month_day(match, now):
+    month, day, year = match.groups()
+    return _calendar_date(month, day, year, now)
+
+
+def _day_month(match, now):
+    day, month, year = match.groups()
+    return _calendar_date(month, day, year, now)
+
+
+def _in(match, now):
+    amount, unit = match.groups()
+    amount = NUMBER_WORDS.get(amount) or int(amount)
+    if unit in ("minute", "hour"):
+        exact = now.replace(second=0, microsecond=0) + timedelta(**{unit + "s": amount})
+        return exact.date(), exact.time(), False
+    return now.date() + timedelta(days=amount * (7 if unit == "week" else 1)), None, False
+
+
+def _relative_day(match, now):
+    phrase = match.group(1)
+    if "after" in phrase:
+        return now.date() + timedelta(days=2), None, False
+    if phrase == "tomorrow":
+        return now.date() + timedelta(days=1), None, False
+    return now.date(), None, False
+
+
+def _end_of(match, now):
+    unit = match.group(1) or {"eow": "week", "eom": "month"}[match.group(2)]
+    today = now.date()
+    if unit == "week":
+        return today + timedelta(days=(4 - today.weekday()) % 7), None, False
+    return today.replace(day=calendar.monthrange(today.year, today.month)[1]), None, False
+
+
+def _weekday(match, now):
+    qualifier, name = match.groups()
+    if qualifier not in (None, "this"):
+        # "next Friday" means this week's Friday to some people and next week's to others
+        return None
+    today = now.date()
+    return today + timedelta(days=(WEEKDAYS.index(name) - today.weekday()) % 7), None, False
+
+
+# Most specific first; later rules skip text already matched
+DATE_RULES = (
+    (ISO_RE, _iso),
+    (MONTH_DAY_RE, _month_day),
+    (DAY_MONTH_RE, _day_month),
+    (IN_RE, _in),
+    (RELATIVE_DAY_RE, _relative_day),
+    (END_OF_RE, _end_of),
+    (WEEKDAY_RE, _weekday),
+)
+
+
+# Index of the month group in MONTH_DAY_RE and DAY_MONTH_RE matches
+MONTH_GROUP = {MONTH_DAY_RE: 1, DAY_MONTH_RE: 2}
+
+
+def _is_modal_may(match, month_group, original):
+    """
+    True when the "may" in a month match reads as the verb ("may 3 of them need visas").
+
+    "May" is the month when an ordinal suffix or a year pins it down ("May 3rd",
+    "3 May 2027"), or when it is capitalized mid-sentence ("due May 3").
+    """
+    if match.group(month_group) != "may":
+        return False
+    if match.group(3) or re.search(r"\d(?:st|nd|rd|th)\b", match.group(0)):
+        return False
+    start = match.start(month_group)
+    before = original[:start].rstrip()
+    at_sentence_start = not before or before[-1] in ".!?;:"
+    return at_sentence_start or original[start] != "M"
+
+
+def _find_dates(text, now, original):
+    """Returns the resolved date expressions ((date, time or None, explicit) or None) and their spans."""
+    dates, spans = [], []
+    for pattern, resolve in DATE_RULES:
+        for match in pattern.finditer(text):
+            if any(match.start() < end and start < match.end() for start, end in spans):
+                continue
+            if pattern in MONTH_GROUP and _is_modal_may(match, MONTH_GROUP[pattern], original):
+                continue
+            spans.append(match.span())
+            try:
+                dates.append(resolve(match, now))
+            except ValueError:
+                # e.g. "Feb 30" or "2025-13-01"
+                dates.append(None)
+    return dates, spans
+
+
+def _resolve_time(match):
+    prefix, hour, minute, meridiem, hour24, minute24, named = match.groups()
+    if named:
+        return prefix, time(12, 0)
+    if hour24 is not None:
+        return prefix, time(int(hour24), int(minute24))
+    hour = int(hour)
+    if not 1 <= hour <= 12:
+        return prefix, None
+    return prefix, time(hour % 12 + (12 if meridiem == "p" else 0), int(minute or 0))
+
+
+def _next_to_date(match, spans, text):
+    for start, end in spans:
+        gap = text[end:match.start()] if end <= match.start() else text[match.end():start]
+        if ADJACENT_GAP_RE.fullmatch(gap):
+            return True
+    return False
+
+
+def parse_deadline(text, now=None):
+    """
+    Resolves the single deadline stated in `text`.
+
+    Args:
+        text (str): A task description.
+        now (datetime): Reference time for relative expressions; defaults to now.
+
+    Returns:
+        datetime or None: The deadline (5:00 PM when only a date is given), or
+        None when there is no deadline or it can't be resolved confidently.
+    """
+    now = now or datetime.now()
+    original = text or ""
+    text = original.lower()
+    if RECURRING_RE.search(text):
+        return None
+    dates, spans = _find_dates(text, now, original)
+    # Two phrases for the same day ("in 10 days, by Oct 24") agree; only the resolved values count
+    if None in dates or len({(day, exact) for day, exact, _ in dates}) > 1:
+        return None
+
+    rest = list(text)
+    for start, end in spans:
+        rest[start:end] = " " * (end - start)
+    rest = "".join(rest)
+    if VAGUE_RE.search(rest):
+        return None
+    matches = list(TIME_RE.finditer(rest))
+    times = [_resolve_time(match) for match in matches]
+    if any(at is None for _, at in times):
+        return None
+    if UNREAD_TIME_RE.search(TIME_RE.sub(" ", rest)):
+        return None
+
+    if not dates:
+        # A bare time ("the 10:30 meeting") isn't a deadline unless phrased as one ("by 3pm")
+        if len({at for _, at in times}) != 1 or times[0][0] not in ("by", "before", "until", "till"):
+            return None
+        deadline = datetime.combine(now.date(), times[0][1])
+        return deadline if deadline > now else deadline + timedelta(days=1)
+
+    # Only a time next to the date or introduced by by/before/until/at is the deadline's;
+    # others describe something else ("the notes from the 10:30 meeting by Friday")
+    bound = {at for (prefix, at), match in zip(times, matches) if prefix or _next_to_date(match, spans, text)}
+    if len(bound) > 1:
+        return None
+    at = bound.pop() if bound else None
+
+    day, exact, _ = dates[0]
+    explicit = any(is_explicit for _, _, is_explicit in dates)
+    if exact is not None and at is not None and at != exact:
+        return None
+    deadline = datetime.combine(day, exact or at or DEFAULT_TIME)
+    if deadline < now and not explicit:
+        # e.g. "today" after 5 PM; the agent can decide what was meant
+        return None
+    return deadline
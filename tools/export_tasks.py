@@ -0,0 +1,63 @@
+"""
+Streams tasks from the database to a file or stdout as NDJSON or CSV.
+
+Rows are read in fixed-size batches, so exporting a large table doesn't
+need more memory than a small one.
+
+Usage:
+    python -m tools.export_tasks --format csv --output tasks.csv
+    python -m tools.export_tasks --status open,in_progress --assignee <user id>
+"""
+import argparse
+import sys
+from datetime import datetime
+from tools.task_tools import iter_tasks_ndjson, iter_tasks_csv, TASK_SORT_FIELDS, EXPORT_BATCH_SIZE
+
+EXPORTERS = {"ndjson": iter_tasks_ndjson, "csv": iter_tasks_csv}
+
+
+def export_tasks(out, format="ndjson", **kwargs):
+    """Writes matching tasks to the file object `out`. Returns the number of chunks written."""
+    chunks = 0
+    for chunk in EXPORTERS[format](**kwargs):
+        out.write(chunk)
+        chunks += 1
+    return chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export tasks as NDJSON or CSV.")
+    parser.add_argument("--format", choices=sorted(EXPORTERS), default="ndjson")
+    parser.add_argument("--output", help="File to write to (default: stdout).")
+    parser.add_argument("--assignee", help="Only tasks assigned to this user ID.")
+    parser.add_argument("--assign-by", help="Only tasks created by this user ID.")
+    parser.add_argument("--status", help="Only tasks with this status (comma-separated for several).")
+    parser.add_argument("--min-priority", type=int)
+    parser.add_argument("--max-priority", type=int)
+    parser.add_argument("--min-importance", type=int)
+    parser.add_argument("--max-importance", type=int)
+    parser.add_argument("--deadline-after", type=datetime.fromisoformat)
+    parser.add_argument("--deadline-before", type=datetime.fromisoformat)
+    parser.add_argument("--sort", choices=list(TASK_SORT_FIELDS), default="created_at")
+    parser.add_argument("--order", choices=["asc", "desc"], default="desc")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    options = {
+        "assignee": args.assignee, "assign_by": args.assign_by, "status": args.status,
+        "min_priority": args.min_priority, "max_priority": args.max_priority,
+        "min_importance": args.min_importance, "max_importance": args.max_importance,
+        "deadline_after": args.deadline_after, "deadline_before": args.deadline_before,
+        "sort": args.sort, "order": args.order, "batch_size": args.batch_size,
+    }
+    if args.output:
+        # newline="" stops the csv module's \r\n line endings from being translated again
+        with open(args.output, "w", encoding="utf-8", newline="") as out:
+            export_tasks(out, args.format, **options)
+        print(f"✅ Exported tasks to {args.output}", file=sys.stderr)
+    else:
+        export_tasks(sys.stdout, args.format, **options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import case, select
+from sqlalchemy.dialects.sqlite import insert
+import config
+from database import SessionLocal, LoginAttempt
+
+
+def normalize_key(email):
+    """Emails are case-insensitive; don't let 'A@x.com' and 'a@x.com' get separate budgets."""
+    return (email or "").strip().lower()
+
+
+class MemoryRateLimiter:
+    """
+    Per-process failed-login limiter with TTL eviction and a hard size cap.
+
+    Entries are kept in an OrderedDict ordered by their latest failure, so
+    expired entries are always at the front and can be dropped in amortized
+    O(1). When the cap is reached the least recently failing entry is evicted.
+    """
+    blocking = False
+
+    def __init__(self, max_attempts, lockout_seconds, max_entries):
+        self.max_attempts = max_attempts
+        self.lockout_seconds = lockout_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> [count, last_attempt]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict_expired(self, now):
+        while self._entries:
+            key, (count, last_attempt) = next(iter(self._entries.items()))
+            if now - last_attempt < self.lockout_seconds:
+                break
+            self._entries.popitem(last=False)
+
+    def is_allowed(self, email):
+        now = time.time()
+        with self._lock:
+            self._evict_expired(now)
+            entry = self._entries.get(normalize_key(email))
+            return not (entry and entry[0] >= self.max_attempts)
+
+    def record_failure(self, email):
+        key = normalize_key(email)
+        now = time.time()
+        with self._lock:
+            self._evict_expired(now)
+            entry = self._entries.pop(key, None) or [0, now]
+            entry[0] += 1
+            entry[1] = now
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def reset(self, email):
+        with self._lock:
+            self._entries.pop(normalize_key(email), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteRateLimiter:
+    """
+    Failed-login limiter stored in the `login_attempts` table.
+
+    Every worker process on the host shares the same counters, so running
+    `uvicorn --workers N` doesn't multiply the allowed attempts. Checks and
+    updates are single primary-key lookups/upserts. Expired rows are swept
+    every `sweep_every` failures, and the table is trimmed to `max_entries`.
+    """
+    blocking = True
+
+    def __init__(self, max_attempts, lockout_seconds, max_entries, sweep_every=100):
+        self.max_attempts = max_attempts
+        self.lockout_seconds = lockout_seconds
+        self.max_entries = max_entries
+        self.sweep_every = sweep_every
+        self._failures = 0
+        self._lock = threading.Lock()
+
+    def is_allowed(self, email):
+        with SessionLocal() as db:
+            entry = db.get(LoginAttempt, normalize_key(email))
+            if not entry or time.time() - entry.last_attempt >= self.lockout_seconds:
+                return True
+            return entry.count < self.max_attempts
+
+    def record_failure(self, email):
+        now = time.time()
+        statement = insert(LoginAttempt).values(key=normalize_key(email), count=1, last_attempt=now)
+        statement = statement.on_conflict_do_update(
+            index_elements=[LoginAttempt.key],
+            set_={
+                # Start a fresh window if the previous one has expired
+                "count": case((LoginAttempt.last_attempt >= now - self.lockout_seconds, LoginAttempt.count + 1), else_=1),
+                "last_attempt": now,
+            }
+        )
+        with SessionLocal() as db:
+            db.execute(statement)
+            db.commit()
+
+        with self._lock:
+            self._failures += 1
+            sweep = self._failures % self.sweep_every == 0
+        if sweep:
+            self.sweep()
+
+    def sweep(self):
+        """Deletes expired rows and trims the table to `max_entries` (oldest first)."""
+        with SessionLocal() as db:
+            db.query(LoginAttempt).filter(LoginAttempt.last_attempt < time.time() - self.lockout_seconds).delete()
+            excess = db.query(LoginAttempt).count() - self.max_entries
+            if excess > 0:
+                oldest = select(LoginAttempt.key).order_by(LoginAttempt.last_attempt).limit(excess)
+                db.query(LoginAttempt).filter(LoginAttempt.key.in_(oldest)).delete(synchronize_session=False)
+            db.commit()
+
+    def reset(self, email):
+        with SessionLocal() as db:
+            db.query(LoginAttempt).filter(LoginAttempt.key == normalize_key(email)).delete()
+            db.commit()
+
+    def clear(self):
+        with SessionLocal() as db:
+            db.query(LoginAttempt).delete()
+            db.commit()
+
+
+def create_login_rate_limiter(backend=None):
+    """Creates the limiter selected by LOGIN_RATE_LIMIT_BACKEND ('memory' or 'sqlite')."""
+    backend = backend or config.get_login_rate_limit_backend()
+    options = {
+        "max_attempts": config.get_login_max_attempts(),
+        "lockout_seconds": config.get_login_lockout_seconds(),
+        "max_entries": config.get_login_rate_limit_max_entries(),
+    }
+    if backend == "sqlite":
+        return SQLiteRateLimiter(**options)
+    if backend == "memory":
+        return MemoryRateLimiter(**options)
+    raise ValueError(f"Unknown login rate limit backend '{backend}'. Expected 'memory' or 'sqlite'.")
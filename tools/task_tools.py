@@ -1,8 +1,36 @@
 from database.connection import SessionLocal
-from database.models import User, Task
-from datetime import datetime
+from database.executor import run_in_db_executor
+from database.models import User, Task, TaskTombstone
+from datetime import datetime, timedelta
+from sqlalchemy import and_, func, or_
 from sqlalchemy.orm import aliased
+import base64
+import csv
+import io
+import json
+import config
+from metrics import timed_db
 
+# Columns the task listing can be sorted by. Every sort is made total by
+# using the task id as a tie-breaker, which is what keyset pagination needs.
+TASK_SORT_FIELDS = {
+    "created_at": Task.created_at,
+    "updated_at": Task.updated_at,
+    "deadline": Task.deadline,
+    "priority": Task.priority,
+    "importance": Task.importance,
+    "id": Task.id,
+}
+DATETIME_SORT_FIELDS = {"created_at", "updated_at", "deadline"}
+MAX_PAGE_SIZE = 500
+MAX_BULK_STATUS_UPDATES = 500
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FIELDS = [
+    "id", "title", "description", "assign_by", "assign_by_name", "assignee", "assignee_name",
+    "importance", "priority", "deadline", "suggestions", "status", "created_at", "updated_at",
+]
+
+@timed_db
 def get_all_candidates():
     """
     Retrieves all users from the database who can be potential assignees.
@@ -26,6 +54,15 @@ def get_all_candidates():
     finally:
         session.close()
 
+def to_level(value, default=3):
+    """Coerces an importance/priority value (e.g. "4" from an agent) to an int between 1 and 5."""
+    try:
+        level = int(str(value).strip())
+    except (TypeError, ValueError):
+        return default
+    return level if 1 <= level <= 5 else default
+
+@timed_db
 def save_task_to_db(title, description, assign_by, assignee_id, importance, priority, deadline, suggestions):
     """
     Saves a new task to the database.
@@ -35,8 +72,8 @@ def save_task_to_db(title, description, assign_by, assignee_id, importance, prio
         description (str): The description of the task.
         assign_by (str): The ID of the user creating the task.
         assignee_id (str): The ID of the user assigned to the task.
-        importance (str): Importance level (1-5).
-        priority (str): Priority level (1-5).
+        importance (int or str): Importance level (1-5).
+        priority (int or str): Priority level (1-5).
         deadline (datetime): The deadline for the task.
         suggestions (str): Suggestions for completing the task.
         
@@ -50,8 +87,8 @@ def save_task_to_db(title, description, assign_by, assignee_id, importance, prio
             description=description,
             assign_by=assign_by,
             assignee=assignee_id,
-            importance=str(importance),
-            priority=str(priority),
+            importance=to_level(importance),
+            priority=to_level(priority),
             deadline=deadline,
             suggestions=suggestions,
             status="open",
@@ -67,59 +104,412 @@ def save_task_to_db(title, description, assign_by, assignee_id, importance, prio
     finally:
         session.close()
 
+@timed_db
+def save_tasks_to_db(tasks):
+    """
+    Saves several new tasks in a single transaction.
+
+    Args:
+        tasks (list[dict]): Keyword arguments as accepted by `save_task_to_db`.
+
+    Returns:
+        list[int]: The new task ids, in input order.
+
+    Raises:
+        Exception: If any insert fails; no task is saved in that case.
+    """
+    session = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        new_tasks = [
+            Task(
+                title=task["title"],
+                description=task["description"],
+                assign_by=task["assign_by"],
+                assignee=task["assignee_id"],
+                importance=to_level(task["importance"]),
+                priority=to_level(task["priority"]),
+                deadline=task["deadline"],
+                suggestions=task["suggestions"],
+                status="open",
+                created_at=now,
+                updated_at=now
+            )
+            for task in tasks
+        ]
+        session.add_all(new_tasks)
+        session.commit()
+        return [task.id for task in new_tasks]
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+def _serialize_task(task, assignee, assigner):
+    """Builds the API representation of a task joined with its assignee and assigner."""
+    assignee_name = "Unassigned"
+    if assignee:
+        assignee_name = f"{assignee.first_name} {assignee.last_name}"
+    elif task.assignee:
+        assignee_name = task.assignee
+
+    assign_by_name = "Unknown"
+    if assigner:
+        assign_by_name = f"{assigner.first_name} {assigner.last_name}"
+    elif task.assign_by:
+        assign_by_name = task.assign_by
+
+    return {
+        "id": task.id,
+        "title": task.title,
+        "description": task.description,
+        "assign_by": task.assign_by,
+        "assign_by_name": assign_by_name,
+        "assignee": task.assignee,
+        "assignee_name": assignee_name,
+        "importance": task.importance,
+        "priority": task.priority,
+        "deadline": task.deadline.strftime("%Y-%m-%d %H:%M:%S") if task.deadline else None,
+        "suggestions": task.suggestions,
+        "status": task.status,
+        "created_at": task.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+        "updated_at": task.updated_at.strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+def _task_query(session):
+    # Alias for assignee and assigner
+    Assignee = aliased(User)
+    Assigner = aliased(User)
+
+    # Perform joins to get both assignee and assigner names
+    return session.query(Task, Assignee, Assigner)\
+        .outerjoin(Assignee, Task.assignee == Assignee.id)\
+        .outerjoin(Assigner, Task.assign_by == Assigner.id)
+
+@timed_db
 def get_all_tasks():
     """
     Retrieves all tasks from the database.
     """
     session = SessionLocal()
     try:
-        # Alias for assignee and assigner
-        Assignee = aliased(User)
-        Assigner = aliased(User)
-
-        # Perform joins to get both assignee and assigner names
-        results = session.query(Task, Assignee, Assigner)\
-            .outerjoin(Assignee, Task.assignee == Assignee.id)\
-            .outerjoin(Assigner, Task.assign_by == Assigner.id)\
-            .all()
-        
-        task_list = []
-        for task, assignee, assigner in results:
-            assignee_name = "Unassigned"
-            if assignee:
-                assignee_name = f"{assignee.first_name} {assignee.last_name}"
-            elif task.assignee:
-                assignee_name = task.assignee
-
-            assign_by_name = "Unknown"
-            if assigner:
-                assign_by_name = f"{assigner.first_name} {assigner.last_name}"
-            elif task.assign_by:
-                assign_by_name = task.assign_by
-
-            task_list.append({
-                "id": task.id,
-                "title": task.title,
-                "description": task.description,
-                "assign_by": task.assign_by,
-                "assign_by_name": assign_by_name,
-                "assignee": task.assignee,
-                "assignee_name": assignee_name,
-                "importance": task.importance,
-                "priority": task.priority,
-                "deadline": task.deadline.strftime("%Y-%m-%d %H:%M:%S") if task.deadline else None,
-                "suggestions": task.suggestions,
-                "status": task.status,
-                "created_at": task.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-                "updated_at": task.updated_at.strftime("%Y-%m-%d %H:%M:%S")
-            })
-        return task_list
+        results = _task_query(session).all()
+        return [_serialize_task(task, assignee, assigner) for task, assignee, assigner in results]
     except Exception as e:
         print(f"Error fetching tasks: {e}")
         return []
     finally:
         session.close()
 
+def encode_cursor(sort, value, task_id):
+    """Encodes the sort value and id of the last row of a page into an opaque cursor."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps({"s": sort, "v": value, "id": task_id})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(cursor, sort):
+    """Decodes a cursor produced by `encode_cursor`. Raises ValueError if it is malformed."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        value, task_id = payload["v"], int(payload["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor.") from e
+    if payload.get("s") != sort:
+        raise ValueError("Cursor does not match the requested sort order.")
+    if value is not None and sort in DATETIME_SORT_FIELDS:
+        value = datetime.fromisoformat(value)
+    return value, task_id
+
+def _keyset_condition(column, value, last_id, descending):
+    """
+    Returns the WHERE clause selecting rows after (value, last_id) in the sort order.
+
+    SQLite sorts NULLs first in ascending order and last in descending order,
+    so a NULL sort value is handled explicitly.
+    """
+    if descending:
+        if value is None:
+            return and_(column.is_(None), Task.id < last_id)
+        return or_(column < value, and_(column == value, Task.id < last_id), column.is_(None))
+    if value is None:
+        return or_(and_(column.is_(None), Task.id > last_id), column.isnot(None))
+    return or_(column > value, and_(column == value, Task.id > last_id))
+
+def _sort_column(sort, order):
+    """Validates the sort arguments and returns (column, descending)."""
+    if sort not in TASK_SORT_FIELDS:
+        raise ValueError(f"Invalid sort field '{sort}'. Expected one of: {', '.join(TASK_SORT_FIELDS)}.")
+    if order not in ("asc", "desc"):
+        raise ValueError("Invalid order. Expected 'asc' or 'desc'.")
+    return TASK_SORT_FIELDS[sort], order == "desc"
+
+def _task_filters(assignee=None, assign_by=None, status=None,
+                  min_priority=None, max_priority=None, min_importance=None, max_importance=None,
+                  deadline_after=None, deadline_before=None):
+    """Builds the WHERE clauses shared by the task listing and export."""
+    filters = []
+    if assignee:
+        filters.append(Task.assignee == assignee)
+    if assign_by:
+        filters.append(Task.assign_by == assign_by)
+    if status:
+        filters.append(Task.status.in_([s.strip() for s in status.split(",") if s.strip()]))
+    if min_priority is not None:
+        filters.append(Task.priority >= min_priority)
+    if max_priority is not None:
+        filters.append(Task.priority <= max_priority)
+    if min_importance is not None:
+        filters.append(Task.importance >= min_importance)
+    if max_importance is not None:
+        filters.append(Task.importance <= max_importance)
+    if deadline_after is not None:
+        filters.append(Task.deadline >= deadline_after)
+    if deadline_before is not None:
+        filters.append(Task.deadline <= deadline_before)
+    return filters
+
+@timed_db
+def query_tasks(assignee=None, assign_by=None, status=None,
+                min_priority=None, max_priority=None, min_importance=None, max_importance=None,
+                deadline_after=None, deadline_before=None,
+                sort="created_at", order="desc", limit=50, cursor=None, with_total=False):
+    """
+    Retrieves a filtered, sorted page of tasks using keyset pagination.
+
+    Args:
+        assignee (str): Only tasks assigned to this user ID.
+        assign_by (str): Only tasks created by this user ID.
+        status (str): Only tasks with this status (comma-separated for several).
+        min_priority, max_priority (int): Inclusive priority range.
+        min_importance, max_importance (int): Inclusive importance range.
+        deadline_after, deadline_before (datetime): Inclusive deadline window.
+        sort (str): One of TASK_SORT_FIELDS.
+        order (str): "asc" or "desc".
+        limit (int): Page size, capped at MAX_PAGE_SIZE. None returns every match.
+        cursor (str): The `next_cursor` of the previous page.
+        with_total (bool): Also count all matching tasks.
+
+    Returns:
+        dict: {"tasks": [...], "next_cursor": str or None, "total": int or None}
+
+    Raises:
+        ValueError: If the sort field, order or cursor is invalid.
+    """
+    column, descending = _sort_column(sort, order)
+    filters = _task_filters(assignee, assign_by, status, min_priority, max_priority,
+                            min_importance, max_importance, deadline_after, deadline_before)
+
+    session = SessionLocal()
+    try:
+        total = None
+        if with_total:
+            total = session.query(func.count(Task.id)).filter(*filters).scalar()
+
+        query = _task_query(session).filter(*filters)
+        if cursor:
+            value, last_id = decode_cursor(cursor, sort)
+            query = query.filter(_keyset_condition(column, value, last_id, descending))
+        if descending:
+            query = query.order_by(column.desc(), Task.id.desc())
+        else:
+            query = query.order_by(column.asc(), Task.id.asc())
+
+        if limit is not None:
+            limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+            # Fetch one extra row to know whether another page exists
+            rows = query.limit(limit + 1).all()
+        else:
+            rows = query.all()
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1][0]
+            last_value = getattr(last, sort)
+            next_cursor = encode_cursor(sort, last_value, last.id)
+
+        return {
+            "tasks": [_serialize_task(task, assignee_user, assigner) for task, assignee_user, assigner in rows],
+            "next_cursor": next_cursor,
+            "total": total
+        }
+    finally:
+        session.close()
+
+def iter_tasks(sort="created_at", order="desc", batch_size=EXPORT_BATCH_SIZE, **filters):
+    """
+    Yields every matching task, serialized, without loading the whole result.
+
+    Rows are fetched from the database cursor `batch_size` at a time
+    (`yield_per`), so memory use stays flat however large the table is.
+    Accepts the same filters as `query_tasks`. The sort arguments are
+    validated before the first row is read.
+
+    Raises:
+        ValueError: If the sort field or order is invalid.
+    """
+    column, descending = _sort_column(sort, order)
+    where = _task_filters(**filters)
+    ordering = (column.desc(), Task.id.desc()) if descending else (column.asc(), Task.id.asc())
+
+    def rows():
+        session = SessionLocal()
+        try:
+            query = _task_query(session).filter(*where).order_by(*ordering).yield_per(batch_size)
+            for task, assignee_user, assigner in query:
+                yield _serialize_task(task, assignee_user, assigner)
+        finally:
+            session.close()
+    return rows()
+
+def iter_tasks_ndjson(**kwargs):
+    """Returns a generator of matching tasks as newline-delimited JSON, one task per chunk."""
+    tasks = iter_tasks(**kwargs)
+    return (json.dumps(task) + "\n" for task in tasks)
+
+def iter_tasks_csv(batch_size=EXPORT_BATCH_SIZE, **kwargs):
+    """Returns a generator of matching tasks as CSV: the header, then one chunk per batch of rows."""
+    tasks = iter_tasks(batch_size=batch_size, **kwargs)
+
+    def chunks():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for count, task in enumerate(tasks, 1):
+            writer.writerow(task)
+            if count % batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    return chunks()
+
+@timed_db
+def get_task_changes(since=None, assignee=None, assign_by=None, limit=MAX_PAGE_SIZE):
+    """
+    Returns the tasks created or updated after a change feed cursor, plus deletions.
+
+    Rows are read in (updated_at, id) order through `ix_tasks_updated_at`, so
+    the cost is proportional to the number of changes. Once the feed is
+    caught up, the returned cursor is moved back by CHANGE_FEED_OVERLAP_SECONDS
+    so writes that committed after a later timestamp was read are not
+    missed; clients merge by id, so the few repeated rows are harmless.
+
+    Args:
+        since (str): The `next_since` of the previous call; None for a full sync.
+        assignee (str): Only tasks assigned to this user ID.
+        assign_by (str): Only tasks created by this user ID.
+        limit (int): Maximum number of tasks per call, capped at MAX_PAGE_SIZE.
+
+    Returns:
+        dict: {"tasks": [...], "deleted": [task ids], "next_since": str,
+               "has_more": bool, "full": bool}. When `full` is true the client
+               should replace its list; this happens when `since` is None or
+               older than the tombstone retention period.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    now = datetime.utcnow()
+    full = not since
+    since_at, last_id = None, 0
+    if since:
+        since_at, last_id = decode_cursor(since, "changes")
+        since_at = datetime.fromisoformat(since_at) if since_at else None
+        if since_at is not None and since_at < now - timedelta(days=config.get_task_tombstone_retention_days()):
+            # Deletions this old may already be purged, so deltas can't be trusted
+            full = True
+            since_at, last_id = None, 0
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+    filters = []
+    tombstone_filters = []
+    if assignee:
+        filters.append(Task.assignee == assignee)
+        tombstone_filters.append(TaskTombstone.assignee == assignee)
+    if assign_by:
+        filters.append(Task.assign_by == assign_by)
+        tombstone_filters.append(TaskTombstone.assign_by == assign_by)
+
+    session = SessionLocal()
+    try:
+        query = _task_query(session).filter(*filters)
+        if not full:
+            query = query.filter(_keyset_condition(Task.updated_at, since_at, last_id, False))
+        rows = query.order_by(Task.updated_at.asc(), Task.id.asc()).limit(limit + 1).all()
+
+        deleted = []
+        if not full:
+            tombstones = session.query(TaskTombstone.task_id).filter(*tombstone_filters)
+            if since_at is not None:
+                tombstones = tombstones.filter(TaskTombstone.deleted_at > since_at)
+            deleted = [task_id for (task_id,) in tombstones.all()]
+    finally:
+        session.close()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if rows:
+        next_at, next_id = rows[-1][0].updated_at, rows[-1][0].id
+    else:
+        next_at, next_id = since_at, last_id
+    if not has_more:
+        safe_at = now - timedelta(seconds=config.get_change_feed_overlap_seconds())
+        if next_at is None or next_at > safe_at:
+            next_at, next_id = safe_at, 0
+
+    return {
+        "tasks": [_serialize_task(task, assignee_user, assigner) for task, assignee_user, assigner in rows],
+        "deleted": deleted,
+        "next_since": encode_cursor("changes", next_at, next_id),
+        "has_more": has_more,
+        "full": full
+    }
+
+def changes_cursor_now():
+    """
+    Returns a change feed cursor for the current time, less CHANGE_FEED_OVERLAP_SECONDS.
+
+    Taken before a listing is read, it lets a client follow that listing with
+    deltas instead of starting the feed with a full sync.
+    """
+    return encode_cursor("changes", datetime.utcnow() - timedelta(seconds=config.get_change_feed_overlap_seconds()), 0)
+
+@timed_db
+def purge_task_tombstones():
+    """Deletes tombstones older than TASK_TOMBSTONE_RETENTION_DAYS. Returns the number removed."""
+    cutoff = datetime.utcnow() - timedelta(days=config.get_task_tombstone_retention_days())
+    session = SessionLocal()
+    try:
+        removed = session.query(TaskTombstone).filter(TaskTombstone.deleted_at < cutoff).delete()
+        session.commit()
+        return removed
+    except Exception as e:
+        session.rollback()
+        print(f"Warning: Task tombstone purge failed: {e}")
+        return 0
+    finally:
+        session.close()
+
+@timed_db
+def get_tasks_version():
+    """
+    Returns a cheap version token for the tasks table: (max updated_at, row count).
+
+    Every write path sets `updated_at`, so the token changes whenever a task
+    is created or updated, and the count catches deletions. Both values
+    come from indexes, so no task rows are read.
+    """
+    session = SessionLocal()
+    try:
+        last_modified, count = session.query(func.max(Task.updated_at), func.count(Task.id)).one()
+        return last_modified, count
+    finally:
+        session.close()
+
+@timed_db
 def update_task_status(task_id, new_status, user_id):
     """
     Updates the status of a task.
@@ -142,4 +532,94 @@ def update_task_status(task_id, new_status, user_id):
         session.rollback()
         return False, str(e)
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
+
+@timed_db
+def update_task_statuses(updates, user_id):
+    """
+    Updates the status of many tasks in a single transaction.
+
+    Permissions are checked with one query over all requested ids, and each
+    distinct status is applied with one UPDATE. If the same task id appears
+    more than once, the last status wins.
+
+    Args:
+        updates (list[tuple]): (task_id, new_status) pairs, at most MAX_BULK_STATUS_UPDATES.
+        user_id (str): The user making the change; only their assigned tasks are updated.
+
+    Returns:
+        list[dict]: One {"task_id", "status", "success", "message"} per distinct task id,
+            in request order.
+    """
+    if len(updates) > MAX_BULK_STATUS_UPDATES:
+        raise ValueError(f"At most {MAX_BULK_STATUS_UPDATES} status updates are allowed per request.")
+
+    requested = dict(updates)
+    order = list(dict.fromkeys(task_id for task_id, _ in updates))
+    if not requested:
+        return []
+
+    results = {}
+    allowed = {}  # new status -> task ids
+    session = SessionLocal()
+    try:
+        assignees = dict(session.query(Task.id, Task.assignee).filter(Task.id.in_(list(requested))).all())
+
+        for task_id, new_status in requested.items():
+            if task_id not in assignees:
+                results[task_id] = (False, "Task not found")
+            elif str(assignees[task_id]) != str(user_id):
+                results[task_id] = (False, "Permission denied: You can only update tasks assigned to you.")
+            else:
+                allowed.setdefault(new_status, []).append(task_id)
+                results[task_id] = (True, "Status updated successfully")
+
+        now = datetime.utcnow()
+        for new_status, task_ids in allowed.items():
+            session.query(Task)\
+                .filter(Task.id.in_(task_ids), Task.assignee == str(user_id))\
+                .update({"status": new_status, "updated_at": now}, synchronize_session=False)
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        for task_id in requested:
+            if task_id not in results or results[task_id][0]:
+                results[task_id] = (False, str(e))
+    finally:
+        session.close()
+
+    return [
+        {"task_id": task_id, "status": requested[task_id], "success": results[task_id][0], "message": results[task_id][1]}
+        for task_id in order
+    ]
+
+# Async variants for the FastAPI handlers and the task workflow. They run the
+# synchronous functions above on the DB thread pool so queries never block
+# the event loop.
+
+async def get_all_candidates_async():
+    return await run_in_db_executor(get_all_candidates)
+
+async def save_task_to_db_async(**kwargs):
+    return await run_in_db_executor(save_task_to_db, **kwargs)
+
+async def save_tasks_to_db_async(tasks):
+    return await run_in_db_executor(save_tasks_to_db, tasks)
+
+async def get_all_tasks_async():
+    return await run_in_db_executor(get_all_tasks)
+
+async def query_tasks_async(**kwargs):
+    return await run_in_db_executor(query_tasks, **kwargs)
+
+async def get_task_changes_async(**kwargs):
+    return await run_in_db_executor(get_task_changes, **kwargs)
+
+async def get_tasks_version_async():
+    return await run_in_db_executor(get_tasks_version)
+
+async def update_task_status_async(task_id, new_status, user_id):
+    return await run_in_db_executor(update_task_status, task_id, new_status, user_id)
+
+async def update_task_statuses_async(updates, user_id):
+    return await run_in_db_executor(update_task_statuses, updates, user_id)